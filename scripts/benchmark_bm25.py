@@ -0,0 +1,137 @@
+"""
+Benchmark the BM25 backends against rank_bm25.BM25Okapi.
+
+Builds the indices from the processed hadiths, checks that the postings
+(plain and MaxScore-pruned) and sparse backends return the same top-k
+documents and scores as BM25Okapi, and reports per-query latency, postings
+evaluated vs skipped by pruning, and batch throughput.
+
+Usage:
+    python scripts/benchmark_bm25.py [--hadiths data/processed/hadiths.json]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+from rank_bm25 import BM25Okapi
+
+from src.config import HADITHS_JSON, BM25_TOP_K
+from src.search.analyzer import get_analyzer
+from src.search.inverted_index import InvertedIndex
+from src.search.sparse_bm25 import SparseBM25
+from src.search.query_expansion import expand_query
+
+QUERIES = [
+    "How to perform prayer correctly",
+    "Raising hands during prayer (Rafa Yadain)",
+    "Rights and treatment of parents in Islam",
+    "What are the rights of neighbors",
+    "What breaks the fast in Ramadan",
+    "Patience during hardship and trials",
+    "Virtues of honesty and truthfulness",
+    "Kindness to animals in Islam",
+    "Narrated Aisha",
+    "charity",
+]
+
+
+def okapi_top_k(bm25: BM25Okapi, tokens, k):
+    """Previous search path: score all documents, then sort every index."""
+    scores = bm25.get_scores(tokens)
+    top = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:k]
+    return [(i, float(scores[i])) for i in top if scores[i] > 0]
+
+
+def same_results(expected, actual):
+    """Same documents in the same order with matching scores."""
+    return (
+        [d for d, _ in expected] == [d for d, _ in actual]
+        and np.allclose([s for _, s in expected], [s for _, s in actual], rtol=0, atol=1e-9)
+    )
+
+
+def time_per_query(fn, repeat):
+    """Average milliseconds per call over `repeat` runs."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--hadiths", type=Path, default=HADITHS_JSON)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(args.hadiths) as f:
+        hadiths = json.load(f)
+    tokenize = get_analyzer().tokenize
+    corpus = [tokenize(h["full_text"]) for h in hadiths]
+    print(f"Corpus: {len(corpus)} documents")
+
+    start = time.perf_counter()
+    bm25 = BM25Okapi(corpus)
+    print(f"BM25Okapi build:     {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    index = InvertedIndex.build(corpus)
+    print(f"InvertedIndex build: {time.perf_counter() - start:.2f}s")
+    sparse = SparseBM25(index)
+
+    print("-" * 104)
+    print(f"{'query':<34} {'terms':>5} {'okapi ms':>9} {'index ms':>9} {'pruned ms':>9} "
+          f"{'sparse ms':>9} {'evaluated':>9} {'skipped':>8} {'match':>5}")
+    totals = [0.0, 0.0, 0.0, 0.0]
+    postings = [0, 0]
+    for query in QUERIES:
+        tokens = tokenize(expand_query(query))
+        expected = okapi_top_k(bm25, tokens, BM25_TOP_K)
+        pruned, stats = index.top_k_pruned(tokens, BM25_TOP_K)
+        match = (
+            same_results(expected, index.top_k(tokens, BM25_TOP_K))
+            and same_results(expected, pruned)
+            and same_results(expected, sparse.top_k(tokens, BM25_TOP_K))
+        )
+
+        timings = [
+            time_per_query(lambda: okapi_top_k(bm25, tokens, BM25_TOP_K), args.repeat),
+            time_per_query(lambda: index.top_k(tokens, BM25_TOP_K), args.repeat),
+            time_per_query(lambda: index.top_k_pruned(tokens, BM25_TOP_K), args.repeat),
+            time_per_query(lambda: sparse.top_k(tokens, BM25_TOP_K), args.repeat),
+        ]
+        for i, ms in enumerate(timings):
+            totals[i] += ms
+        postings[0] += stats["postings_evaluated"]
+        postings[1] += stats["postings_skipped"]
+        print(f"{query[:34]:<34} {len(tokens):>5} " + " ".join(f"{ms:>9.2f}" for ms in timings)
+              + f" {stats['postings_evaluated']:>9} {stats['postings_skipped']:>8} {'yes' if match else 'NO':>5}")
+
+    print("-" * 104)
+    n = len(QUERIES)
+    print(f"Mean: okapi {totals[0] / n:.2f}ms, index {totals[1] / n:.2f}ms, "
+          f"pruned {totals[2] / n:.2f}ms, sparse {totals[3] / n:.2f}ms")
+    print(f"Pruning: {postings[0]} postings evaluated, {postings[1]} skipped "
+          f"({100 * postings[1] / max(1, sum(postings)):.0f}% skipped)")
+
+    # Batch throughput: every query expanded, repeated to a bulk workload
+    batch = [tokenize(expand_query(q)) for q in QUERIES] * 100
+    start = time.perf_counter()
+    for tokens in batch:
+        index.top_k(tokens, BM25_TOP_K)
+    loop_s = time.perf_counter() - start
+    start = time.perf_counter()
+    sparse.top_k_batch(batch, BM25_TOP_K)
+    batch_s = time.perf_counter() - start
+    print(f"Batch of {len(batch)}: postings loop {len(batch) / loop_s:.0f} q/s, "
+          f"sparse batch {len(batch) / batch_s:.0f} q/s")
+
+
+if __name__ == "__main__":
+    main()
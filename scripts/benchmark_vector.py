@@ -0,0 +1,163 @@
+"""
+Benchmark the vector backends: ChromaDB (HNSW) and the NumPy index with
+and without quantization, against exact float search.
+
+All backends are queried with the same query embeddings, so the timings
+cover only the nearest-neighbour search. Recall@k is the fraction of the
+exact float top-k that a backend also returns.
+
+Without --synthetic, the ChromaDB collection and the dense index written by
+scripts/ingest.py are used. With --synthetic, only the NumPy index is
+measured on clustered random unit vectors of the given shape (no model or
+ChromaDB needed); recall on real embeddings will differ.
+
+Usage:
+    python scripts/benchmark_vector.py [--repeat 20] [--synthetic 14700x768]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from src.config import VECTOR_INDEX, VECTOR_TOP_K, VECTOR_RESCORE_CANDIDATES, EMBEDDING_MODEL
+from src.search.dense_index import DenseIndex, normalize_rows
+
+QUERIES = [
+    "How to perform prayer correctly",
+    "Raising hands during prayer (Rafa Yadain)",
+    "Rights and treatment of parents in Islam",
+    "What are the rights of neighbors",
+    "What breaks the fast in Ramadan",
+    "Patience during hardship and trials",
+    "Virtues of honesty and truthfulness",
+    "Kindness to animals in Islam",
+    "Narrated Aisha",
+    "charity",
+]
+
+
+def time_per_query(fn, repeat):
+    """Average milliseconds per call over `repeat` runs."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def recall(expected, actual):
+    """Fraction of the expected doc indices present in actual."""
+    expected = {i for i, _ in expected}
+    return len(expected & {i for i, _ in actual}) / max(1, len(expected))
+
+
+def compare_quantization(index, queries, repeat, k, rescore):
+    """Latency and recall@k of each first pass against exact float search."""
+    print("-" * 60)
+    print(f"{'first pass':<12} {'rescored':>8} {'ms/query':>9} {'recall@' + str(k):>10} "
+          f"{'scanned MB':>11}")
+    exact = [index.top_k(q, k) for q in queries]
+    sizes = {
+        "none": index.embeddings.nbytes,
+        "int8": index.int8_codes.nbytes,
+        "binary": index.binary_codes.nbytes,
+    }
+    runs = [("none", 0)] + [
+        (quantization, n) for quantization in ("int8", "binary") for n in sorted({k, 100, rescore})
+    ]
+    for quantization, n in runs:
+        index.quantization, index.rescore = quantization, n
+        ms = np.mean([time_per_query(lambda: index.top_k(q, k), repeat) for q in queries])
+        r = np.mean([recall(e, index.top_k(q, k)) for e, q in zip(exact, queries)])
+        print(f"{quantization:<12} {n:>8} {ms:>9.2f} {r:>10.3f} "
+              f"{sizes[quantization] / 2**20:>11.1f}")
+    index.quantization = "none"
+
+
+def benchmark_synthetic(shape, repeat, k, rescore):
+    """Measure the NumPy index on clustered random unit vectors."""
+    n_docs, dim = shape
+    rng = np.random.default_rng(0)
+    # Clusters of ~50 documents; the noise is twice the cluster signal
+    centers = rng.standard_normal((n_docs // 50, dim))
+    docs = centers[rng.integers(len(centers), size=n_docs)] + 2 * rng.standard_normal((n_docs, dim))
+    index = DenseIndex(normalize_rows(docs), [str(i) for i in range(n_docs)])
+    queries = docs[rng.integers(n_docs, size=len(QUERIES))]
+    queries = normalize_rows(queries + 2 * rng.standard_normal(queries.shape))
+    mask = rng.random(n_docs) < 0.1
+
+    ms = np.mean([time_per_query(lambda: index.top_k(q, k), repeat) for q in queries])
+    masked_ms = np.mean([time_per_query(lambda: index.top_k(q, k, mask), repeat) for q in queries])
+    print(f"Synthetic {n_docs}x{dim}: exact top-{k} {ms:.2f}ms, "
+          f"with a 10% mask {masked_ms:.2f}ms")
+    compare_quantization(index, queries, repeat, k, rescore)
+
+
+def benchmark_backends(repeat, k, rescore):
+    """Compare ChromaDB and the NumPy index on the real collection."""
+    from src.search.vector_search import get_embedding_model, get_chroma_collection
+
+    model = get_embedding_model()
+    collection = get_chroma_collection()
+    index = DenseIndex.load(VECTOR_INDEX, model=EMBEDDING_MODEL)
+    print(f"Corpus: {index.num_docs} documents, {index.embeddings.shape[1]} dimensions")
+
+    print("-" * 80)
+    print(f"{'query':<42} {'chroma ms':>10} {'numpy ms':>10} {'recall@' + str(k):>10}")
+    totals = [0.0, 0.0]
+    recalls = []
+    embeddings = []
+    for query in QUERIES:
+        embedding = model.encode(query)
+        embeddings.append(embedding)
+
+        def chroma():
+            return collection.query(
+                query_embeddings=[embedding.tolist()],
+                n_results=k,
+                include=["documents", "metadatas", "distances"]
+            )
+
+        exact = {index.hadith_ids[i] for i, _ in index.top_k(embedding, k)}
+        hnsw_recall = len(exact & set(chroma()["ids"][0])) / len(exact)
+
+        timings = [
+            time_per_query(chroma, repeat),
+            time_per_query(lambda: index.top_k(embedding, k), repeat),
+        ]
+        totals[0] += timings[0]
+        totals[1] += timings[1]
+        recalls.append(hnsw_recall)
+        print(f"{query[:42]:<42} {timings[0]:>10.2f} {timings[1]:>10.2f} {hnsw_recall:>10.2f}")
+
+    print("-" * 80)
+    n = len(QUERIES)
+    print(f"Mean: chroma {totals[0] / n:.2f}ms, numpy {totals[1] / n:.2f}ms, "
+          f"HNSW recall@{k} {np.mean(recalls):.3f}")
+    compare_quantization(index, embeddings, repeat, k, rescore)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--k", type=int, default=VECTOR_TOP_K)
+    parser.add_argument("--rescore", type=int, default=VECTOR_RESCORE_CANDIDATES)
+    parser.add_argument("--synthetic", metavar="NxDIM",
+                        help="Measure the NumPy index on random vectors, e.g. 14700x768")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        benchmark_synthetic(
+            tuple(int(x) for x in args.synthetic.split("x")), args.repeat, args.k, args.rescore
+        )
+    else:
+        benchmark_backends(args.repeat, args.k, args.rescore)
+
+
+if __name__ == "__main__":
+    main()
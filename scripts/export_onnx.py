@@ -0,0 +1,158 @@
+"""
+Export the query embedding model to ONNX with dynamic int8 quantization.
+
+Runs after scripts/ingest.py (both at Docker build time). The
+SentenceTransformer graph (transformer, pooling and normalization) is
+exported, its weights are quantized to int8 and the fast tokenizer is saved
+alongside. Before the export replaces the previous one, sample queries and
+hadith texts are embedded with both PyTorch and ONNX Runtime; the export
+fails if any pair's cosine similarity is below ONNX_MIN_COSINE.
+
+Serve it with EMBEDDING_BACKEND=onnx.
+
+Usage:
+    python scripts/export_onnx.py [--samples 200] [--min-cosine 0.99]
+"""
+
+import argparse
+import json
+import random
+import shutil
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+import torch
+from onnxruntime.quantization import QuantType, quantize_dynamic
+from sentence_transformers import SentenceTransformer
+
+from src.config import EMBEDDING_MODEL, ONNX_EMBEDDING_DIR, ONNX_MIN_COSINE, HADITHS_JSON
+from src.search.dense_index import normalize_rows
+from src.search.onnx_embedder import (
+    INDEX_FORMAT,
+    INDEX_FORMAT_VERSION,
+    MODEL_FILE,
+    TOKENIZER_FILE,
+    OnnxEmbedder
+)
+from src.search.storage import write_manifest, replace_directory
+
+QUERIES = [
+    "How to perform prayer correctly",
+    "Raising hands during prayer (Rafa Yadain)",
+    "Rights and treatment of parents in Islam",
+    "What are the rights of neighbors",
+    "What breaks the fast in Ramadan",
+    "Patience during hardship and trials",
+    "Virtues of honesty and truthfulness",
+    "Kindness to animals in Islam",
+    "Narrated Aisha",
+    "charity",
+]
+
+# Model inputs, in the order passed to the exported graph
+INPUT_NAMES = ("input_ids", "attention_mask", "token_type_ids")
+
+
+class SentenceEmbedding(torch.nn.Module):
+    """Wraps a SentenceTransformer so the graph takes plain tensors."""
+
+    def __init__(self, model: SentenceTransformer, input_names):
+        super().__init__()
+        self.model = model
+        self.input_names = input_names
+
+    def forward(self, *inputs):
+        features = dict(zip(self.input_names, inputs))
+        return self.model(features)["sentence_embedding"]
+
+
+def export(model: SentenceTransformer, directory: Path) -> None:
+    """Write the quantized ONNX graph and tokenizer to directory."""
+    sample = model.tokenize(QUERIES[:2])
+    input_names = [name for name in INPUT_NAMES if name in sample]
+    fp32_path = directory / "model.onnx"
+
+    with torch.no_grad():
+        torch.onnx.export(
+            SentenceEmbedding(model, input_names),
+            tuple(sample[name] for name in input_names),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=["sentence_embedding"],
+            dynamic_axes={
+                **{name: {0: "batch", 1: "sequence"} for name in input_names},
+                "sentence_embedding": {0: "batch"},
+            },
+            opset_version=14
+        )
+
+    quantize_dynamic(str(fp32_path), str(directory / MODEL_FILE), weight_type=QuantType.QInt8)
+    fp32_path.unlink()
+
+    model.tokenizer.backend_tokenizer.save(str(directory / TOKENIZER_FILE))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", type=Path, default=ONNX_EMBEDDING_DIR)
+    parser.add_argument("--hadiths", type=Path, default=HADITHS_JSON)
+    parser.add_argument("--samples", type=int, default=200,
+                        help="Hadith texts used for the agreement check")
+    parser.add_argument("--min-cosine", type=float, default=ONNX_MIN_COSINE)
+    args = parser.parse_args()
+
+    print(f"Loading {EMBEDDING_MODEL}...")
+    model = SentenceTransformer(EMBEDDING_MODEL, device="cpu")
+    model.eval()
+
+    built = args.output.with_name(args.output.name + ".tmp")
+    if built.exists():
+        shutil.rmtree(built)
+    built.mkdir(parents=True)
+
+    print("Exporting to ONNX and quantizing weights to int8...")
+    export(model, built)
+    manifest = {
+        "format": INDEX_FORMAT,
+        "version": INDEX_FORMAT_VERSION,
+        "model": EMBEDDING_MODEL,
+        "max_seq_length": model.max_seq_length,
+        "pad_token": model.tokenizer.pad_token,
+        "quantization": "int8-dynamic",
+    }
+    write_manifest(built, manifest)
+
+    # Agreement check on queries and hadith texts (long inputs get truncated
+    # the same way by both tokenizers)
+    with open(args.hadiths) as f:
+        hadiths = json.load(f)
+    sample = random.Random(0).sample(hadiths, min(args.samples, len(hadiths)))
+    texts = QUERIES + [h["full_text"] for h in sample]
+    print(f"Checking cosine agreement on {len(texts)} texts...")
+    expected = normalize_rows(model.encode(texts, show_progress_bar=False))
+    actual = normalize_rows(OnnxEmbedder.load(built).encode(texts))
+    cosines = np.sum(expected * actual, axis=1)
+    print(f"Cosine vs PyTorch: min {cosines.min():.4f}, mean {cosines.mean():.4f}, "
+          f"queries min {cosines[:len(QUERIES)].min():.4f}")
+
+    if cosines.min() < args.min_cosine:
+        shutil.rmtree(built)
+        print(f"✗ Agreement below {args.min_cosine}; keeping the previous export")
+        sys.exit(1)
+
+    manifest.update({
+        "cosine_min": float(cosines.min()),
+        "cosine_mean": float(cosines.mean()),
+        "check_texts": len(texts),
+    })
+    write_manifest(built, manifest)
+    replace_directory(built, args.output)
+    print(f"✓ ONNX query encoder saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,16 @@ Hadith Search v2 - Ingestion Pipeline
 
 This script:
 1. Converts GitHub JSON files to unified schema
-2. Builds ChromaDB vector index
-3. Builds BM25 keyword index
+2. Writes the document store
+3. Builds metadata filter index
+4. Clusters near-duplicate narrations
+5. Pre-tokenizes passages for the reranker
+6. Builds ChromaDB vector index
+7. Builds nearest-neighbour table ("more like this")
+8. Builds BM25 keyword index
+9. Builds Arabic full-text index
+10. Builds spelling correction dictionary
+11. Builds typeahead suggestion index
 
 Usage:
     python scripts/ingest.py
@@ -20,11 +28,31 @@ from src.config import (
     BUKHARI_DIR,
     MUSLIM_DIR,
     HADITHS_JSON,
+    DOC_STORE,
+    FILTER_INDEX,
+    DUPLICATE_INDEX,
+    RERANK_TOKENS_INDEX,
     CHROMA_DIR,
-    BM25_INDEX
+    VECTOR_INDEX,
+    NEIGHBOR_INDEX,
+    BM25_INDEX,
+    ARABIC_INDEX,
+    SPELLING_INDEX,
+    SUGGEST_INDEX
 )
 from src.ingestion.json_converter import convert_all_json, save_hadiths
-from src.ingestion.indexer import build_chroma_index, build_bm25_index
+from src.ingestion.indexer import (
+    build_doc_store,
+    build_filter_index,
+    build_duplicate_index,
+    build_rerank_tokens,
+    build_chroma_index,
+    build_neighbor_index,
+    build_bm25_index,
+    build_arabic_index,
+    build_spelling_index,
+    build_suggest_index
+)
 
 
 def main():
@@ -34,24 +62,72 @@ def main():
     print("="*70)
 
     # Step 1: Convert JSON files
-    print("\n[1/3] Converting JSON files to unified schema...")
+    print("\n[1/11] Converting JSON files to unified schema...")
     print("-"*70)
     hadiths = convert_all_json(BUKHARI_DIR, MUSLIM_DIR)
     save_hadiths(hadiths, HADITHS_JSON)
 
-    # Step 2: Build ChromaDB index
-    print("\n[2/3] Building ChromaDB vector index...")
+    # Step 2: Write document store
+    print("\n[2/11] Writing document store...")
+    print("-"*70)
+    build_doc_store(HADITHS_JSON, DOC_STORE)
+    print(f"✓ Document store saved to {DOC_STORE}")
+
+    # Step 3: Build metadata filter index
+    print("\n[3/11] Building metadata filter index...")
+    print("-"*70)
+    build_filter_index(HADITHS_JSON, FILTER_INDEX)
+    print(f"✓ Filter index saved to {FILTER_INDEX}")
+
+    # Step 4: Cluster near-duplicates
+    print("\n[4/11] Clustering near-duplicate narrations...")
+    print("-"*70)
+    build_duplicate_index(HADITHS_JSON, DUPLICATE_INDEX)
+    print(f"✓ Duplicate clusters saved to {DUPLICATE_INDEX}")
+
+    # Step 5: Pre-tokenize reranker passages
+    print("\n[5/11] Pre-tokenizing passages for the reranker...")
+    print("-"*70)
+    build_rerank_tokens(HADITHS_JSON, RERANK_TOKENS_INDEX)
+    print(f"✓ Reranker tokens saved to {RERANK_TOKENS_INDEX}")
+
+    # Step 6: Build ChromaDB index
+    print("\n[6/11] Building ChromaDB vector index...")
     print("-"*70)
     print(f"Loading {len(hadiths)} hadiths from {HADITHS_JSON}")
     build_chroma_index(HADITHS_JSON, CHROMA_DIR)
-    print(f"✓ ChromaDB index saved to {CHROMA_DIR}")
+    print(f"✓ ChromaDB index saved to {CHROMA_DIR} (dense matrix: {VECTOR_INDEX})")
 
-    # Step 3: Build BM25 index
-    print("\n[3/3] Building BM25 keyword index...")
+    # Step 7: Build neighbour table
+    print("\n[7/11] Building nearest-neighbour table...")
+    print("-"*70)
+    build_neighbor_index(VECTOR_INDEX, NEIGHBOR_INDEX)
+    print(f"✓ Neighbour table saved to {NEIGHBOR_INDEX}")
+
+    # Step 8: Build BM25 index
+    print("\n[8/11] Building BM25 keyword index...")
     print("-"*70)
     build_bm25_index(HADITHS_JSON, BM25_INDEX)
     print(f"✓ BM25 index saved to {BM25_INDEX}")
 
+    # Step 9: Build Arabic index
+    print("\n[9/11] Building Arabic full-text index...")
+    print("-"*70)
+    build_arabic_index(HADITHS_JSON, ARABIC_INDEX)
+    print(f"✓ Arabic index saved to {ARABIC_INDEX}")
+
+    # Step 10: Build spelling dictionary
+    print("\n[10/11] Building spelling correction dictionary...")
+    print("-"*70)
+    build_spelling_index(HADITHS_JSON, SPELLING_INDEX)
+    print(f"✓ Spelling dictionary saved to {SPELLING_INDEX}")
+
+    # Step 11: Build suggestion index
+    print("\n[11/11] Building typeahead suggestion index...")
+    print("-"*70)
+    build_suggest_index(HADITHS_JSON, SUGGEST_INDEX)
+    print(f"✓ Suggestion index saved to {SUGGEST_INDEX}")
+
     print("\n" + "="*70)
     print("INGESTION COMPLETE!")
     print("="*70)
@@ -60,8 +136,16 @@ def main():
     print(f"  - Muslim: {len([h for h in hadiths if h['book'] == 'muslim'])}")
     print(f"\nOutput files:")
     print(f"  - Hadiths JSON: {HADITHS_JSON}")
+    print(f"  - Document store: {DOC_STORE}")
+    print(f"  - Filter index: {FILTER_INDEX}")
+    print(f"  - Duplicate clusters: {DUPLICATE_INDEX}")
+    print(f"  - Reranker tokens: {RERANK_TOKENS_INDEX}")
     print(f"  - ChromaDB index: {CHROMA_DIR}")
+    print(f"  - Neighbour table: {NEIGHBOR_INDEX}")
     print(f"  - BM25 index: {BM25_INDEX}")
+    print(f"  - Arabic index: {ARABIC_INDEX}")
+    print(f"  - Spelling dictionary: {SPELLING_INDEX}")
+    print(f"  - Suggestion index: {SUGGEST_INDEX}")
     print(f"\nYou can now start the API server:")
     print(f"  uvicorn src.api.main:app --reload")
     print("="*70)
@@ -0,0 +1,226 @@
+"""
+Tune the adaptive rerank thresholds against full reranking.
+
+Replays queries through the first search stages (expansion, vector and
+BM25 retrieval, fusion, duplicate collapse), scores every fused candidate
+once with the cross-encoder, then evaluates rerank policies offline: a
+pair's score does not depend on the other candidates, so the "prefix" path
+is the full scores sorted over the prefix and the "none" path is the fused
+order. For each policy it reports the path mix, cross-encoder pairs scored
+(and the estimated time at the measured ms per pair) and how close the
+results stay to full reranking (overlap@k, NDCG@k with the full rerank
+scores as gains). With --judgments (JSON of query -> relevant hadith ids)
+it also reports recall@k and MRR against those judgments.
+
+Usage:
+    python scripts/tune_rerank.py [--queries queries.txt] [--judgments judgments.json] [--grid]
+"""
+
+import argparse
+import itertools
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config import (
+    HYBRID_RETRIEVERS,
+    RERANK_TOP_K,
+    FINAL_TOP_K,
+    COLLAPSE_DUPLICATES
+)
+from src.search.query_expansion import expand_query
+from src.search.retrievers import run_retrievers
+from src.search.hybrid_search import reciprocal_rank_fusion
+from src.search.duplicates import get_duplicate_index
+from src.search.doc_store import get_doc_store
+from src.search.reranker import score_docs
+from src.search.rerank_policy import RerankPolicy
+
+QUERIES = [
+    "How to perform prayer correctly",
+    "Raising hands during prayer (Rafa Yadain)",
+    "Rights and treatment of parents in Islam",
+    "What are the rights of neighbors",
+    "What breaks the fast in Ramadan",
+    "Patience during hardship and trials",
+    "Virtues of honesty and truthfulness",
+    "Kindness to animals in Islam",
+    "Narrated Aisha",
+    "charity",
+    "zakat",
+    "wudu",
+    "night prayer",
+    "backbiting",
+    "seeking knowledge",
+    "what did the prophet say about lying to make peace between people",
+]
+
+# Policies that are always evaluated
+PRESETS = {
+    "configured": RerankPolicy(),
+    "always-full": RerankPolicy(skip_max_tokens=-1, prefix_max_tokens=-1),
+    "never": RerankPolicy(skip_agreement=0.0, skip_margin=0.0, skip_max_tokens=10**6),
+}
+
+# Threshold grid searched with --grid
+GRID = {
+    "skip_agreement": [0.6, 0.8, 1.0],
+    "skip_margin": [0.2, 0.3, 0.5],
+    "prefix_agreement": [0.2, 0.4, 0.6],
+    "prefix_margin": [0.1, 0.2, 0.3],
+    "prefix_depth": [10, 15],
+}
+
+
+def first_stage(query, top_k):
+    """Fused candidates and retriever results of one query, as hybrid_search runs them."""
+    retrieved, _ = run_retrievers(HYBRID_RETRIEVERS, query, expand_query(query))
+    fused = reciprocal_rank_fusion(*retrieved.values())
+    if COLLAPSE_DUPLICATES:
+        fused = get_duplicate_index().collapse(fused)
+    return retrieved.get("vector", []), retrieved.get("bm25", []), fused[:RERANK_TOP_K]
+
+
+def policy_results(path, depth, candidates, scores, top_k):
+    """Doc ids a policy returns, from precomputed full rerank scores."""
+    if path == "none":
+        return [doc for doc, _ in candidates[:top_k]]
+    docs = [doc for doc, _ in candidates[:depth]]
+    return sorted(docs, key=lambda doc: scores[doc], reverse=True)[:top_k]
+
+
+def ndcg(docs, reference, scores):
+    """NDCG of a ranking, using the full rerank scores (shifted to >= 0) as gains."""
+    low = min(scores.values())
+
+    def dcg(ranking):
+        return sum((scores[doc] - low) / math.log2(rank + 2) for rank, doc in enumerate(ranking))
+
+    ideal = dcg(reference)
+    return dcg(docs) / ideal if ideal > 0 else 1.0
+
+
+def evaluate(policy, replays, top_k, judgments):
+    """Path mix, pairs scored and quality of one policy over the replayed queries."""
+    paths = {"none": 0, "prefix": 0, "full": 0}
+    pairs = 0
+    overlap = quality = recall = mrr = 0.0
+    judged = 0
+    for replay in replays:
+        signals = policy.signals(replay["query"], replay["vector"], replay["bm25"],
+                                 replay["candidates"], top_k)
+        path, depth = policy.decide(signals, len(replay["candidates"]), top_k)
+        paths[path] += 1
+        pairs += depth
+        docs = policy_results(path, depth, replay["candidates"], replay["scores"], top_k)
+        reference = replay["reference"]
+        overlap += len(set(docs) & set(reference)) / max(1, len(reference))
+        quality += ndcg(docs, reference, replay["scores"])
+
+        relevant = judgments.get(replay["query"])
+        if relevant:
+            judged += 1
+            hadith_ids = [get_doc_store().hadith_ids[doc] for doc in docs]
+            recall += len(set(hadith_ids) & relevant) / len(relevant)
+            mrr += next((1 / (rank + 1) for rank, h in enumerate(hadith_ids) if h in relevant), 0.0)
+
+    n = len(replays)
+    return {
+        "paths": paths,
+        "pairs": pairs / n,
+        "overlap": overlap / n,
+        "ndcg": quality / n,
+        "recall": recall / judged if judged else None,
+        "mrr": mrr / judged if judged else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--queries", type=Path, help="File with one query per line")
+    parser.add_argument("--judgments", type=Path, help="JSON of query -> relevant hadith ids")
+    parser.add_argument("--top-k", type=int, default=FINAL_TOP_K)
+    parser.add_argument("--grid", action="store_true", help="Also search the threshold grid")
+    parser.add_argument("--show", type=int, default=10, help="Grid policies to print")
+    args = parser.parse_args()
+
+    queries = QUERIES
+    if args.queries:
+        queries = [line.strip() for line in args.queries.read_text().splitlines() if line.strip()]
+    judgments = {}
+    if args.judgments:
+        with open(args.judgments) as f:
+            judgments = {query: set(ids) for query, ids in json.load(f).items()}
+
+    # Score every candidate once; policies are evaluated from these scores
+    replays = []
+    total_pairs = 0
+    rerank_s = 0.0
+    for query in queries:
+        vector_results, bm25_results, candidates = first_stage(query, args.top_k)
+        if not candidates:
+            continue
+        start = time.perf_counter()
+        predicted = score_docs(query, [doc for doc, _ in candidates])
+        rerank_s += time.perf_counter() - start
+        total_pairs += len(candidates)
+        scores = {doc: score for (doc, _), score in zip(candidates, predicted)}
+        reference = sorted(scores, key=scores.get, reverse=True)[:args.top_k]
+        replays.append({
+            "query": query,
+            "vector": vector_results,
+            "bm25": bm25_results,
+            "candidates": candidates,
+            "scores": scores,
+            "reference": reference,
+        })
+    if not replays:
+        print("No query returned candidates")
+        return
+    ms_per_pair = rerank_s * 1000 / max(1, total_pairs)
+    print(f"Queries: {len(replays)}, cross-encoder {ms_per_pair:.2f}ms per pair")
+
+    header = (f"{'policy':<44} {'none':>5} {'prefix':>6} {'full':>5} {'pairs':>6} "
+              f"{'est ms':>7} {'overlap':>7} {'ndcg':>6}")
+    if judgments:
+        header += f" {'recall':>6} {'mrr':>6}"
+
+    def row(name, result):
+        line = (f"{name[:44]:<44} {result['paths']['none']:>5} {result['paths']['prefix']:>6} "
+                f"{result['paths']['full']:>5} {result['pairs']:>6.1f} "
+                f"{result['pairs'] * ms_per_pair:>7.1f} {result['overlap']:>7.3f} {result['ndcg']:>6.3f}")
+        if judgments:
+            line += f" {result['recall'] or 0:>6.3f} {result['mrr'] or 0:>6.3f}"
+        return line
+
+    print("-" * len(header))
+    print(header)
+    print("-" * len(header))
+    for name, policy in PRESETS.items():
+        print(row(name, evaluate(policy, replays, args.top_k, judgments)))
+
+    if args.grid:
+        # Cheapest policies first among those closest to full reranking
+        results = []
+        for values in itertools.product(*GRID.values()):
+            params = dict(zip(GRID, values))
+            result = evaluate(RerankPolicy(**params), replays, args.top_k, judgments)
+            results.append((params, result))
+        results.sort(key=lambda item: (-round(item[1]["ndcg"], 3), item[1]["pairs"]))
+
+        print("-" * len(header))
+        print(f"Grid: {len(results)} policies, best {args.show} by NDCG@{args.top_k} then pairs")
+        for params, result in results[:args.show]:
+            name = " ".join(f"{key.split('_')[0][0]}{key.split('_')[1][0]}={value}"
+                            for key, value in params.items())
+            print(row(name, result))
+        print("(sa/sm: skip agreement/margin, pa/pm: prefix agreement/margin, pd: prefix depth)")
+
+
+if __name__ == "__main__":
+    main()
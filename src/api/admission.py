@@ -0,0 +1,181 @@
+"""Bounded search executor with admission control.
+
+Searches are CPU-bound, so the API runs them on a dedicated thread pool
+of ``SEARCH_CONCURRENCY`` workers instead of the event loop (which keeps
+``/api/health`` and the other routes responsive) or the unbounded default
+threadpool. At most ``SEARCH_QUEUE_MAX`` more searches may wait for a
+worker; beyond that a search is rejected at once, and a queued search that
+waited longer than ``SEARCH_QUEUE_TIMEOUT_S`` is dropped before it starts.
+Rejections carry a retry delay estimated from the recent search time and
+the backlog, sent to clients as ``Retry-After``.
+"""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional
+
+from src.config import SEARCH_CONCURRENCY, SEARCH_QUEUE_MAX, SEARCH_QUEUE_TIMEOUT_S
+
+# Queue waits kept for percentiles
+WAIT_WINDOW = 1000
+
+# Weight of the latest search in the running service time average
+SERVICE_TIME_ALPHA = 0.1
+
+
+class Overloaded(Exception):
+    """A search was not run because the executor is saturated."""
+
+    def __init__(self, message: str, retry_after: int):
+        """Initialize error.
+
+        Args:
+            message: Reason the search was rejected.
+            retry_after: Seconds the client should wait before retrying.
+        """
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class SearchExecutor:
+    """Thread pool with a concurrency limit and a queue-depth cap."""
+
+    def __init__(self, workers: int, queue_max: int, queue_timeout_s: float):
+        """Initialize executor (threads start on first use).
+
+        Args:
+            workers: Searches run at the same time.
+            queue_max: Searches allowed to wait for a worker.
+            queue_timeout_s: Longest a search may wait before it is dropped.
+        """
+        self.workers = workers
+        self.queue_max = queue_max
+        self.queue_timeout_s = queue_timeout_s
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="search")
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._service_ms = 0.0
+        self._waits: Deque[float] = deque(maxlen=WAIT_WINDOW)
+
+    def retry_after(self) -> int:
+        """Seconds until a worker is likely free for a new search."""
+        with self._lock:
+            backlog = max(1, self._admitted - self.workers + 1)
+            return max(1, math.ceil(backlog * self._service_ms / 1000 / self.workers))
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a function on the pool if there is room.
+
+        Args:
+            fn: Function to call.
+            *args: Positional arguments of ``fn``.
+            **kwargs: Keyword arguments of ``fn``.
+
+        Returns:
+            What ``fn`` returned.
+
+        Raises:
+            Overloaded: If the queue is full or the search waited too long.
+            Exception: Whatever ``fn`` raised.
+        """
+        with self._lock:
+            full = self._admitted >= self.workers + self.queue_max
+            if full:
+                self._rejected += 1
+            else:
+                self._admitted += 1
+        if full:
+            raise Overloaded("Search queue is full", self.retry_after())
+
+        try:
+            future = self._pool.submit(self._call, time.perf_counter(), fn, args, kwargs)
+        except BaseException:
+            self._release()
+            raise
+        # Held until the job ends, even if the caller is cancelled (client gone)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, _: Any = None) -> None:
+        with self._lock:
+            self._admitted -= 1
+
+    def _call(self, queued: float, fn: Callable[..., Any], args: Any, kwargs: Any) -> Any:
+        started = time.perf_counter()
+        waited = started - queued
+        with self._lock:
+            self._waits.append(waited * 1000)
+            if waited > self.queue_timeout_s:
+                self._timed_out += 1
+                timed_out = True
+            else:
+                self._running += 1
+                timed_out = False
+        if timed_out:
+            # The client has likely given up; free the worker for newer searches
+            raise Overloaded(
+                f"Search waited {waited:.1f}s for a worker", self.retry_after()
+            )
+
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._service_ms = (
+                    elapsed_ms if self._completed == 1
+                    else self._service_ms + SERVICE_TIME_ALPHA * (elapsed_ms - self._service_ms)
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue length, rejections and queue wait.
+
+        Returns:
+            Dict with the limits, searches running and queued now,
+            completed/rejected/timed-out counts, the running average search
+            time and queue wait in ms over the last ``WAIT_WINDOW`` searches.
+        """
+        with self._lock:
+            waits = sorted(self._waits)
+
+            def percentile(p: float) -> float:
+                return waits[min(len(waits) - 1, int(p * len(waits)))] if waits else 0.0
+
+            return {
+                "workers": self.workers,
+                "queue_max": self.queue_max,
+                "running": self._running,
+                "queued": self._admitted - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "service_ms": self._service_ms,
+                "wait_ms": {
+                    "mean": sum(waits) / len(waits) if waits else 0.0,
+                    "p50": percentile(0.5),
+                    "p95": percentile(0.95),
+                    "max": waits[-1] if waits else 0.0
+                }
+            }
+
+
+# Lazy-created global
+_search_executor: Optional[SearchExecutor] = None
+
+
+def get_search_executor() -> SearchExecutor:
+    """Get or create the search executor."""
+    global _search_executor
+    if _search_executor is None:
+        _search_executor = SearchExecutor(SEARCH_CONCURRENCY, SEARCH_QUEUE_MAX, SEARCH_QUEUE_TIMEOUT_S)
+    return _search_executor
@@ -1,15 +1,44 @@
 """Pydantic models for API request/response."""
 
-from typing import List, Optional
+from typing import List, Dict, Optional
 
 from pydantic import BaseModel, Field
 
+from src.config import BATCH_SEARCH_MAX_QUERIES
+
+
+class SearchFilters(BaseModel):
+    """Metadata filters: values of a field are OR-ed, fields are AND-ed."""
+
+    book: Optional[List[str]] = Field(default=None, description="Book names (bukhari/muslim)")
+    volume: Optional[List[int]] = Field(default=None, description="Volume numbers")
+    chapter: Optional[List[str]] = Field(default=None, description="Chapter names/numbers")
+    narrator: Optional[List[str]] = Field(default=None, description="Narrator names, e.g. Abu Huraira")
+
 
 class SearchRequest(BaseModel):
     """Request model for hadith search."""
 
-    query: str = Field(..., description="Search query", min_length=1)
+    query: str = Field(..., description="Search query (English or Arabic script)", min_length=1)
     top_k: int = Field(default=10, description="Number of results", ge=1, le=50)
+    filters: Optional[SearchFilters] = Field(default=None, description="Restrict results by metadata")
+    collapse_duplicates: Optional[bool] = Field(
+        default=None, description="Show one hadith per near-duplicate cluster (default: server setting)"
+    )
+
+
+class BatchSearchRequest(BaseModel):
+    """Request model for many searches in one call."""
+
+    queries: List[str] = Field(
+        ..., description="Search queries (English or Arabic script)",
+        min_length=1, max_length=BATCH_SEARCH_MAX_QUERIES
+    )
+    top_k: int = Field(default=10, description="Number of results per query", ge=1, le=50)
+    filters: Optional[SearchFilters] = Field(default=None, description="Restrict results by metadata")
+    collapse_duplicates: Optional[bool] = Field(
+        default=None, description="Show one hadith per near-duplicate cluster (default: server setting)"
+    )
 
 
 class HadithResult(BaseModel):
@@ -23,6 +52,7 @@ class HadithResult(BaseModel):
     narrator: str = Field(..., description="Chain of narration")
     text: str = Field(..., description="Hadith text")
     score: float = Field(..., description="Relevance score")
+    arabic: Optional[str] = Field(default=None, description="Original Arabic text")
 
 
 class SearchResponse(BaseModel):
@@ -33,6 +63,77 @@ class SearchResponse(BaseModel):
     results: List[HadithResult] = Field(..., description="Search results")
     cached: bool = Field(..., description="Whether results were from cache")
     took_ms: float = Field(..., description="Search time in milliseconds")
+    did_you_mean: Optional[str] = Field(default=None, description="Spell-corrected query that was searched")
+    corrections: Dict[str, str] = Field(default_factory=dict, description="Corrected words (original -> correction)")
+    rerank_path: Optional[str] = Field(
+        default=None,
+        description=(
+            "Reranking path: full, prefix or none (unset for cached and Arabic searches); "
+            "with none, scores are RRF fusion scores, not relevance"
+        )
+    )
+    timings: Dict[str, float] = Field(
+        default_factory=dict, description="Milliseconds per search stage (each retriever, retrieval, rerank)"
+    )
+
+
+class BatchSearchResponse(BaseModel):
+    """Response model for a batch of searches."""
+
+    results: List[SearchResponse] = Field(
+        ..., description="One response per query, in request order (took_ms is the batch time)"
+    )
+    took_ms: float = Field(..., description="Batch time in milliseconds")
+    queries_per_second: float = Field(..., description="Queries answered per second")
+
+
+class SimilarResponse(BaseModel):
+    """Response model for hadiths related to one hadith (similar or parallel)."""
+
+    id: str = Field(..., description="Hadith the results are related to")
+    results: List[HadithResult] = Field(
+        ..., description="Related hadiths (score is cosine or estimated Jaccard similarity)"
+    )
+    took_ms: float = Field(..., description="Lookup time in milliseconds")
+
+
+class Suggestion(BaseModel):
+    """Single typeahead suggestion."""
+
+    text: str = Field(..., description="Suggested text")
+    kind: str = Field(..., description="Source: term, word, narrator or chapter")
+    weight: int = Field(..., description="Number of hadiths it occurs in")
+
+
+class SuggestResponse(BaseModel):
+    """Response model for typeahead suggestions."""
+
+    prefix: str = Field(..., description="Typed prefix")
+    suggestions: List[Suggestion] = Field(..., description="Suggestions, best first")
+
+
+class EmbeddingCacheStats(BaseModel):
+    """Query embedding cache statistics."""
+
+    size: int = Field(..., description="Embeddings held in memory")
+    max_size: int = Field(..., description="Maximum embeddings held in memory")
+    hits: int = Field(..., description="Cache hits (memory or disk)")
+    disk_hits: int = Field(..., description="Hits served from the persistent store")
+    misses: int = Field(..., description="Cache misses (model forward passes)")
+    hit_rate: float = Field(..., description="Hit rate (0-1)")
+    persistent: bool = Field(..., description="Whether embeddings are persisted to disk")
+
+
+class RerankCacheStats(BaseModel):
+    """Cross-encoder score cache statistics (per query-hadith pair)."""
+
+    size: int = Field(..., description="Scores held in memory")
+    max_size: int = Field(..., description="Maximum scores held in memory")
+    hits: int = Field(..., description="Pairs served from the cache (memory or disk)")
+    disk_hits: int = Field(..., description="Pairs served from the persistent store")
+    misses: int = Field(..., description="Pairs scored by the cross-encoder")
+    hit_rate: float = Field(..., description="Hit rate (0-1)")
+    persistent: bool = Field(..., description="Whether scores are persisted to disk")
 
 
 class CacheStats(BaseModel):
@@ -43,6 +144,54 @@ class CacheStats(BaseModel):
     hits: int = Field(..., description="Cache hits")
     misses: int = Field(..., description="Cache misses")
     hit_rate: float = Field(..., description="Hit rate (0-1)")
+    embeddings: EmbeddingCacheStats = Field(..., description="Query embedding cache statistics")
+    rerank: RerankCacheStats = Field(..., description="Cross-encoder score cache statistics")
+
+
+class QueueDelay(BaseModel):
+    """Time requests waited to start (batch or worker), in milliseconds."""
+
+    mean: float = Field(..., description="Mean delay")
+    p50: float = Field(..., description="Median delay")
+    p95: float = Field(..., description="95th percentile delay")
+    max: float = Field(..., description="Maximum delay")
+
+
+class BatcherStats(BaseModel):
+    """Micro-batching statistics of one model."""
+
+    max_batch: int = Field(..., description="Configured maximum items per batch")
+    max_wait_ms: float = Field(..., description="Configured maximum wait for a batch to fill")
+    batches: int = Field(..., description="Batched model calls")
+    requests: int = Field(..., description="Caller requests served")
+    items: int = Field(..., description="Items (queries or pairs) processed")
+    mean_batch_size: float = Field(..., description="Mean items per batch")
+    max_batch_size: int = Field(..., description="Largest batch")
+    batch_sizes: Dict[str, int] = Field(..., description="Batches per size bucket (items, upper bound)")
+    queue_ms: QueueDelay = Field(..., description="Queueing delay over recent requests")
+
+
+class SearchQueueStats(BaseModel):
+    """Search executor load and admission control statistics."""
+
+    workers: int = Field(..., description="Configured concurrent searches")
+    queue_max: int = Field(..., description="Configured maximum searches waiting")
+    running: int = Field(..., description="Searches running now")
+    queued: int = Field(..., description="Searches waiting for a worker now")
+    completed: int = Field(..., description="Searches run")
+    rejected: int = Field(..., description="Searches rejected because the queue was full")
+    timed_out: int = Field(..., description="Searches dropped after waiting too long")
+    service_ms: float = Field(..., description="Running average search time")
+    wait_ms: QueueDelay = Field(..., description="Wait for a worker over recent searches")
+
+
+class MetricsResponse(BaseModel):
+    """Inference and search queue metrics."""
+
+    batching: bool = Field(..., description="Whether cross-request batching is enabled")
+    embedding: BatcherStats = Field(..., description="Query embedding batches")
+    rerank: BatcherStats = Field(..., description="Cross-encoder batches")
+    search: SearchQueueStats = Field(..., description="Search executor queue")
 
 
 class HealthResponse(BaseModel):
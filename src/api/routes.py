@@ -1,63 +1,279 @@
 """API routes for hadith search."""
 
-from typing import Optional
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
+from src.api.admission import Overloaded, get_search_executor
 from src.api.models import (
+    SearchFilters,
     SearchRequest,
     SearchResponse,
+    BatchSearchRequest,
+    BatchSearchResponse,
     HadithResult,
+    SimilarResponse,
+    Suggestion,
+    SuggestResponse,
     CacheStats,
     HealthResponse,
+    MetricsResponse,
     MessageResponse
 )
-from src.search.hybrid_search import hybrid_search
-from src.search.cache import get_cache
-from src.search.bm25_search import get_bm25_data
+from src.config import (
+    SUGGEST_LIMIT,
+    SIMILAR_NEIGHBORS,
+    SIMILAR_TOP_K,
+    INFERENCE_BATCHING,
+    SEARCH_OVERLOAD_STATUS
+)
+from src.search.batching import get_embedding_batcher, get_rerank_batcher
+from src.search.hybrid_search import hybrid_search, hybrid_search_batch, hybrid_search_stages
+from src.search.cache import get_cache, get_embedding_cache, get_rerank_cache
+from src.search.doc_store import get_hadith as get_hadith_record
+from src.search.duplicates import parallel_hadiths
+from src.search.neighbors import similar_hadiths
+from src.search.suggest import suggest
 
 router = APIRouter()
 
 
+def _hadith_result(result: Dict[str, Any]) -> HadithResult:
+    """Convert a search result dict to a HadithResult."""
+    return HadithResult(
+        id=result["id"],
+        book=result["book"],
+        volume=result["volume"],
+        chapter=result["chapter"],
+        hadith_number=result["hadith_number"],
+        narrator=result["narrator"],
+        text=result["text"],
+        score=result["score"],
+        arabic=result.get("arabic") or None
+    )
+
+
+def _search_response(
+    query: str,
+    results: List[Dict[str, Any]],
+    expanded_query: str,
+    cached: bool,
+    took_ms: float,
+    info: Dict[str, Any]
+) -> SearchResponse:
+    """Build a SearchResponse from search output and its info dict."""
+    return SearchResponse(
+        query=query,
+        expanded_query=expanded_query,
+        results=[_hadith_result(r) for r in results],
+        cached=cached,
+        took_ms=took_ms,
+        did_you_mean=info.get("did_you_mean"),
+        corrections=info.get("corrections", {}),
+        rerank_path=info.get("rerank", {}).get("path"),
+        timings=info.get("timings", {})
+    )
+
+
 @router.post("/search", response_model=SearchResponse)
 async def search_hadiths(request: SearchRequest) -> SearchResponse:
     """Search for hadiths matching the query.
 
     Args:
-        request: Search request with query and optional top_k.
+        request: Search request with query, optional top_k and filters.
 
     Returns:
         SearchResponse with matching hadiths.
+
+    Raises:
+        HTTPException: ``SEARCH_OVERLOAD_STATUS`` with ``Retry-After`` when
+            the search queue is full or the search waited too long.
     """
     try:
-        results, expanded_query, cached, took_ms = hybrid_search(
+        info = {}
+        # Run on the bounded search executor: the event loop stays free,
+        # concurrent searches overlap and their model calls are batched
+        results, expanded_query, cached, took_ms = await get_search_executor().run(
+            hybrid_search,
             query=request.query,
-            top_k=request.top_k
+            top_k=request.top_k,
+            info=info,
+            filters=request.filters.model_dump(exclude_none=True) if request.filters else None,
+            collapse_duplicates=request.collapse_duplicates
         )
 
-        # Convert to HadithResult objects
-        hadith_results = [
-            HadithResult(
-                id=r["id"],
-                book=r["book"],
-                volume=r["volume"],
-                chapter=r["chapter"],
-                hadith_number=r["hadith_number"],
-                narrator=r["narrator"],
-                text=r["text"],
-                score=r["score"]
-            )
-            for r in results
-        ]
+        return _search_response(request.query, results, expanded_query, cached, took_ms, info)
 
-        return SearchResponse(
-            query=request.query,
-            expanded_query=expanded_query,
-            results=hadith_results,
-            cached=cached,
-            took_ms=took_ms
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=SEARCH_OVERLOAD_STATUS,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/search/batch", response_model=BatchSearchResponse)
+async def search_hadiths_batch(request: BatchSearchRequest) -> BatchSearchResponse:
+    """Run many searches in one call (for bulk jobs).
+
+    Queries are embedded, BM25-scored and reranked together, which is much
+    faster per query than one ``/search`` call each. Results are read from
+    and written to the search cache.
+
+    Args:
+        request: Queries with shared top_k, filters and duplicate handling.
+
+    Returns:
+        BatchSearchResponse with one SearchResponse per query.
+
+    Raises:
+        HTTPException: 400 for empty queries; ``SEARCH_OVERLOAD_STATUS``
+            with ``Retry-After`` when the search queue is full.
+    """
+    if not all(query.strip() for query in request.queries):
+        raise HTTPException(status_code=400, detail="Queries must not be empty")
+    try:
+        infos = [{} for _ in request.queries]
+        # One batch takes one worker of the search executor
+        outputs, took_ms = await get_search_executor().run(
+            hybrid_search_batch,
+            queries=request.queries,
+            top_k=request.top_k,
+            infos=infos,
+            filters=request.filters.model_dump(exclude_none=True) if request.filters else None,
+            collapse_duplicates=request.collapse_duplicates
+        )
+
+        return BatchSearchResponse(
+            results=[
+                _search_response(query, results, expanded_query, cached, took_ms, info)
+                for query, (results, expanded_query, cached), info in zip(request.queries, outputs, infos)
+            ],
+            took_ms=took_ms,
+            queries_per_second=len(request.queries) * 1000 / max(took_ms, 1e-3)
+        )
+
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=SEARCH_OVERLOAD_STATUS,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
         )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/search/stream")
+async def search_hadiths_stream(
+    query: str = Query(..., description="Search query (English or Arabic script)", min_length=1),
+    top_k: int = Query(default=10, description="Number of results", ge=1, le=50),
+    book: Optional[List[str]] = Query(default=None, description="Book names (bukhari/muslim)"),
+    volume: Optional[List[int]] = Query(default=None, description="Volume numbers"),
+    chapter: Optional[List[str]] = Query(default=None, description="Chapter names/numbers"),
+    narrator: Optional[List[str]] = Query(default=None, description="Narrator names"),
+    collapse_duplicates: Optional[bool] = Query(
+        default=None, description="Show one hadith per near-duplicate cluster (default: server setting)"
+    )
+) -> StreamingResponse:
+    """Search, streaming the fused ranking before reranking finishes.
+
+    Server-Sent Events, each with a SearchResponse as JSON data:
+    ``fused`` (RRF ranking, sent when reranking will follow) and then
+    ``reranked`` (final results, identical to ``POST /search``). A failure
+    after the stream started is sent as an ``error`` event.
+
+    Args:
+        query: Search query.
+        top_k: Number of results.
+        book: Accepted books (repeat the parameter for several).
+        volume: Accepted volumes.
+        chapter: Accepted chapters.
+        narrator: Accepted narrators.
+        collapse_duplicates: Near-duplicate handling.
+
+    Returns:
+        ``text/event-stream`` response.
+
+    Raises:
+        HTTPException: ``SEARCH_OVERLOAD_STATUS`` with ``Retry-After`` when
+            the search queue is full; 500 if the search fails before its
+            first event.
+    """
+    filters = SearchFilters(
+        book=book, volume=volume, chapter=chapter, narrator=narrator
+    ).model_dump(exclude_none=True) or None
+    loop = asyncio.get_running_loop()
+    events: "asyncio.Queue[Optional[tuple]]" = asyncio.Queue()
+    info: Dict[str, Any] = {}
 
+    def produce() -> None:
+        for stage, results, expanded_query, cached, took_ms in hybrid_search_stages(
+            query, top_k, info=info, filters=filters, collapse_duplicates=collapse_duplicates
+        ):
+            data = _search_response(query, results, expanded_query, cached, took_ms, info).model_dump_json()
+            loop.call_soon_threadsafe(events.put_nowait, (stage, data))
+
+    # The whole search runs on one executor worker; None marks its end
+    task = asyncio.ensure_future(get_search_executor().run(produce))
+    task.add_done_callback(lambda _: events.put_nowait(None))
+
+    first = await events.get()
+    if first is None:
+        try:
+            task.result()
+        except Overloaded as e:
+            raise HTTPException(
+                status_code=SEARCH_OVERLOAD_STATUS,
+                detail=str(e),
+                headers={"Retry-After": str(e.retry_after)}
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    async def stream():
+        event = first
+        while event is not None:
+            stage, data = event
+            yield f"event: {stage}\ndata: {data}\n\n"
+            event = await events.get()
+        if not task.cancelled() and task.exception() is not None:
+            yield f"event: error\ndata: {json.dumps({'detail': str(task.exception())})}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/suggest", response_model=SuggestResponse)
+async def suggest_terms(
+    prefix: str = Query(..., description="Typed text", max_length=100),
+    limit: int = Query(default=SUGGEST_LIMIT, description="Number of suggestions", ge=1, le=50)
+) -> SuggestResponse:
+    """Typeahead suggestions for a prefix.
+
+    Answered from the prefix table alone (no models or vector store), so it
+    is cheap enough to call on every keystroke.
+
+    Args:
+        prefix: Typed text.
+        limit: Maximum number of suggestions.
+
+    Returns:
+        SuggestResponse with suggestions, highest weight first.
+    """
+    try:
+        return SuggestResponse(
+            prefix=prefix,
+            suggestions=[Suggestion(**s) for s in suggest(prefix, limit)]
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -73,14 +289,11 @@ async def get_hadith(hadith_id: str) -> HadithResult:
         HadithResult with hadith details.
     """
     try:
-        data = get_bm25_data()
-        hadiths = data["hadiths"]
+        hadith = get_hadith_record(hadith_id)
 
-        if hadith_id not in hadiths:
+        if hadith is None:
             raise HTTPException(status_code=404, detail="Hadith not found")
 
-        hadith = hadiths[hadith_id]
-
         return HadithResult(
             id=hadith["id"],
             book=hadith["book"],
@@ -89,7 +302,78 @@ async def get_hadith(hadith_id: str) -> HadithResult:
             hadith_number=hadith["hadith_number"],
             narrator=hadith["narrator"],
             text=hadith["text"],
-            score=1.0
+            score=1.0,
+            arabic=hadith.get("arabic") or None
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/hadith/{hadith_id}/similar", response_model=SimilarResponse)
+async def get_similar_hadiths(
+    hadith_id: str,
+    top_k: int = Query(
+        default=SIMILAR_TOP_K, description="Number of results", ge=1, le=SIMILAR_NEIGHBORS
+    )
+) -> SimilarResponse:
+    """Get the hadiths most similar in meaning to a hadith ("more like this").
+
+    Read from the neighbour table computed at ingest, so no model or vector
+    search runs per request.
+
+    Args:
+        hadith_id: Unique hadith identifier.
+        top_k: Number of similar hadiths.
+
+    Returns:
+        SimilarResponse with the most similar hadiths first.
+    """
+    try:
+        start_time = time.time()
+        results = similar_hadiths(hadith_id, top_k)
+
+        if results is None:
+            raise HTTPException(status_code=404, detail="Hadith not found")
+
+        return SimilarResponse(
+            id=hadith_id,
+            results=[_hadith_result(r) for r in results],
+            took_ms=(time.time() - start_time) * 1000
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/hadith/{hadith_id}/parallels", response_model=SimilarResponse)
+async def get_parallel_hadiths(hadith_id: str) -> SimilarResponse:
+    """Get the near-duplicate narrations of a hadith.
+
+    These are the other members of its MinHash LSH cluster: repeated or
+    parallel narrations with largely the same wording.
+
+    Args:
+        hadith_id: Unique hadith identifier.
+
+    Returns:
+        SimilarResponse with the closest narrations first.
+    """
+    try:
+        start_time = time.time()
+        results = parallel_hadiths(hadith_id)
+
+        if results is None:
+            raise HTTPException(status_code=404, detail="Hadith not found")
+
+        return SimilarResponse(
+            id=hadith_id,
+            results=[_hadith_result(r) for r in results],
+            took_ms=(time.time() - start_time) * 1000
         )
 
     except HTTPException:
@@ -117,13 +401,36 @@ async def cache_stats() -> CacheStats:
     """
     cache = get_cache()
     stats = cache.stats()
-    return CacheStats(**stats)
+    return CacheStats(
+        **stats,
+        embeddings=get_embedding_cache().stats(),
+        rerank=get_rerank_cache().stats()
+    )
+
+
+@router.get("/metrics", response_model=MetricsResponse)
+async def inference_metrics() -> MetricsResponse:
+    """Get micro-batching metrics of the models and search queue metrics.
+
+    Returns:
+        MetricsResponse with batch size distribution, queueing delay,
+        searches running/queued/rejected and their wait for a worker.
+    """
+    return MetricsResponse(
+        batching=INFERENCE_BATCHING,
+        embedding=get_embedding_batcher().stats(),
+        rerank=get_rerank_batcher().stats(),
+        search=get_search_executor().stats()
+    )
 
 
 @router.post("/cache/clear", response_model=MessageResponse)
 async def clear_cache() -> MessageResponse:
     """Clear the search cache.
 
+    Query embeddings and rerank scores are kept: they depend only on the
+    query text (and hadith), not on the index.
+
     Returns:
         MessageResponse confirming cache cleared.
     """
@@ -14,8 +14,18 @@ INDEX_DIR = DATA_DIR / "index"
 
 # Data files
 HADITHS_JSON = PROCESSED_DIR / "hadiths.json"
+DOC_STORE = INDEX_DIR / "docs"  # Memory-mapped hadith records by doc id
+FILTER_INDEX = INDEX_DIR / "filters"  # Doc ids per book/volume/chapter/narrator
 CHROMA_DIR = INDEX_DIR / "chroma_db"
-BM25_INDEX = INDEX_DIR / "bm25_index.pkl"
+VECTOR_INDEX = INDEX_DIR / "vectors"  # Memory-mapped embedding matrix
+NEIGHBOR_INDEX = INDEX_DIR / "neighbors"  # Precomputed nearest neighbours per hadith
+DUPLICATE_INDEX = INDEX_DIR / "duplicates"  # Near-duplicate cluster ids (MinHash LSH)
+ONNX_EMBEDDING_DIR = INDEX_DIR / "onnx_embedding"  # Int8 ONNX query encoder (scripts/export_onnx.py)
+BM25_INDEX = INDEX_DIR / "bm25"  # Memory-mapped BM25 index directory
+ARABIC_INDEX = INDEX_DIR / "arabic"  # Arabic word and n-gram indices
+SPELLING_INDEX = INDEX_DIR / "spelling"  # Symmetric-delete spelling dictionary
+SUGGEST_INDEX = INDEX_DIR / "suggest"  # Typeahead prefix table
+RERANK_TOKENS_INDEX = INDEX_DIR / "rerank_tokens"  # Reranker token ids per hadith
 
 # Source directories
 BUKHARI_DIR = RAW_DATA_DIR / "bukhari"
@@ -24,19 +34,117 @@ MUSLIM_DIR = RAW_DATA_DIR / "muslim"
 # AI Models
 EMBEDDING_MODEL = "BAAI/bge-base-en-v1.5"    # ~440MB, 768 dimensions
 RERANKER_MODEL = "BAAI/bge-reranker-base"     # ~280MB
+RERANK_MAX_LENGTH = 512        # Cross-encoder input tokens (query + passage + special tokens)
+RERANK_QUERY_MAX_TOKENS = 64   # Query tokens kept for reranking
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "torch")  # Query encoder: "torch" or "onnx"
+ONNX_MIN_COSINE = 0.99  # Export fails if any sample embedding agrees less with PyTorch
 
 # Search parameters
 VECTOR_TOP_K = 30      # Initial vector search candidates
+VECTOR_BACKEND = os.environ.get("VECTOR_BACKEND", "chroma")  # "chroma" (HNSW) or "numpy" (exact)
+VECTOR_QUANTIZATION = os.environ.get("VECTOR_QUANTIZATION", "none")  # numpy first pass: "none", "int8", "binary"
+VECTOR_RESCORE_CANDIDATES = 300  # Quantized first-pass candidates rescored with float vectors
 BM25_TOP_K = 30        # Initial BM25 candidates
 RERANK_TOP_K = 20      # Candidates to rerank
 FINAL_TOP_K = 10       # Results returned to user
 
+# Adaptive reranking: rerank all, a prefix or none of the fused candidates
+# (tune with scripts/tune_rerank.py)
+ADAPTIVE_RERANK = os.environ.get("ADAPTIVE_RERANK", "0") == "1"
+RERANK_AGREEMENT_DEPTH = 5     # Vector/BM25 top results compared for agreement
+RERANK_SKIP_AGREEMENT = 0.8    # Skip reranking: retrievers agree on 4 of their top 5...
+RERANK_SKIP_MARGIN = 0.3       # ...the page leads the next candidate by 30% of the best RRF score...
+RERANK_SKIP_MAX_TOKENS = 3     # ...and the query has at most 3 terms
+RERANK_PREFIX_AGREEMENT = 0.4  # Rerank a prefix: agreement on 2 of 5...
+RERANK_PREFIX_MARGIN = 0.2     # ...or a 20% margin...
+RERANK_PREFIX_MAX_TOKENS = 6   # ...for queries of at most 6 terms
+RERANK_PREFIX_DEPTH = 10       # Candidates reranked on the prefix path
+
+# "More like this" (changing SIMILAR_NEIGHBORS requires re-running ingestion)
+SIMILAR_NEIGHBORS = 50 # Neighbours stored per hadith
+SIMILAR_TOP_K = 10     # Default number of similar hadiths returned
+
+# Near-duplicate clustering (changing these requires re-running ingestion)
+MINHASH_SHINGLE_SIZE = 5       # Words per shingle
+MINHASH_PERMUTATIONS = 128     # MinHash signature length
+LSH_BANDS = 32                 # Bands of 4 signature values each
+DUPLICATE_THRESHOLD = 0.5      # Minimum estimated Jaccard similarity of duplicates
+COLLAPSE_DUPLICATES = False    # Keep one hadith per cluster before reranking (opt-in)
+
+# BM25 parameters (same defaults as rank_bm25.BM25Okapi)
+BM25_K1 = 1.5          # Term frequency saturation
+BM25_B = 0.75          # Document length normalization
+BM25_EPSILON = 0.25    # Idf floor for terms in more than half the documents
+
+# BM25 text analyzer (changing these requires re-running ingestion)
+ANALYZER_STOPWORDS = True        # Drop English stopwords
+ANALYZER_STEMMING = True         # Snowball English stemming
+ANALYZER_TRANSLITERATION = True  # Fold spelling variants (salaat -> salat)
+
+# BM25 scoring backend: "postings" (inverted index) or "sparse" (CSR matmul)
+BM25_BACKEND = os.environ.get("BM25_BACKEND", "postings")
+BM25_BATCH_SIZE = 256  # Queries per sparse matmul in batch scoring
+BM25_PRUNING = True    # MaxScore top-k pruning for the postings backend
+
+# Positional postings (changing BM25_POSITIONS requires re-running ingestion)
+BM25_POSITIONS = True          # Store term positions for phrase/proximity queries
+BM25_PROXIMITY_WEIGHT = 2.0    # Boost for query terms appearing adjacent
+BM25_PROXIMITY_POOL = 100      # Top BM25 candidates rescored for proximity
+
+# Arabic full-text search (changing ARABIC_NGRAM_SIZE requires re-running ingestion)
+ARABIC_NGRAM_SIZE = 3          # Character n-gram length
+ARABIC_NGRAM_WEIGHT = 0.3      # Weight of n-gram scores relative to word scores
+
+# Query spelling correction (dictionary settings require re-running ingestion)
+SPELLING_CORRECTION = True     # Rewrite unknown query words before searching
+SPELLING_MAX_EDIT_DISTANCE = 2 # Maximum edits between a word and its correction
+SPELLING_PREFIX_LENGTH = 7     # Characters expanded into deletes
+SPELLING_MIN_COUNT = 2         # Hadiths a corpus word must appear in
+SPELLING_MIN_WORD_LENGTH = 4   # Shorter query words are never corrected
+SPELLING_MAPPING_COUNT = 1000  # Frequency given to query expansion keys
+
+# Typeahead suggestions
+SUGGEST_LIMIT = 10             # Default number of suggestions
+SUGGEST_MIN_PREFIX = 2         # Shorter prefixes return nothing
+SUGGEST_TERM_WEIGHT = 1000     # Minimum weight of query expansion terms
+
+# First-stage retrieval
+HYBRID_RETRIEVERS = ("vector", "bm25")  # Retrievers fused for English queries
+CONCURRENT_RETRIEVAL = os.environ.get("CONCURRENT_RETRIEVAL", "1") == "1"
+RETRIEVAL_WORKERS = 8  # Threads shared by all searches' retrievers
+
 # RRF Fusion parameter
 RRF_K = 60             # Constant for Reciprocal Rank Fusion
 
 # Cache settings
 CACHE_MAX_SIZE = 10000
 CACHE_TTL_SECONDS = 86400  # 24 hours
+EMBEDDING_CACHE_SIZE = 10000  # Query embeddings kept in memory (~3KB each)
+EMBEDDING_CACHE_PERSIST = os.environ.get("EMBEDDING_CACHE_PERSIST", "0") == "1"
+EMBEDDING_CACHE_DB = DATA_DIR / "cache" / "embeddings.sqlite3"
+EMBEDDING_CACHE_DB_MAX_ROWS = 100000
+RERANK_CACHE_SIZE = 100000  # Cross-encoder scores kept in memory (query, hadith pairs)
+RERANK_CACHE_PERSIST = os.environ.get("RERANK_CACHE_PERSIST", "0") == "1"
+RERANK_CACHE_DB = DATA_DIR / "cache" / "rerank_scores.sqlite3"
+RERANK_CACHE_DB_MAX_ROWS = 1000000
+
+# Cross-request micro-batching of model inference
+INFERENCE_BATCHING = os.environ.get("INFERENCE_BATCHING", "1") == "1"
+EMBED_BATCH_MAX_SIZE = 32      # Queries per embedding forward pass
+EMBED_BATCH_MAX_WAIT_MS = 3.0  # Wait for other requests' queries
+RERANK_BATCH_MAX_SIZE = 64     # (query, passage) pairs per cross-encoder call
+RERANK_BATCH_MAX_WAIT_MS = 3.0 # Wait for other requests' pairs
+
+# Batch search (POST /api/search/batch)
+BATCH_SEARCH_MAX_QUERIES = 1000  # Queries per request
+BATCH_SEARCH_ENCODE_SIZE = 64    # Queries per embedding forward pass
+BATCH_SEARCH_RERANK_SIZE = 64    # (query, passage) pairs per cross-encoder forward pass
+
+# Search admission control (API)
+SEARCH_CONCURRENCY = int(os.environ.get("SEARCH_CONCURRENCY", 8))  # Searches run at once
+SEARCH_QUEUE_MAX = int(os.environ.get("SEARCH_QUEUE_MAX", 32))     # Searches waiting for a worker
+SEARCH_QUEUE_TIMEOUT_S = 5.0   # Queued searches older than this are dropped
+SEARCH_OVERLOAD_STATUS = 503   # HTTP status of rejected searches (503 or 429)
 
 # Server settings
 SERVER_HOST = "0.0.0.0"
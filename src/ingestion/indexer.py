@@ -1,39 +1,57 @@
 """Build search indices from processed hadiths."""
 
-import pickle
+import json
 from pathlib import Path
 from typing import List, Dict, Any
 
 import chromadb
+import numpy as np
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
-from rank_bm25 import BM25Okapi
+from transformers import AutoTokenizer
 
 from src.config import (
     EMBEDDING_MODEL,
+    RERANKER_MODEL,
+    RERANK_MAX_LENGTH,
     EMBEDDING_BATCH_SIZE_CPU,
     CHROMA_DIR,
+    VECTOR_INDEX,
+    NEIGHBOR_INDEX,
+    SIMILAR_NEIGHBORS,
+    DOC_STORE,
+    FILTER_INDEX,
+    DUPLICATE_INDEX,
+    RERANK_TOKENS_INDEX,
     BM25_INDEX,
+    BM25_POSITIONS,
+    ARABIC_INDEX,
+    SPELLING_INDEX,
+    SUGGEST_INDEX,
     CHROMA_COLLECTION,
     HADITHS_JSON
 )
-
-
-def tokenize(text: str) -> List[str]:
-    """Simple tokenizer for BM25.
-
-    Args:
-        text: Text to tokenize.
-
-    Returns:
-        List of lowercase tokens.
-    """
-    return text.lower().split()
+from src.search.analyzer import get_analyzer
+from src.search.arabic_analyzer import get_arabic_analyzer
+from src.search.dense_index import DenseIndex, normalize_rows
+from src.search.doc_store import DocStore, passage_text
+from src.search.duplicates import DuplicateIndex
+from src.search.filters import FilterIndex
+from src.search.neighbors import NeighborIndex
+from src.search.rerank_tokens import RerankTokenStore
+from src.search.spelling import SpellingIndex, dictionary_counts
+from src.search.suggest import SuggestIndex, collect_suggestions
+from src.search.inverted_index import InvertedIndex
+from src.search.storage import replace_directory
 
 
 def build_vector_index(hadiths: List[Dict[str, Any]]) -> None:
     """Build ChromaDB vector index from hadiths.
 
+    The same embeddings are also written to ``VECTOR_INDEX`` as a
+    memory-mapped matrix (plus int8 and binary codes) for the "numpy"
+    vector backend.
+
     Args:
         hadiths: List of hadith records.
     """
@@ -82,6 +100,7 @@ def build_vector_index(hadiths: List[Dict[str, Any]]) -> None:
     # batch_size is already set based on detected device above
     total = len(hadiths)
     total_batches = (total + batch_size - 1) // batch_size
+    all_embeddings = []
 
     for i in range(0, total, batch_size):
         batch = hadiths[i:i + batch_size]
@@ -89,33 +108,22 @@ def build_vector_index(hadiths: List[Dict[str, Any]]) -> None:
 
         ids = [h["id"] for h in batch]
         texts = [h["full_text"] for h in batch]
-        metadatas = [
-            {
-                "book": h["book"],
-                "volume": h["volume"],
-                "chapter": h["chapter"],
-                "hadith_number": h["hadith_number"],
-                "narrator": h["narrator"],
-                "text": h["text"][:1000]  # Truncate for metadata
-            }
-            for h in batch
-        ]
 
         print(f"Embedding batch {batch_num}/{total_batches}")
         sys.stdout.flush()
         
         try:
-            embeddings = model.encode(texts, show_progress_bar=False).tolist()
+            embeddings = model.encode(texts, show_progress_bar=False)
         except Exception as e:
             print(f"Error encoding batch {batch_num}: {e}")
             sys.stdout.flush()
             raise
 
+        all_embeddings.append(np.asarray(embeddings, dtype=np.float32))
+        # Only ids and vectors: text and metadata live in the doc store
         collection.add(
             ids=ids,
-            embeddings=embeddings,
-            metadatas=metadatas,
-            documents=texts
+            embeddings=embeddings.tolist()
         )
         
         # Flush after each batch to ensure logs appear
@@ -126,6 +134,54 @@ def build_vector_index(hadiths: List[Dict[str, Any]]) -> None:
     print(f"Vector index built with {total} hadiths")
     sys.stdout.flush()
 
+    write_dense_index(np.concatenate(all_embeddings), [h["id"] for h in hadiths], VECTOR_INDEX)
+    print(f"Dense vector matrix saved to {VECTOR_INDEX}")
+    sys.stdout.flush()
+
+
+def write_dense_index(embeddings: np.ndarray, hadith_ids: List[str], vector_index: Path) -> None:
+    """Write normalized embeddings as a memory-mapped dense index.
+
+    Args:
+        embeddings: Document embeddings in hadith order, shape (n, dim).
+        hadith_ids: Hadith id per row.
+        vector_index: Output index directory.
+    """
+    built = vector_index.with_name(vector_index.name + ".tmp")
+    built.mkdir(parents=True, exist_ok=True)
+
+    DenseIndex(normalize_rows(embeddings), hadith_ids, EMBEDDING_MODEL).save(built)
+
+    replace_directory(built, vector_index)
+
+
+def write_neighbor_index(vector_index: Path, neighbor_index: Path) -> None:
+    """Compute every hadith's nearest neighbours from the dense index.
+
+    Args:
+        vector_index: Dense index directory written by ``write_dense_index``.
+        neighbor_index: Output index directory.
+    """
+    dense = DenseIndex.load(vector_index)
+    built = neighbor_index.with_name(neighbor_index.name + ".tmp")
+    built.mkdir(parents=True, exist_ok=True)
+
+    NeighborIndex.build(np.asarray(dense.embeddings), SIMILAR_NEIGHBORS, dense.model).save(built)
+
+    replace_directory(built, neighbor_index)
+
+
+def build_neighbor_index(vector_index: Path, neighbor_index: Path) -> None:
+    """Build the "more like this" neighbour table.
+
+    Args:
+        vector_index: Path to dense vector index directory
+        neighbor_index: Path to neighbour index directory
+    """
+    print(f"Computing {SIMILAR_NEIGHBORS} nearest neighbours per hadith...")
+    write_neighbor_index(vector_index, neighbor_index)
+    print("✓ Neighbour table built")
+
 
 def build_chroma_index(hadiths_json: Path, chroma_dir: Path) -> None:
     """Build ChromaDB index from hadiths JSON file.
@@ -134,8 +190,6 @@ def build_chroma_index(hadiths_json: Path, chroma_dir: Path) -> None:
         hadiths_json: Path to hadiths JSON file
         chroma_dir: Path to ChromaDB directory
     """
-    import json
-
     print(f"Loading hadiths from {hadiths_json}...")
     with open(hadiths_json) as f:
         hadiths = json.load(f)
@@ -144,66 +198,328 @@ def build_chroma_index(hadiths_json: Path, chroma_dir: Path) -> None:
     build_vector_index(hadiths)
 
 
+def write_doc_store(hadiths: List[Dict[str, Any]], doc_store: Path) -> None:
+    """Write the document store holding every hadith record once.
+
+    Doc ids follow the order of ``hadiths``, as in every other index.
+
+    Args:
+        hadiths: List of hadith records.
+        doc_store: Output store directory.
+    """
+    built = doc_store.with_name(doc_store.name + ".tmp")
+    built.mkdir(parents=True, exist_ok=True)
+
+    DocStore.write(hadiths, built)
+
+    replace_directory(built, doc_store)
+
+
+def write_filter_index(hadiths: List[Dict[str, Any]], filter_index: Path) -> None:
+    """Write the doc id arrays of every book, volume, chapter and narrator.
+
+    Args:
+        hadiths: List of hadith records.
+        filter_index: Output index directory.
+    """
+    built = filter_index.with_name(filter_index.name + ".tmp")
+    built.mkdir(parents=True, exist_ok=True)
+
+    FilterIndex.build(hadiths).save(built)
+
+    replace_directory(built, filter_index)
+
+
+def write_duplicate_index(hadiths: List[Dict[str, Any]], duplicate_index: Path) -> None:
+    """Cluster near-duplicate narrations with MinHash LSH.
+
+    Args:
+        hadiths: List of hadith records.
+        duplicate_index: Output index directory.
+    """
+    built = duplicate_index.with_name(duplicate_index.name + ".tmp")
+    built.mkdir(parents=True, exist_ok=True)
+
+    DuplicateIndex.build(hadiths).save(built)
+
+    replace_directory(built, duplicate_index)
+
+
+def write_rerank_tokens(hadiths: List[Dict[str, Any]], rerank_tokens: Path) -> None:
+    """Tokenize every passage with the reranker's tokenizer.
+
+    Args:
+        hadiths: List of hadith records.
+        rerank_tokens: Output store directory.
+    """
+    built = rerank_tokens.with_name(rerank_tokens.name + ".tmp")
+    built.mkdir(parents=True, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(RERANKER_MODEL)
+    RerankTokenStore.build(
+        [passage_text(h) for h in hadiths], tokenizer, RERANKER_MODEL, RERANK_MAX_LENGTH
+    ).save(built)
+
+    replace_directory(built, rerank_tokens)
+
+
+def write_bm25_index(hadiths: List[Dict[str, Any]], bm25_index: Path) -> None:
+    """Build the BM25 index and write it as a memory-mappable directory.
+
+    The directory holds only the postings arrays; doc indices are doc store
+    ids. It is built next to the target and swapped in, so running workers
+    keep their existing maps valid.
+
+    Args:
+        hadiths: List of hadith records.
+        bm25_index: Output index directory.
+    """
+    # Analyze all documents straight into interned term ids
+    analyzer = get_analyzer()
+    vocab: Dict[str, int] = {}
+    if BM25_POSITIONS:
+        analyzed = [analyzer.term_ids_with_positions(h["full_text"], vocab) for h in hadiths]
+        index = InvertedIndex.build_from_ids(
+            [ids for ids, _ in analyzed], vocab, analyzer=analyzer.version,
+            doc_positions=[positions for _, positions in analyzed]
+        )
+    else:
+        doc_terms = [analyzer.term_ids(h["full_text"], vocab) for h in hadiths]
+        index = InvertedIndex.build_from_ids(doc_terms, vocab, analyzer=analyzer.version)
+
+    built = bm25_index.with_name(bm25_index.name + ".tmp")
+    built.mkdir(parents=True, exist_ok=True)
+
+    index.save(built)
+
+    replace_directory(built, bm25_index)
+
+
+def write_arabic_index(hadiths: List[Dict[str, Any]], arabic_index: Path) -> None:
+    """Build the Arabic word and n-gram indices over the ``arabic`` field.
+
+    Normalization and stemming happen here, once, so queries only look up
+    postings. Doc indices follow the order of ``hadiths``, like the BM25
+    index.
+
+    Args:
+        hadiths: List of hadith records.
+        arabic_index: Output index directory.
+    """
+    analyzer = get_arabic_analyzer()
+    doc_terms = [analyzer.tokenize(h.get("arabic", "")) for h in hadiths]
+
+    built = arabic_index.with_name(arabic_index.name + ".tmp")
+    (built / "words").mkdir(parents=True, exist_ok=True)
+    (built / "ngrams").mkdir(parents=True, exist_ok=True)
+
+    InvertedIndex.build(doc_terms, analyzer=analyzer.version).save(built / "words")
+    InvertedIndex.build(
+        [analyzer.ngrams(terms) for terms in doc_terms], analyzer=analyzer.version
+    ).save(built / "ngrams")
+
+    replace_directory(built, arabic_index)
+
+
+def write_spelling_index(hadiths: List[Dict[str, Any]], spelling_index: Path) -> None:
+    """Build the symmetric-delete spelling dictionary.
+
+    Args:
+        hadiths: List of hadith records.
+        spelling_index: Output index directory.
+    """
+    built = spelling_index.with_name(spelling_index.name + ".tmp")
+    built.mkdir(parents=True, exist_ok=True)
+
+    SpellingIndex.build(dictionary_counts(hadiths)).save(built)
+
+    replace_directory(built, spelling_index)
+
+
+def write_suggest_index(hadiths: List[Dict[str, Any]], suggest_index: Path) -> None:
+    """Build the typeahead prefix table.
+
+    Args:
+        hadiths: List of hadith records.
+        suggest_index: Output index directory.
+    """
+    built = suggest_index.with_name(suggest_index.name + ".tmp")
+    built.mkdir(parents=True, exist_ok=True)
+
+    SuggestIndex.build(collect_suggestions(hadiths)).save(built)
+
+    replace_directory(built, suggest_index)
+
+
+def build_doc_store(hadiths_json: Path, doc_store: Path) -> None:
+    """Build the document store from hadiths JSON file.
+
+    Args:
+        hadiths_json: Path to hadiths JSON file
+        doc_store: Path to document store directory
+    """
+    print(f"Loading hadiths from {hadiths_json}...")
+    with open(hadiths_json) as f:
+        hadiths = json.load(f)
+    print(f"Loaded {len(hadiths)} hadiths")
+
+    print("Writing document store...")
+    write_doc_store(hadiths, doc_store)
+
+    print(f"✓ Document store written with {len(hadiths)} hadiths")
+
+
+def build_filter_index(hadiths_json: Path, filter_index: Path) -> None:
+    """Build the metadata filter index from hadiths JSON file.
+
+    Args:
+        hadiths_json: Path to hadiths JSON file
+        filter_index: Path to filter index directory
+    """
+    print(f"Loading hadiths from {hadiths_json}...")
+    with open(hadiths_json) as f:
+        hadiths = json.load(f)
+
+    print("Building metadata filter index...")
+    write_filter_index(hadiths, filter_index)
+    print("✓ Metadata filter index built")
+
+
+def build_duplicate_index(hadiths_json: Path, duplicate_index: Path) -> None:
+    """Build the near-duplicate clusters from hadiths JSON file.
+
+    Args:
+        hadiths_json: Path to hadiths JSON file
+        duplicate_index: Path to duplicate index directory
+    """
+    print(f"Loading hadiths from {hadiths_json}...")
+    with open(hadiths_json) as f:
+        hadiths = json.load(f)
+
+    print("Clustering near-duplicate narrations...")
+    write_duplicate_index(hadiths, duplicate_index)
+    print("✓ Near-duplicate clusters built")
+
+
+def build_rerank_tokens(hadiths_json: Path, rerank_tokens: Path) -> None:
+    """Build the reranker token store from hadiths JSON file.
+
+    Args:
+        hadiths_json: Path to hadiths JSON file
+        rerank_tokens: Path to reranker token store directory
+    """
+    print(f"Loading hadiths from {hadiths_json}...")
+    with open(hadiths_json) as f:
+        hadiths = json.load(f)
+
+    print("Tokenizing passages for the reranker...")
+    write_rerank_tokens(hadiths, rerank_tokens)
+    print("✓ Reranker token store built")
+
+
 def build_bm25_index(hadiths_json: Path, bm25_index: Path) -> None:
     """Build BM25 index from hadiths JSON file.
 
     Args:
         hadiths_json: Path to hadiths JSON file
-        bm25_index: Path to BM25 index file
+        bm25_index: Path to BM25 index directory
     """
-    import json
-
     print(f"Loading hadiths from {hadiths_json}...")
     with open(hadiths_json) as f:
         hadiths = json.load(f)
     print(f"Loaded {len(hadiths)} hadiths")
 
-    # Build BM25 index (function below handles the actual indexing)
     print("Building BM25 index...")
+    write_bm25_index(hadiths, bm25_index)
 
-    # Tokenize all documents
-    corpus = [tokenize(h["full_text"]) for h in hadiths]
+    print(f"✓ BM25 index built with {len(hadiths)} hadiths")
 
-    # Build BM25 index
-    bm25 = BM25Okapi(corpus)
 
-    # Save index with hadith IDs
-    index_data = {
-        "bm25": bm25,
-        "hadith_ids": [h["id"] for h in hadiths],
-        "hadiths": {h["id"]: h for h in hadiths}
-    }
+def build_arabic_index(hadiths_json: Path, arabic_index: Path) -> None:
+    """Build Arabic full-text indices from hadiths JSON file.
 
-    bm25_index.parent.mkdir(parents=True, exist_ok=True)
+    Args:
+        hadiths_json: Path to hadiths JSON file
+        arabic_index: Path to Arabic index directory
+    """
+    print(f"Loading hadiths from {hadiths_json}...")
+    with open(hadiths_json) as f:
+        hadiths = json.load(f)
 
-    with open(bm25_index, 'wb') as f:
-        pickle.dump(index_data, f)
+    print("Building Arabic index...")
+    write_arabic_index(hadiths, arabic_index)
+
+    with_arabic = sum(1 for h in hadiths if h.get("arabic"))
+    print(f"✓ Arabic index built ({with_arabic} of {len(hadiths)} hadiths have Arabic text)")
 
-    print(f"✓ BM25 index built with {len(hadiths)} hadiths")
+
+def build_spelling_index(hadiths_json: Path, spelling_index: Path) -> None:
+    """Build the spelling dictionary from hadiths JSON file.
+
+    Args:
+        hadiths_json: Path to hadiths JSON file
+        spelling_index: Path to spelling index directory
+    """
+    print(f"Loading hadiths from {hadiths_json}...")
+    with open(hadiths_json) as f:
+        hadiths = json.load(f)
+
+    print("Building spelling dictionary...")
+    write_spelling_index(hadiths, spelling_index)
+    print("✓ Spelling dictionary built")
+
+
+def build_suggest_index(hadiths_json: Path, suggest_index: Path) -> None:
+    """Build the typeahead suggestion index from hadiths JSON file.
+
+    Args:
+        hadiths_json: Path to hadiths JSON file
+        suggest_index: Path to suggestion index directory
+    """
+    print(f"Loading hadiths from {hadiths_json}...")
+    with open(hadiths_json) as f:
+        hadiths = json.load(f)
+
+    print("Building suggestion index...")
+    write_suggest_index(hadiths, suggest_index)
+    print("✓ Suggestion index built")
 
 
 def build_all_indices() -> None:
     """Build all search indices from processed hadiths."""
-    import json
-
     print("Loading hadiths...")
     with open(HADITHS_JSON) as f:
         hadiths = json.load(f)
     print(f"Loaded {len(hadiths)} hadiths")
 
+    print("Writing document store...")
+    write_doc_store(hadiths, DOC_STORE)
+
+    print("Building metadata filter index...")
+    write_filter_index(hadiths, FILTER_INDEX)
+
+    print("Clustering near-duplicate narrations...")
+    write_duplicate_index(hadiths, DUPLICATE_INDEX)
+
+    print("Tokenizing passages for the reranker...")
+    write_rerank_tokens(hadiths, RERANK_TOKENS_INDEX)
+
     build_vector_index(hadiths)
 
+    print("Computing nearest neighbours...")
+    write_neighbor_index(VECTOR_INDEX, NEIGHBOR_INDEX)
+
     # Build BM25 separately
     print("Building BM25 index...")
-    corpus = [tokenize(h["full_text"]) for h in hadiths]
-    bm25 = BM25Okapi(corpus)
-    index_data = {
-        "bm25": bm25,
-        "hadith_ids": [h["id"] for h in hadiths],
-        "hadiths": {h["id"]: h for h in hadiths}
-    }
-    BM25_INDEX.parent.mkdir(parents=True, exist_ok=True)
-    with open(BM25_INDEX, 'wb') as f:
-        pickle.dump(index_data, f)
+    write_bm25_index(hadiths, BM25_INDEX)
+
+    print("Building Arabic index...")
+    write_arabic_index(hadiths, ARABIC_INDEX)
+
+    print("Building spelling dictionary...")
+    write_spelling_index(hadiths, SPELLING_INDEX)
+
+    print("Building suggestion index...")
+    write_suggest_index(hadiths, SUGGEST_INDEX)
 
     print("All indices built successfully!")
@@ -24,6 +24,9 @@ def convert_hadith(hadith: Dict[str, Any], book_name: str, chapter_english: str)
     # Create full_text for search (narrator + text)
     full_text = f"{narrator} {text}".strip()
 
+    # Original Arabic text (isnad + matn), indexed separately
+    arabic = hadith.get('arabic', '').strip()
+
     # Generate unique ID using book + chapter + hadith number
     book_id = hadith.get('bookId', 1)
     chapter_id = hadith.get('chapterId', 0)
@@ -38,7 +41,8 @@ def convert_hadith(hadith: Dict[str, Any], book_name: str, chapter_english: str)
         "hadith_number": hadith.get('idInBook', hadith.get('id')),
         "narrator": narrator,
         "text": text,
-        "full_text": full_text
+        "full_text": full_text,
+        "arabic": arabic
     }
 
 
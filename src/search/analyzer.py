@@ -0,0 +1,205 @@
+"""Text analyzer shared by BM25 indexing and querying.
+
+Pipeline: Unicode folding (diacritics and apostrophes removed, so "'Umar"
+and "Umar" match) -> lowercase -> split on punctuation -> Islamic
+transliteration folding -> stopword removal -> English stemming.
+
+The analyzer version is recorded in the BM25 index manifest and checked on
+load, so an index is never queried with a different analyzer than the one
+that built it.
+"""
+
+import re
+import unicodedata
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+import snowballstemmer
+
+from src.config import (
+    ANALYZER_STOPWORDS,
+    ANALYZER_STEMMING,
+    ANALYZER_TRANSLITERATION
+)
+
+# Bump when tokenization rules, stopwords or folding tables change
+ANALYZER_VERSION = 1
+
+# Letters and digits; everything else (punctuation, "_") separates tokens
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+# Quote marks used inside transliterated names ('Umar, Qur'an, `Abdullah)
+APOSTROPHES = re.compile(r"['`‘’ʻʼʾʿ]")
+
+STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been
+before being below between both but by can could did do does doing down during
+each few for from further had has have having he her here hers herself him
+himself his how i if in into is it its itself just me more most my myself no
+nor not now of off on once only or other our ours ourselves out over own same
+she should so some such than that the their theirs them themselves then there
+these they this those through to too under until up very was we were what
+when where which while who whom why will with would you your yours yourself
+yourselves
+""".split())
+
+# Common spelling variants of transliterated terms -> canonical form
+TRANSLITERATION_FOLDS = {
+    "salaah": "salah", "salaat": "salat", "namaaz": "namaz",
+    "wudhu": "wudu", "wudoo": "wudu", "wuzu": "wudu", "wudhoo": "wudu",
+    "zakaat": "zakat", "zakah": "zakat", "zakaah": "zakat",
+    "sadaqa": "sadaqah", "sadaka": "sadaqah", "sadqa": "sadaqah",
+    "ramzan": "ramadan", "ramadhan": "ramadan", "ramazan": "ramadan",
+    "jumma": "jumuah", "jummah": "jumuah", "jumah": "jumuah", "jumuaa": "jumuah",
+    "hadees": "hadith", "hadis": "hadith", "ahadith": "hadith",
+    "koran": "quran", "quraan": "quran",
+    "makkah": "mecca", "makka": "mecca", "madinah": "medina", "madina": "medina",
+    "kaabah": "kaaba", "kabah": "kaaba",
+    "saum": "sawm", "siyaam": "siyam",
+    "sehri": "suhoor", "sahoor": "suhoor", "suhur": "suhoor",
+    "sajda": "sajdah", "sujood": "sujud", "rukoo": "ruku",
+    "tahaara": "tahara", "taharah": "tahara",
+    "ghibah": "gheeba", "ghiba": "gheeba",
+    "sabar": "sabr",
+    "nikaah": "nikah",
+}
+
+# Upper bound on memoized words (query text is unbounded)
+MEMO_LIMIT = 200_000
+
+
+class Analyzer:
+    """Configurable tokenizer producing normalized index terms."""
+
+    def __init__(
+        self,
+        stopwords: bool = ANALYZER_STOPWORDS,
+        stemming: bool = ANALYZER_STEMMING,
+        transliteration: bool = ANALYZER_TRANSLITERATION
+    ):
+        """Initialize analyzer.
+
+        Args:
+            stopwords: Drop English stopwords.
+            stemming: Apply the Snowball English stemmer.
+            transliteration: Fold transliteration variants (e.g. salaat).
+        """
+        self.stopwords = stopwords
+        self.stemming = stemming
+        self.transliteration = transliteration
+        self._stemmer = snowballstemmer.stemmer("english") if stemming else None
+        # Word -> term (None for dropped words); the vocabulary is small
+        self._terms: Dict[str, Optional[str]] = {}
+
+    @property
+    def version(self) -> str:
+        """Identifier of the rules and options, stored in the index."""
+        options = [
+            name for name, enabled in (
+                ("stop", self.stopwords),
+                ("stem", self.stemming),
+                ("translit", self.transliteration),
+            ) if enabled
+        ]
+        return f"v{ANALYZER_VERSION}:" + ",".join(options)
+
+    def normalize(self, text: str) -> str:
+        """Strip diacritics and apostrophes, then lowercase."""
+        text = APOSTROPHES.sub("", text)
+        decomposed = unicodedata.normalize("NFKD", text)
+        return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+    def _term(self, word: str) -> Optional[str]:
+        """Map one lowercase word to its index term (memoized)."""
+        term = self._terms.get(word, "")
+        if term != "":
+            return term
+
+        term = word
+        if self.transliteration:
+            term = TRANSLITERATION_FOLDS.get(term, term)
+        if self.stopwords and term in STOPWORDS:
+            term = None
+        elif self._stemmer is not None:
+            term = self._stemmer.stemWord(term)
+
+        if len(self._terms) < MEMO_LIMIT:
+            self._terms[word] = term
+        return term
+
+    def tokenize(self, text: str) -> List[str]:
+        """Analyze text into index terms.
+
+        Args:
+            text: Raw text.
+
+        Returns:
+            List of terms in text order.
+        """
+        terms = (self._term(w) for w in TOKEN_PATTERN.findall(self.normalize(text)))
+        return [t for t in terms if t is not None]
+
+    def tokenize_with_positions(self, text: str) -> List[Tuple[str, int]]:
+        """Analyze text into terms with their word positions.
+
+        Positions count every word, including dropped stopwords, so
+        "rights of neighbors" keeps a gap of two between its terms.
+
+        Args:
+            text: Raw text.
+
+        Returns:
+            List of (term, position) in text order.
+        """
+        words = TOKEN_PATTERN.findall(self.normalize(text))
+        terms = ((self._term(w), i) for i, w in enumerate(words))
+        return [(t, i) for t, i in terms if t is not None]
+
+    def term_ids(self, text: str, vocab: Dict[str, int]) -> np.ndarray:
+        """Analyze text and intern its terms into integer ids.
+
+        New terms are added to ``vocab`` in first-seen order.
+
+        Args:
+            text: Raw text.
+            vocab: Mapping of term to id, extended in place.
+
+        Returns:
+            int32 array of term ids in text order.
+        """
+        ids = [vocab.setdefault(t, len(vocab)) for t in self.tokenize(text)]
+        return np.array(ids, dtype=np.int32)
+
+    def term_ids_with_positions(
+        self,
+        text: str,
+        vocab: Dict[str, int]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Like ``term_ids`` but also return each term's word position.
+
+        Args:
+            text: Raw text.
+            vocab: Mapping of term to id, extended in place.
+
+        Returns:
+            Tuple of (int32 term ids, int32 positions) in text order.
+        """
+        pairs = self.tokenize_with_positions(text)
+        ids = [vocab.setdefault(t, len(vocab)) for t, _ in pairs]
+        return np.array(ids, dtype=np.int32), np.array([i for _, i in pairs], dtype=np.int32)
+
+
+# Lazy-loaded global
+_analyzer: Optional[Analyzer] = None
+
+
+def get_analyzer() -> Analyzer:
+    """Get or create the configured analyzer.
+
+    Returns:
+        Shared Analyzer instance.
+    """
+    global _analyzer
+    if _analyzer is None:
+        _analyzer = Analyzer()
+    return _analyzer
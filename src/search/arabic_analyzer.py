@@ -0,0 +1,155 @@
+"""Arabic text analyzer for the Arabic full-text index.
+
+Pipeline: strip tashkeel (harakat, tanween, shadda, sukun, Quranic marks)
+and tatweel -> fold letter variants (alef forms -> ا, ى -> ي, ة -> ه,
+ؤ -> و, ئ -> ي) -> split on non-Arabic letters -> light prefix stripping
+(و, ال, وال, بال, كال, فال, لل, except in الله).
+
+Words are additionally indexed as character n-grams so that inflected
+forms and partial words still match. Like the English analyzer, the
+version is stored in the index manifest and checked on load.
+"""
+
+import re
+from typing import List, Dict, Optional
+
+from src.config import ARABIC_NGRAM_SIZE
+
+# Bump when normalization, folding or prefix rules change
+ARABIC_ANALYZER_VERSION = 1
+
+# Arabic script letters (used to route queries to the Arabic index)
+ARABIC_LETTERS = re.compile(r"[\u0621-\u064A\u0671]")
+
+# Tashkeel, Quranic annotation marks and tatweel
+DIACRITICS = re.compile(r"[\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06ED\u0640]")
+
+LETTER_FOLDS = str.maketrans({
+    "أ": "ا",
+    "إ": "ا",
+    "آ": "ا",
+    "ٱ": "ا",
+    "ى": "ي",
+    "ة": "ه",
+    "ؤ": "و",
+    "ئ": "ي",
+})
+
+# Runs of (folded) Arabic letters
+TOKEN_PATTERN = re.compile(r"[\u0621-\u064A]+")
+
+# Definite article and attached prepositions, longest first
+PREFIXES = (
+    "وال",
+    "بال",
+    "كال",
+    "فال",
+    "لل",
+    "ال",
+)
+WAW = "و"
+
+# Words whose leading letters are not a prefix (Allah, Allahumma)
+UNSTEMMED = frozenset({"الله", "اللهم", "لله"})
+
+# Shortest stem left after removing a prefix
+MIN_STEM = 2
+
+# Upper bound on memoized words
+MEMO_LIMIT = 200_000
+
+
+def is_arabic(text: str) -> bool:
+    """Check whether text contains Arabic script.
+
+    Args:
+        text: Raw text.
+
+    Returns:
+        True if any Arabic letter is present.
+    """
+    return ARABIC_LETTERS.search(text) is not None
+
+
+class ArabicAnalyzer:
+    """Diacritic-insensitive tokenizer with light stemming and n-grams."""
+
+    def __init__(self, ngram_size: int = ARABIC_NGRAM_SIZE):
+        """Initialize analyzer.
+
+        Args:
+            ngram_size: Character n-gram length for the n-gram index.
+        """
+        self.ngram_size = ngram_size
+        self._terms: Dict[str, str] = {}
+
+    @property
+    def version(self) -> str:
+        """Identifier of the rules and options, stored in the index."""
+        return f"arabic-v{ARABIC_ANALYZER_VERSION}:prefix,ngram{self.ngram_size}"
+
+    def normalize(self, text: str) -> str:
+        """Strip diacritics and tatweel, then fold letter variants."""
+        return DIACRITICS.sub("", text).translate(LETTER_FOLDS)
+
+    def _term(self, word: str) -> str:
+        """Strip attached prefixes from one normalized word (memoized)."""
+        term = self._terms.get(word)
+        if term is not None:
+            return term
+
+        term = word
+        if term.startswith(WAW) and len(term) - 1 > MIN_STEM + 1:
+            term = term[1:]
+        if term not in UNSTEMMED:
+            for prefix in PREFIXES:
+                if term.startswith(prefix) and len(term) - len(prefix) >= MIN_STEM:
+                    term = term[len(prefix):]
+                    break
+
+        if len(self._terms) < MEMO_LIMIT:
+            self._terms[word] = term
+        return term
+
+    def tokenize(self, text: str) -> List[str]:
+        """Analyze text into word terms.
+
+        Args:
+            text: Raw text (non-Arabic characters are ignored).
+
+        Returns:
+            List of terms in text order.
+        """
+        return [self._term(w) for w in TOKEN_PATTERN.findall(self.normalize(text))]
+
+    def ngrams(self, terms: List[str]) -> List[str]:
+        """Split terms into boundary-padded character n-grams.
+
+        Args:
+            terms: Terms from ``tokenize``.
+
+        Returns:
+            List of n-grams, e.g. "#صل", "صلا", "لاه", "اه#" for صلاه.
+        """
+        n = self.ngram_size
+        grams = []
+        for term in terms:
+            padded = f"#{term}#"
+            grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        return grams
+
+
+# Lazy-loaded global
+_arabic_analyzer: Optional[ArabicAnalyzer] = None
+
+
+def get_arabic_analyzer() -> ArabicAnalyzer:
+    """Get or create the Arabic analyzer.
+
+    Returns:
+        Shared ArabicAnalyzer instance.
+    """
+    global _arabic_analyzer
+    if _arabic_analyzer is None:
+        _arabic_analyzer = ArabicAnalyzer()
+    return _arabic_analyzer
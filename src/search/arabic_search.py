@@ -0,0 +1,76 @@
+"""Arabic full-text search over the original hadith text.
+
+Two postings indices are built at ingest from the normalized Arabic text:
+one over light-stemmed words and one over character n-grams of those
+words. A query is normalized the same way and scored against both, so
+query-time work is only postings lookups. Doc indices are doc store ids,
+like the BM25 index.
+"""
+
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+
+from src.config import ARABIC_INDEX, ARABIC_NGRAM_WEIGHT, BM25_TOP_K
+from src.search.arabic_analyzer import get_arabic_analyzer
+from src.search.inverted_index import InvertedIndex, select_top_k
+
+# Lazy-loaded global
+_arabic_data: Optional[Dict] = None
+
+
+def get_arabic_data() -> Dict:
+    """Get or open the Arabic indices (lazy loading).
+
+    Returns:
+        Dict with the "words" and "ngrams" inverted indices.
+    """
+    global _arabic_data
+    if _arabic_data is None:
+        version = get_arabic_analyzer().version
+        _arabic_data = {
+            "words": InvertedIndex.load(ARABIC_INDEX / "words", analyzer=version),
+            "ngrams": InvertedIndex.load(ARABIC_INDEX / "ngrams", analyzer=version)
+        }
+    return _arabic_data
+
+
+def arabic_search(
+    query: str,
+    top_k: int = BM25_TOP_K,
+    mask: Optional[np.ndarray] = None
+) -> List[Tuple[int, float]]:
+    """Search hadiths by their Arabic text.
+
+    The score is the word-level BM25 score plus ``ARABIC_NGRAM_WEIGHT``
+    times the n-gram BM25 score, so exact (normalized) word matches rank
+    first and other inflections of the query words still match.
+
+    Args:
+        query: Query in Arabic script (diacritics optional).
+        top_k: Number of results to return.
+        mask: Optional bool array over doc ids; only hadiths marked True
+            are returned.
+
+    Returns:
+        List of (doc id, score) with positive scores, best first.
+    """
+    analyzer = get_arabic_analyzer()
+    data = get_arabic_data()
+
+    terms = analyzer.tokenize(query)
+    word_docs, word_scores = data["words"].score(terms)
+    gram_docs, gram_scores = data["ngrams"].score(analyzer.ngrams(terms))
+
+    candidates = np.union1d(word_docs, gram_docs)
+    scores = np.zeros(len(candidates), dtype=np.float64)
+    scores[np.searchsorted(candidates, word_docs)] += word_scores
+    scores[np.searchsorted(candidates, gram_docs)] += ARABIC_NGRAM_WEIGHT * gram_scores
+    if mask is not None:
+        keep = mask[candidates]
+        candidates, scores = candidates[keep], scores[keep]
+
+    return [
+        (int(doc), float(score)) for doc, score in select_top_k(candidates, scores, top_k)
+        if score > 0
+    ]
@@ -0,0 +1,242 @@
+"""Cross-request micro-batching of model inference.
+
+Concurrent searches each need one query embedding and ~20 cross-encoder
+scores. Run separately, these are many tiny forward passes. A
+``MicroBatcher`` owns one worker thread per model: callers submit their
+items and block; the worker takes the first waiting request, keeps
+collecting requests for up to ``max_wait_ms`` or until ``max_batch`` items
+are queued, runs the whole collection as one batched call and hands each
+caller its slice of the output.
+"""
+
+import bisect
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from src.config import (
+    INFERENCE_BATCHING,
+    EMBED_BATCH_MAX_SIZE,
+    EMBED_BATCH_MAX_WAIT_MS,
+    RERANK_BATCH_MAX_SIZE,
+    RERANK_BATCH_MAX_WAIT_MS
+)
+
+# Upper bounds of the batch size histogram buckets
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+# Queueing delays kept for percentiles
+DELAY_WINDOW = 1000
+
+
+class MicroBatcher:
+    """Collects items from concurrent callers into batched calls."""
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[List[Any]], Sequence[Any]],
+        max_batch: int,
+        max_wait_ms: float
+    ):
+        """Initialize batcher (the worker thread starts on first use).
+
+        Args:
+            name: Name used for the worker thread.
+            fn: Batched function; returns one output per input item.
+            max_batch: Items per batch; a single larger request still runs
+                alone, unsplit.
+            max_wait_ms: How long the first request of a batch waits for
+                others to join.
+        """
+        self.name = name
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self._queue: "queue.Queue[Tuple[List[Any], Future, float]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        # Request that did not fit the previous batch (worker thread only)
+        self._pending: Optional[Tuple[List[Any], Future, float]] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._items = 0
+        self._max_batch_size = 0
+        self._histogram = [0] * (len(BATCH_SIZE_BUCKETS) + 1)
+        self._delays: Deque[float] = deque(maxlen=DELAY_WINDOW)
+
+    def submit(self, items: List[Any]) -> List[Any]:
+        """Run items through the batched function, sharing a call with others.
+
+        Args:
+            items: Inputs of one caller.
+
+        Returns:
+            Outputs for ``items``, in order.
+
+        Raises:
+            Exception: Whatever the batched function raised.
+        """
+        if not items:
+            return []
+        self._ensure_worker()
+        future: Future = Future()
+        self._queue.put((items, future, time.perf_counter()))
+        return future.result()
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None:
+            with self._start_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(
+                        target=self._run, name=f"{self.name}-batcher", daemon=True
+                    )
+                    self._worker.start()
+
+    def _collect(self) -> List[Tuple[List[Any], Future, float]]:
+        """Block for a request, then gather more until full or timed out."""
+        if self._pending is not None:
+            batch, self._pending = [self._pending], None
+        else:
+            batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = batch[0][2] + self.max_wait_ms / 1000
+        while size < self.max_batch:
+            try:
+                request = self._queue.get(timeout=max(0.0, deadline - time.perf_counter()))
+            except queue.Empty:
+                break
+            if size + len(request[0]) > self.max_batch:
+                # Would overflow: it starts the next batch
+                self._pending = request
+                break
+            batch.append(request)
+            size += len(request[0])
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+            items = [item for request_items, _, _ in batch for item in request_items]
+            try:
+                outputs = self.fn(items)
+            except Exception as e:
+                for _, future, _ in batch:
+                    future.set_exception(e)
+                continue
+            finally:
+                self._record(len(items), [started - queued for _, _, queued in batch])
+
+            start = 0
+            for request_items, future, _ in batch:
+                future.set_result(list(outputs[start:start + len(request_items)]))
+                start += len(request_items)
+
+    def _record(self, size: int, delays: List[float]) -> None:
+        with self._stats_lock:
+            self._batches += 1
+            self._requests += len(delays)
+            self._items += size
+            self._max_batch_size = max(self._max_batch_size, size)
+            self._histogram[bisect.bisect_left(BATCH_SIZE_BUCKETS, size)] += 1
+            self._delays.extend(delay * 1000 for delay in delays)
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch size distribution and queueing delay.
+
+        Returns:
+            Dict with batch, request and item counts, the batch size
+            histogram (items per batch, keyed by bucket upper bound) and
+            queueing delay in ms over the last ``DELAY_WINDOW`` requests.
+        """
+        with self._stats_lock:
+            delays = sorted(self._delays)
+            labels = [str(bound) for bound in BATCH_SIZE_BUCKETS] + [f">{BATCH_SIZE_BUCKETS[-1]}"]
+
+            def percentile(p: float) -> float:
+                return delays[min(len(delays) - 1, int(p * len(delays)))] if delays else 0.0
+
+            return {
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait_ms,
+                "batches": self._batches,
+                "requests": self._requests,
+                "items": self._items,
+                "mean_batch_size": self._items / self._batches if self._batches else 0.0,
+                "max_batch_size": self._max_batch_size,
+                "batch_sizes": dict(zip(labels, self._histogram)),
+                "queue_ms": {
+                    "mean": sum(delays) / len(delays) if delays else 0.0,
+                    "p50": percentile(0.5),
+                    "p95": percentile(0.95),
+                    "max": delays[-1] if delays else 0.0
+                }
+            }
+
+
+# Lazy-created globals
+_embedding_batcher: Optional[MicroBatcher] = None
+_rerank_batcher: Optional[MicroBatcher] = None
+
+
+def _encode(texts: List[str]) -> Sequence[Any]:
+    from src.search.vector_search import get_embedding_model
+    return get_embedding_model().encode(texts, batch_size=len(texts))
+
+
+def _predict(pairs: List[Tuple[List[int], Any]]) -> Sequence[Any]:
+    from src.search.reranker import predict_token_pairs
+    return predict_token_pairs(pairs)
+
+
+def get_embedding_batcher() -> MicroBatcher:
+    """Get or create the query embedding batcher."""
+    global _embedding_batcher
+    if _embedding_batcher is None:
+        _embedding_batcher = MicroBatcher(
+            "embedding", _encode, EMBED_BATCH_MAX_SIZE, EMBED_BATCH_MAX_WAIT_MS
+        )
+    return _embedding_batcher
+
+
+def get_rerank_batcher() -> MicroBatcher:
+    """Get or create the cross-encoder batcher."""
+    global _rerank_batcher
+    if _rerank_batcher is None:
+        _rerank_batcher = MicroBatcher(
+            "rerank", _predict, RERANK_BATCH_MAX_SIZE, RERANK_BATCH_MAX_WAIT_MS
+        )
+    return _rerank_batcher
+
+
+def embed_texts(texts: List[str]) -> List[Any]:
+    """Embed texts, batched with concurrent callers when enabled.
+
+    Args:
+        texts: Texts to embed.
+
+    Returns:
+        One embedding per text.
+    """
+    if not INFERENCE_BATCHING:
+        return list(_encode(texts))
+    return get_embedding_batcher().submit(texts)
+
+
+def score_pairs(pairs: List[Tuple[List[int], Any]]) -> List[float]:
+    """Cross-encoder scores, batched with concurrent callers when enabled.
+
+    Args:
+        pairs: (query token ids, passage token ids) pairs, without special
+            tokens (see ``reranker.predict_token_pairs``).
+
+    Returns:
+        One score per pair.
+    """
+    scores = _predict(pairs) if not INFERENCE_BATCHING else get_rerank_batcher().submit(pairs)
+    return [float(score) for score in scores]
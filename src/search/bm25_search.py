@@ -1,83 +1,255 @@
-"""BM25 keyword search."""
-
-import pickle
-from typing import List, Dict, Any, Optional
-
-from src.config import BM25_INDEX, BM25_TOP_K
+"""BM25 keyword search.
+
+Quoted parts of a query ("breaking fast") must appear as exact phrases, and
+documents where the query terms occur close together get a proximity boost.
+Both use the positional postings of the index, so no document text is
+re-scanned. Results are (doc id, score) pairs; see ``doc_store.hydrate``.
+"""
+
+import re
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np
+
+from src.config import (
+    BM25_INDEX,
+    BM25_TOP_K,
+    BM25_BACKEND,
+    BM25_PRUNING,
+    BM25_PROXIMITY_WEIGHT,
+    BM25_PROXIMITY_POOL
+)
+from src.search.analyzer import get_analyzer
+from src.search.inverted_index import InvertedIndex, select_top_k
+from src.search.sparse_bm25 import SparseBM25
+
+# Text between double quotes is an exact phrase
+PHRASE_PATTERN = re.compile(r'"([^"]+)"')
 
 # Lazy-loaded globals
 _bm25_data: Optional[Dict] = None
+_sparse_bm25: Optional[SparseBM25] = None
 
 
 def get_bm25_data() -> Dict:
-    """Get or load BM25 index data (lazy loading).
+    """Get or open BM25 index data (lazy loading).
+
+    The index directory is memory-mapped, so this is near-instant and the
+    pages are shared by all worker processes.
 
     Returns:
-        Dict with bm25 index, hadith_ids, and hadiths.
+        Dict with the inverted index (doc indices are doc store ids).
     """
     global _bm25_data
     if _bm25_data is None:
-        with open(BM25_INDEX, 'rb') as f:
-            _bm25_data = pickle.load(f)
+        _bm25_data = {
+            "index": InvertedIndex.load(BM25_INDEX, analyzer=get_analyzer().version)
+        }
     return _bm25_data
 
 
-def tokenize(text: str) -> List[str]:
-    """Simple tokenizer for BM25.
+def get_sparse_bm25() -> SparseBM25:
+    """Get or build the sparse matrix BM25 backend (lazy loading).
+
+    Returns:
+        SparseBM25 sharing the inverted index arrays.
+    """
+    global _sparse_bm25
+    if _sparse_bm25 is None:
+        _sparse_bm25 = SparseBM25(get_bm25_data()["index"])
+    return _sparse_bm25
+
+
+def _score_top_k(
+    token_lists: List[List[str]],
+    top_k: int,
+    mask: Optional[np.ndarray] = None
+) -> List[List[Tuple[int, float]]]:
+    """Score tokenized queries with the configured BM25 backend.
+
+    Args:
+        token_lists: Tokenized queries.
+        top_k: Number of results per query.
+        mask: Optional bool array over doc ids; only True documents are
+            selected. Disables pruning (its score bounds ignore the mask).
+
+    Returns:
+        One list of (doc index, score) per query, best first.
+    """
+    if BM25_BACKEND == "sparse":
+        return get_sparse_bm25().top_k_batch(token_lists, top_k, mask)
+    if BM25_BACKEND == "postings":
+        index = get_bm25_data()["index"]
+        if BM25_PRUNING and mask is None:
+            return [index.top_k_pruned(tokens, top_k)[0] for tokens in token_lists]
+        return [index.top_k(tokens, top_k, mask) for tokens in token_lists]
+    raise ValueError(f"Unknown BM25 backend: {BM25_BACKEND}")
+
+
+def extract_phrases(query: str) -> List[str]:
+    """Extract quoted phrases from a query.
+
+    Args:
+        query: Search query.
+
+    Returns:
+        Phrase strings, without quotes.
+    """
+    return [p.strip() for p in PHRASE_PATTERN.findall(query) if p.strip()]
+
+
+def _phrase_docs(query: str) -> Optional[np.ndarray]:
+    """Find documents containing every quoted phrase of a query.
+
+    Args:
+        query: Search query.
+
+    Returns:
+        Ascending doc indices, or None if the query has no phrases with
+        indexed terms (stopword-only phrases constrain nothing) or the index
+        was built without positions.
+    """
+    index = get_bm25_data()["index"]
+    phrases = extract_phrases(query)
+    if not phrases or not index.has_positions:
+        return None
+
+    analyzer = get_analyzer()
+    docs = None
+    for phrase in phrases:
+        terms = analyzer.tokenize_with_positions(phrase)
+        if not terms:
+            continue
+        matches = index.phrase_docs(terms)
+        docs = matches if docs is None else np.intersect1d(docs, matches, assume_unique=True)
+    return docs
+
+
+def _proximity_rescore(
+    top_docs: List[Tuple[int, float]],
+    query: str,
+    top_k: int
+) -> List[Tuple[int, float]]:
+    """Boost candidates whose query terms appear close together.
+
+    Each candidate containing all (2+) distinct query terms gets
+    ``BM25_PROXIMITY_WEIGHT * n_terms / span`` added, where span is the
+    shortest window covering every term (so adjacent terms get the full
+    weight).
+
+    Args:
+        top_docs: BM25 candidates, best first.
+        query: Query whose terms are used for proximity.
+        top_k: Number of results to keep.
+
+    Returns:
+        Rescored (doc index, score) list, best first.
+    """
+    index = get_bm25_data()["index"]
+    term_ids = list(dict.fromkeys(index.term_ids(get_analyzer().tokenize(query))))
+    if len(term_ids) < 2 or not index.has_positions:
+        return top_docs[:top_k]
+
+    spans = index.min_spans(np.array([doc for doc, _ in top_docs]), term_ids).tolist()
+    rescored = []
+    for (doc, score), span in zip(top_docs, spans):
+        if span and score > 0:
+            score += BM25_PROXIMITY_WEIGHT * len(term_ids) / span
+        rescored.append((doc, score))
+    rescored.sort(key=lambda item: (-item[1], item[0]))
+    return rescored[:top_k]
+
+
+def filter_phrase_matches(
+    results: List[Tuple[int, float]],
+    query: str
+) -> List[Tuple[int, float]]:
+    """Keep only results whose hadith contains every quoted phrase of a query.
+
+    Used to apply phrase constraints to results from other retrievers.
 
     Args:
-        text: Text to tokenize.
+        results: (doc id, score) pairs.
+        query: Search query.
 
     Returns:
-        List of lowercase tokens.
+        Matching results, in input order.
     """
-    return text.lower().split()
+    docs = _phrase_docs(query)
+    if docs is None:
+        return results
 
+    allowed = set(docs.tolist())
+    return [(doc, score) for doc, score in results if doc in allowed]
 
-def bm25_search(query: str, top_k: int = BM25_TOP_K) -> List[Dict[str, Any]]:
+
+def bm25_search(
+    query: str,
+    top_k: int = BM25_TOP_K,
+    original_query: Optional[str] = None,
+    mask: Optional[np.ndarray] = None
+) -> List[Tuple[int, float]]:
     """Search hadiths using BM25 keyword matching.
 
     Args:
         query: Search query.
         top_k: Number of results to return.
+        original_query: Query as typed by the user, if ``query`` was
+            expanded; its quoted phrases and term proximity are used.
+        mask: Optional bool array over doc ids (see ``filters.filter_mask``);
+            only hadiths marked True are returned.
+
+    Returns:
+        List of (doc id, score) with positive scores, best first.
+    """
+    original = [original_query] if original_query is not None else None
+    return bm25_search_batch([query], top_k=top_k, original_queries=original, mask=mask)[0]
+
+
+def bm25_search_batch(
+    queries: List[str],
+    top_k: int = BM25_TOP_K,
+    original_queries: Optional[List[str]] = None,
+    mask: Optional[np.ndarray] = None
+) -> List[List[Tuple[int, float]]]:
+    """Search hadiths for many queries at once.
+
+    With the sparse backend the whole batch is scored by one sparse matmul
+    per chunk instead of one pass per query. Queries with quoted phrases
+    are scored on the postings index and restricted to phrase matches; the
+    top ``BM25_PROXIMITY_POOL`` candidates of multi-term queries are then
+    rescored for term proximity. A filter mask is applied while selecting
+    candidates, so filtered queries still get ``top_k`` results.
+
+    Args:
+        queries: Search queries.
+        top_k: Number of results per query.
+        original_queries: Unexpanded query per entry of ``queries``
+            (defaults to ``queries``).
+        mask: Optional bool array over doc ids, shared by all queries.
 
     Returns:
-        List of search results with scores.
+        One list of (doc id, score) per query, in input order.
     """
-    data = get_bm25_data()
-    bm25 = data["bm25"]
-    hadith_ids = data["hadith_ids"]
-    hadiths = data["hadiths"]
-
-    # Tokenize query
-    query_tokens = tokenize(query)
-
-    # Get BM25 scores for all documents
-    scores = bm25.get_scores(query_tokens)
-
-    # Get top k results
-    scored_indices = sorted(
-        range(len(scores)),
-        key=lambda i: scores[i],
-        reverse=True
-    )[:top_k]
-
-    # Format results
-    search_results = []
-    for idx in scored_indices:
-        if scores[idx] > 0:  # Only include positive scores
-            hadith_id = hadith_ids[idx]
-            hadith = hadiths[hadith_id]
-
-            search_results.append({
-                "id": hadith_id,
-                "score": float(scores[idx]),
-                "book": hadith.get("book", ""),
-                "volume": hadith.get("volume", 0),
-                "chapter": hadith.get("chapter", ""),
-                "hadith_number": hadith.get("hadith_number", 0),
-                "narrator": hadith.get("narrator", ""),
-                "text": hadith.get("text", "")
-            })
-
-    return search_results
+    if original_queries is None:
+        original_queries = queries
+
+    analyzer = get_analyzer()
+    index = get_bm25_data()["index"]
+    token_lists = [analyzer.tokenize(query) for query in queries]
+    pool = max(top_k, BM25_PROXIMITY_POOL) if index.has_positions else top_k
+
+    results = []
+    for tokens, top_docs, original in zip(
+        token_lists, _score_top_k(token_lists, pool, mask), original_queries
+    ):
+        phrase_docs = _phrase_docs(original)
+        if phrase_docs is not None:
+            candidates, scores = index.score(tokens)
+            keep = np.isin(candidates, phrase_docs, assume_unique=True)
+            if mask is not None:
+                keep &= mask[candidates]
+            top_docs = select_top_k(candidates[keep], scores[keep], pool)
+        rescored = _proximity_rescore(top_docs, original, top_k)
+        results.append([(int(doc), float(score)) for doc, score in rescored if score > 0])
+    return results
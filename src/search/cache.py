@@ -1,12 +1,22 @@
-"""Simple in-memory cache with TTL for search results."""
+"""In-memory caches: search results (TTL), query embeddings and rerank scores (LRU)."""
 
+import json
 import re
+import sqlite3
+import threading
 import time
-from typing import Dict, Any, Optional, List
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Tuple
+
+import numpy as np
 
 
 class SearchCache:
-    """In-memory cache for search results with TTL and LRU eviction."""
+    """In-memory cache for search results with TTL and LRU eviction.
+
+    Thread-safe: searches run concurrently on the search executor.
+    """
 
     def __init__(self, max_size: int = 10000, ttl_seconds: int = 86400):
         """Initialize cache.
@@ -20,6 +30,7 @@ class SearchCache:
         self._cache: Dict[str, Dict[str, Any]] = {}
         self._hits = 0
         self._misses = 0
+        self._lock = threading.Lock()
 
     def _normalize_query(self, query: str) -> str:
         """Normalize query for consistent cache keys.
@@ -32,12 +43,27 @@ class SearchCache:
         """
         # Lowercase
         normalized = query.lower()
-        # Remove punctuation
-        normalized = re.sub(r'[^\w\s]', '', normalized)
+        # Remove punctuation (quotes are kept: they mark phrase queries)
+        normalized = re.sub(r'[^\w\s"]', '', normalized)
         # Normalize whitespace
         normalized = ' '.join(normalized.split())
         return normalized
 
+    def _make_key(self, query: str, filters: Optional[Dict[str, List[Any]]]) -> str:
+        """Cache key of a query and its metadata filters.
+
+        Args:
+            query: Raw query string.
+            filters: Search filters, or None.
+
+        Returns:
+            Cache key.
+        """
+        key = self._normalize_query(query)
+        if filters:
+            key += "\x00" + json.dumps(filters, sort_keys=True, ensure_ascii=False)
+        return key
+
     def _is_expired(self, entry: Dict[str, Any]) -> bool:
         """Check if cache entry is expired.
 
@@ -50,7 +76,7 @@ class SearchCache:
         return time.time() - entry["timestamp"] > self.ttl_seconds
 
     def _evict_oldest(self) -> None:
-        """Remove oldest entry when cache is full."""
+        """Remove oldest entry when cache is full (caller holds the lock)."""
         if not self._cache:
             return
 
@@ -60,73 +86,374 @@ class SearchCache:
         )
         del self._cache[oldest_key]
 
-    def get(self, query: str) -> Optional[List[Dict[str, Any]]]:
+    def get(
+        self,
+        query: str,
+        filters: Optional[Dict[str, List[Any]]] = None
+    ) -> Optional[List[Dict[str, Any]]]:
         """Get cached results for a query.
 
         Args:
             query: Search query.
+            filters: Metadata filters the results were searched with.
 
         Returns:
             Cached results or None if not found/expired.
         """
-        key = self._normalize_query(query)
+        key = self._make_key(query, filters)
 
-        if key in self._cache:
-            entry = self._cache[key]
-            if not self._is_expired(entry):
-                self._hits += 1
-                return entry["results"]
-            else:
-                # Remove expired entry
-                del self._cache[key]
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                if not self._is_expired(entry):
+                    self._hits += 1
+                    return entry["results"]
+                else:
+                    # Remove expired entry
+                    del self._cache[key]
 
-        self._misses += 1
-        return None
+            self._misses += 1
+            return None
 
-    def set(self, query: str, results: List[Dict[str, Any]]) -> None:
+    def set(
+        self,
+        query: str,
+        results: List[Dict[str, Any]],
+        filters: Optional[Dict[str, List[Any]]] = None
+    ) -> None:
         """Cache results for a query.
 
         Args:
             query: Search query.
             results: Search results to cache.
+            filters: Metadata filters the results were searched with.
         """
-        key = self._normalize_query(query)
+        key = self._make_key(query, filters)
 
-        # Evict if at capacity
-        if len(self._cache) >= self.max_size and key not in self._cache:
-            self._evict_oldest()
+        with self._lock:
+            # Evict if at capacity
+            if len(self._cache) >= self.max_size and key not in self._cache:
+                self._evict_oldest()
 
-        self._cache[key] = {
-            "results": results,
-            "timestamp": time.time()
-        }
+            self._cache[key] = {
+                "results": results,
+                "timestamp": time.time()
+            }
 
     def clear(self) -> None:
         """Clear all cached entries."""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics.
+
+        Returns:
+            Dict with cache stats.
+        """
+        with self._lock:
+            total = self._hits + self._misses
+            hit_rate = self._hits / total if total > 0 else 0.0
+
+            return {
+                "size": len(self._cache),
+                "max_size": self.max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": hit_rate
+            }
+
+
+class EmbeddingCache:
+    """LRU cache of query embeddings, optionally persisted to SQLite.
+
+    Keys are the exact text passed to the embedding model, so entries stay
+    valid when results are invalidated (cache clear, new ``top_k``, index
+    rebuild). Persisted rows are also keyed by the model, so a model change
+    never returns stale vectors.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        model: str = "",
+        db_path: Optional[Path] = None,
+        db_max_rows: int = 100000
+    ):
+        """Initialize cache.
+
+        Args:
+            max_size: Maximum number of embeddings kept in memory.
+            model: Identifier of the model producing the embeddings.
+            db_path: SQLite file for persistence; memory only if None.
+            db_max_rows: Rows kept in the SQLite file (oldest are pruned).
+        """
+        self.max_size = max_size
+        self.model = model
+        self.db_path = db_path
+        self.db_max_rows = db_max_rows
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
         self._hits = 0
+        self._disk_hits = 0
         self._misses = 0
+        self._writes = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path is not None:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                "model TEXT NOT NULL, text TEXT NOT NULL, vector BLOB NOT NULL, "
+                "created REAL NOT NULL, PRIMARY KEY (model, text))"
+            )
+            self._db.commit()
+
+    def _remember(self, text: str, embedding: np.ndarray) -> None:
+        """Insert into the in-memory LRU (caller holds the lock)."""
+        self._cache[text] = embedding
+        self._cache.move_to_end(text)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Get the cached embedding for a text.
+
+        Args:
+            text: Exact model input.
+
+        Returns:
+            Read-only float32 embedding, or None if not cached.
+        """
+        with self._lock:
+            embedding = self._cache.get(text)
+            if embedding is not None:
+                self._cache.move_to_end(text)
+                self._hits += 1
+                return embedding
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT vector FROM embeddings WHERE model = ? AND text = ?",
+                    (self.model, text)
+                ).fetchone()
+                if row is not None:
+                    embedding = np.frombuffer(row[0], dtype=np.float32)
+                    self._remember(text, embedding)
+                    self._disk_hits += 1
+                    return embedding
+
+            self._misses += 1
+            return None
+
+    def set(self, text: str, embedding: np.ndarray) -> np.ndarray:
+        """Cache the embedding for a text.
+
+        Args:
+            text: Exact model input.
+            embedding: Model output.
+
+        Returns:
+            The cached read-only float32 copy.
+        """
+        embedding = np.array(embedding, dtype=np.float32).ravel()
+        embedding.setflags(write=False)
+
+        with self._lock:
+            self._remember(text, embedding)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?, ?)",
+                    (self.model, text, embedding.tobytes(), time.time())
+                )
+                self._writes += 1
+                if self._writes % 1000 == 0:
+                    self._db.execute(
+                        "DELETE FROM embeddings WHERE rowid NOT IN "
+                        "(SELECT rowid FROM embeddings ORDER BY created DESC LIMIT ?)",
+                        (self.db_max_rows,)
+                    )
+                self._db.commit()
+        return embedding
+
+    def clear(self) -> None:
+        """Clear in-memory entries and counters (persisted rows are kept)."""
+        with self._lock:
+            self._cache.clear()
+            self._hits = 0
+            self._disk_hits = 0
+            self._misses = 0
 
     def stats(self) -> Dict[str, Any]:
         """Get cache statistics.
 
         Returns:
-            Dict with cache stats.
+            Dict with cache stats. ``hits`` includes ``disk_hits``.
         """
-        total = self._hits + self._misses
-        hit_rate = self._hits / total if total > 0 else 0.0
+        with self._lock:
+            hits = self._hits + self._disk_hits
+            total = hits + self._misses
+            return {
+                "size": len(self._cache),
+                "max_size": self.max_size,
+                "hits": hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": hits / total if total > 0 else 0.0,
+                "persistent": self._db is not None
+            }
 
-        return {
-            "size": len(self._cache),
-            "max_size": self.max_size,
-            "hits": self._hits,
-            "misses": self._misses,
-            "hit_rate": hit_rate
-        }
 
+class RerankScoreCache:
+    """LRU cache of cross-encoder scores per (query, hadith), optionally on SQLite.
+
+    Popular hadiths are candidates for many similar queries and are
+    reranked again after every result cache expiry; their scores depend
+    only on the query text, the hadith and the reranker model. Persisted
+    rows are also keyed by the model.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 100000,
+        model: str = "",
+        db_path: Optional[Path] = None,
+        db_max_rows: int = 1000000
+    ):
+        """Initialize cache.
+
+        Args:
+            max_size: Maximum number of scores kept in memory.
+            model: Identifier of the reranker model.
+            db_path: SQLite file for persistence; memory only if None.
+            db_max_rows: Rows kept in the SQLite file (oldest are pruned).
+        """
+        self.max_size = max_size
+        self.model = model
+        self.db_path = db_path
+        self.db_max_rows = db_max_rows
+        self._cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._writes = 0
+
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path is not None:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS rerank_scores ("
+                "model TEXT NOT NULL, query TEXT NOT NULL, hadith_id TEXT NOT NULL, "
+                "score REAL NOT NULL, created REAL NOT NULL, "
+                "PRIMARY KEY (model, query, hadith_id))"
+            )
+            self._db.commit()
+
+    def _remember(self, key: Tuple[str, str], score: float) -> None:
+        """Insert into the in-memory LRU (caller holds the lock)."""
+        self._cache[key] = score
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def get_many(self, query: str, hadith_ids: List[str]) -> Dict[str, float]:
+        """Get cached scores of a query against several hadiths.
+
+        Args:
+            query: Exact query text given to the reranker.
+            hadith_ids: Candidate hadith ids.
+
+        Returns:
+            Hadith id -> score for the cached pairs only.
+        """
+        with self._lock:
+            scores = {}
+            for hadith_id in hadith_ids:
+                score = self._cache.get((query, hadith_id))
+                if score is not None:
+                    self._cache.move_to_end((query, hadith_id))
+                    scores[hadith_id] = score
+            self._hits += len(scores)
 
-# Global cache instance
+            missing = [hadith_id for hadith_id in hadith_ids if hadith_id not in scores]
+            if self._db is not None and missing:
+                rows = self._db.execute(
+                    "SELECT hadith_id, score FROM rerank_scores WHERE model = ? AND query = ? "
+                    f"AND hadith_id IN ({', '.join('?' * len(missing))})",
+                    (self.model, query, *missing)
+                ).fetchall()
+                for hadith_id, score in rows:
+                    self._remember((query, hadith_id), score)
+                    scores[hadith_id] = score
+                self._disk_hits += len(rows)
+
+            self._misses += len(hadith_ids) - len(scores)
+            return scores
+
+    def set_many(self, query: str, scores: Dict[str, float]) -> None:
+        """Cache the scores of a query against several hadiths.
+
+        Args:
+            query: Exact query text given to the reranker.
+            scores: Hadith id -> cross-encoder score.
+        """
+        with self._lock:
+            for hadith_id, score in scores.items():
+                self._remember((query, hadith_id), score)
+            if self._db is not None and scores:
+                now = time.time()
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO rerank_scores VALUES (?, ?, ?, ?, ?)",
+                    [(self.model, query, hadith_id, score, now) for hadith_id, score in scores.items()]
+                )
+                self._writes += 1
+                if self._writes % 1000 == 0:
+                    self._db.execute(
+                        "DELETE FROM rerank_scores WHERE rowid NOT IN "
+                        "(SELECT rowid FROM rerank_scores ORDER BY created DESC LIMIT ?)",
+                        (self.db_max_rows,)
+                    )
+                self._db.commit()
+
+    def clear(self) -> None:
+        """Clear in-memory entries and counters (persisted rows are kept)."""
+        with self._lock:
+            self._cache.clear()
+            self._hits = 0
+            self._disk_hits = 0
+            self._misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics (counted per query-hadith pair).
+
+        Returns:
+            Dict with cache stats. ``hits`` includes ``disk_hits``.
+        """
+        with self._lock:
+            hits = self._hits + self._disk_hits
+            total = hits + self._misses
+            return {
+                "size": len(self._cache),
+                "max_size": self.max_size,
+                "hits": hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": hits / total if total > 0 else 0.0,
+                "persistent": self._db is not None
+            }
+
+
+# Global cache instances
 _cache: Optional[SearchCache] = None
+_embedding_cache: Optional[EmbeddingCache] = None
+_rerank_cache: Optional[RerankScoreCache] = None
 
 
 def get_cache() -> SearchCache:
@@ -136,3 +463,44 @@ def get_cache() -> SearchCache:
         from src.config import CACHE_MAX_SIZE, CACHE_TTL_SECONDS
         _cache = SearchCache(max_size=CACHE_MAX_SIZE, ttl_seconds=CACHE_TTL_SECONDS)
     return _cache
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create global query embedding cache instance."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        from src.config import (
+            EMBEDDING_MODEL,
+            EMBEDDING_BACKEND,
+            EMBEDDING_CACHE_SIZE,
+            EMBEDDING_CACHE_PERSIST,
+            EMBEDDING_CACHE_DB,
+            EMBEDDING_CACHE_DB_MAX_ROWS
+        )
+        _embedding_cache = EmbeddingCache(
+            max_size=EMBEDDING_CACHE_SIZE,
+            model=f"{EMBEDDING_MODEL}:{EMBEDDING_BACKEND}",
+            db_path=EMBEDDING_CACHE_DB if EMBEDDING_CACHE_PERSIST else None,
+            db_max_rows=EMBEDDING_CACHE_DB_MAX_ROWS
+        )
+    return _embedding_cache
+
+
+def get_rerank_cache() -> RerankScoreCache:
+    """Get or create global rerank score cache instance."""
+    global _rerank_cache
+    if _rerank_cache is None:
+        from src.config import (
+            RERANKER_MODEL,
+            RERANK_CACHE_SIZE,
+            RERANK_CACHE_PERSIST,
+            RERANK_CACHE_DB,
+            RERANK_CACHE_DB_MAX_ROWS
+        )
+        _rerank_cache = RerankScoreCache(
+            max_size=RERANK_CACHE_SIZE,
+            model=RERANKER_MODEL,
+            db_path=RERANK_CACHE_DB if RERANK_CACHE_PERSIST else None,
+            db_max_rows=RERANK_CACHE_DB_MAX_ROWS
+        )
+    return _rerank_cache
@@ -0,0 +1,316 @@
+"""Exact in-process vector index over a memory-mapped embedding matrix.
+
+Embeddings are L2-normalized float32 rows, so cosine similarity is one
+matrix-vector product followed by ``argpartition``. At ~15k x 768 (45MB)
+the scan is bound by memory bandwidth, returns exact results (no HNSW
+recall loss) and the matrix is shared by all worker processes through the
+OS page cache. Rows are in hadiths.json order, like the BM25 index.
+
+The index also stores two quantized copies of the matrix: int8 codes with
+a per-dimension scale (4x smaller) and 1-bit sign codes (32x smaller).
+With quantization enabled, a query scans the codes instead (int8 dot
+product or Hamming distance), keeps the best ``rescore`` candidates and
+rescores only those rows with the float vectors, so the float file is
+read a few hundred rows at a time.
+"""
+
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.search.storage import (
+    save_array,
+    load_array,
+    write_manifest,
+    read_manifest,
+    write_string_table,
+    StringTable
+)
+
+# On-disk format written by DenseIndex.save
+INDEX_FORMAT = "dense-vectors"
+INDEX_FORMAT_VERSION = 2
+
+# First-pass representations
+QUANTIZATIONS = ("none", "int8", "binary")
+
+# Rows dequantized per block in the int8 scan (keeps the block in cache)
+INT8_BLOCK_ROWS = 256
+
+# SWAR popcount masks for 64-bit words
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0F0F0F0F0F0F0F0F)
+_H01 = np.uint64(0x0101010101010101)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize vectors to float32 unit length.
+
+    Args:
+        vectors: Array of shape (n, dim) or (dim,).
+
+    Returns:
+        float32 array of unit rows (zero rows are left as zeros).
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, np.finfo(np.float32).tiny)
+
+
+def quantize_int8(embeddings: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric int8 scalar quantization with one scale per dimension.
+
+    Args:
+        embeddings: float32 matrix, shape (n, dim).
+
+    Returns:
+        Tuple of (int8 codes, float32 scales) with
+        ``embeddings ~= codes * scales``.
+    """
+    scales = np.abs(embeddings).max(axis=0) / 127
+    scales = np.maximum(scales, np.finfo(np.float32).tiny).astype(np.float32)
+    codes = np.clip(np.rint(embeddings / scales), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+def binarize(vectors: np.ndarray) -> np.ndarray:
+    """Pack the sign bits of vectors into 64-bit words.
+
+    Args:
+        vectors: Array of shape (n, dim) or (dim,).
+
+    Returns:
+        uint64 array of shape (n, ceil(dim / 64)) or (ceil(dim / 64),),
+        zero-padded.
+    """
+    bits = np.packbits(np.asarray(vectors) > 0, axis=-1)
+    pad = -bits.shape[-1] % 8
+    if pad:
+        bits = np.concatenate([bits, np.zeros(bits.shape[:-1] + (pad,), dtype=np.uint8)], axis=-1)
+    return np.ascontiguousarray(bits).view(np.uint64)
+
+
+def hamming_distances(codes: np.ndarray, query_code: np.ndarray) -> np.ndarray:
+    """Hamming distance from one packed code to each row of codes.
+
+    Args:
+        codes: uint64 codes from ``binarize``, shape (n, words).
+        query_code: uint64 code, shape (words,).
+
+    Returns:
+        int64 bit distances, shape (n,).
+    """
+    x = codes ^ query_code
+    x -= (x >> np.uint64(1)) & _M1
+    x = (x & _M2) + ((x >> np.uint64(2)) & _M2)
+    x = (x + (x >> np.uint64(4))) & _M4
+    return ((x * _H01) >> np.uint64(56)).sum(axis=1, dtype=np.int64)
+
+
+class DenseIndex:
+    """Brute-force cosine similarity index with optional quantized first pass."""
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        hadith_ids: Sequence[str],
+        model: str = "",
+        quantization: str = "none",
+        rescore: int = 0,
+        int8_codes: Optional[np.ndarray] = None,
+        int8_scales: Optional[np.ndarray] = None,
+        binary_codes: Optional[np.ndarray] = None
+    ):
+        """Initialize index.
+
+        Args:
+            embeddings: float32 matrix of unit rows, shape (n_docs, dim).
+            hadith_ids: Hadith id per row.
+            model: Name of the embedding model that produced the rows.
+            quantization: First-pass representation, one of ``QUANTIZATIONS``.
+            rescore: Candidates kept by the first pass for float rescoring.
+            int8_codes: int8 codes; computed from embeddings if omitted.
+            int8_scales: Per-dimension int8 scales.
+            binary_codes: Packed sign codes; computed if omitted.
+        """
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown vector quantization: {quantization}")
+        if int8_codes is None:
+            int8_codes, int8_scales = quantize_int8(embeddings)
+        if binary_codes is None:
+            binary_codes = binarize(embeddings)
+
+        self.embeddings = embeddings
+        self.hadith_ids = hadith_ids
+        self.model = model
+        self.quantization = quantization
+        self.rescore = rescore
+        self.int8_codes = int8_codes
+        self.int8_scales = int8_scales
+        self.binary_codes = binary_codes
+
+    @property
+    def num_docs(self) -> int:
+        """Number of indexed documents."""
+        return self.embeddings.shape[0]
+
+    def save(self, directory: Path) -> None:
+        """Write the index as ``.npy`` arrays, an id table and a manifest.
+
+        Args:
+            directory: Existing, empty output directory.
+        """
+        save_array(directory, "embeddings", self.embeddings)
+        save_array(directory, "int8_codes", self.int8_codes)
+        save_array(directory, "int8_scales", self.int8_scales)
+        save_array(directory, "binary_codes", self.binary_codes)
+        write_string_table(directory, "hadith_ids", list(self.hadith_ids))
+        write_manifest(directory, {
+            "format": INDEX_FORMAT,
+            "version": INDEX_FORMAT_VERSION,
+            "model": self.model,
+            "num_docs": self.num_docs,
+            "dim": int(self.embeddings.shape[1])
+        })
+
+    @classmethod
+    def load(
+        cls,
+        directory: Path,
+        model: Optional[str] = None,
+        quantization: str = "none",
+        rescore: int = 0
+    ) -> "DenseIndex":
+        """Open an index written by ``save`` without reading it into memory.
+
+        Args:
+            directory: Index directory.
+            model: Expected embedding model; checked when given.
+            quantization: First-pass representation, one of ``QUANTIZATIONS``.
+            rescore: Candidates kept by the first pass for float rescoring.
+
+        Returns:
+            DenseIndex backed by read-only memory maps.
+
+        Raises:
+            ValueError: If the directory holds a different format version or
+                was built with a different model.
+        """
+        manifest = read_manifest(directory, INDEX_FORMAT, INDEX_FORMAT_VERSION)
+        if model is not None and manifest.get("model") != model:
+            raise ValueError(
+                f"Vector index at {directory} was built with {manifest.get('model')!r} "
+                f"but the configured model is {model!r}. Rebuild it with scripts/ingest.py"
+            )
+        return cls(
+            load_array(directory, "embeddings"),
+            StringTable(directory, "hadith_ids"),
+            manifest.get("model", ""),
+            quantization,
+            rescore,
+            load_array(directory, "int8_codes"),
+            load_array(directory, "int8_scales"),
+            load_array(directory, "binary_codes")
+        )
+
+    def approximate_scores(self, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """First-pass scores from the quantized codes (higher is better).
+
+        Args:
+            query: Normalized query embedding.
+            rows: Doc indices to score; all documents if None.
+
+        Returns:
+            float32 scores per row: the dequantized dot product for int8,
+            minus the Hamming distance for binary.
+        """
+        if self.quantization == "binary":
+            codes = self.binary_codes if rows is None else self.binary_codes[rows]
+            return -hamming_distances(codes, binarize(query)).astype(np.float32)
+
+        codes = self.int8_codes if rows is None else self.int8_codes[rows]
+        scaled_query = (query * self.int8_scales).astype(np.float32)
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), INT8_BLOCK_ROWS):
+            block = codes[start:start + INT8_BLOCK_ROWS].astype(np.float32)
+            scores[start:start + len(block)] = block @ scaled_query
+        return scores
+
+    def top_k(
+        self,
+        query: np.ndarray,
+        k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float]]:
+        """Return the k most similar documents.
+
+        Args:
+            query: Query embedding (normalized here).
+            k: Number of results.
+            mask: Optional bool array over documents; only True rows can
+                be returned.
+
+        Returns:
+            List of (doc index, cosine similarity), best first. Similarities
+            are always computed from the float vectors.
+        """
+        query = normalize_rows(query)
+        candidates = None if mask is None else np.flatnonzero(mask)
+        num_candidates = self.num_docs if candidates is None else len(candidates)
+
+        if self.quantization != "none" and num_candidates > max(k, self.rescore):
+            approximate = self.approximate_scores(query, candidates)
+            keep = np.argpartition(-approximate, max(k, self.rescore) - 1)[:max(k, self.rescore)]
+            keep = np.sort(keep) if candidates is None else np.sort(candidates[keep])
+            return self._select(self.embeddings[keep] @ query, keep, k)
+
+        if candidates is None:
+            return self._select(self.embeddings @ query, None, k)
+        return self._select(self.embeddings[candidates] @ query, candidates, k)
+
+    def top_k_batch(
+        self,
+        queries: np.ndarray,
+        k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> List[List[Tuple[int, float]]]:
+        """Return the k most similar documents for each query.
+
+        Without quantization the float matrix is read once for the whole
+        batch; with quantization each query runs its own first pass.
+
+        Args:
+            queries: Query embeddings, shape (n_queries, dim).
+            k: Number of results per query.
+            mask: Optional bool array over documents; only True rows can
+                be returned.
+
+        Returns:
+            One list of (doc index, cosine similarity) per query, best first.
+        """
+        if self.quantization != "none":
+            return [self.top_k(query, k, mask) for query in queries]
+
+        embeddings, candidates = self.embeddings, None
+        if mask is not None:
+            candidates = np.flatnonzero(mask)
+            embeddings = embeddings[candidates]
+        scores = normalize_rows(queries) @ embeddings.T
+        return [self._select(row, candidates, k) for row in scores]
+
+    @staticmethod
+    def _select(
+        scores: np.ndarray,
+        candidates: Optional[np.ndarray],
+        k: int
+    ) -> List[Tuple[int, float]]:
+        """Top k of one score row (ties broken by doc index)."""
+        k = min(k, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        docs = top if candidates is None else candidates[top]
+        order = np.lexsort((docs, -scores[top]))
+        return list(zip(docs[order].tolist(), scores[top][order].astype(float).tolist()))
@@ -0,0 +1,178 @@
+"""Read-only document store shared by every search stage.
+
+Each hadith is stored once, as a compact JSON record in a memory-mapped
+offsets + blob string table, addressed by its integer doc id (its position
+in hadiths.json, which is also its doc index in the BM25, Arabic and dense
+vector indices). Retrievers, fusion and reranking pass around only
+(doc id, score) pairs; results are hydrated from the store once, for the
+final ``top_k``.
+"""
+
+import json
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+from src.config import DOC_STORE
+from src.search.storage import (
+    write_manifest,
+    read_manifest,
+    write_string_table,
+    write_lookup,
+    StringTable,
+    MappedLookup
+)
+
+# On-disk format written by DocStore.write
+INDEX_FORMAT = "doc-store"
+INDEX_FORMAT_VERSION = 1
+
+# Derived fields not stored (full_text is narrator + text)
+DERIVED_FIELDS = ("full_text",)
+
+
+def passage_text(hadith: Dict[str, Any]) -> str:
+    """Text the reranker scores for a hadith: narrator line and text.
+
+    Args:
+        hadith: Hadith record.
+
+    Returns:
+        Passage text.
+    """
+    return f"{hadith.get('narrator', '')} {hadith.get('text', '')}"
+
+
+class DocStore:
+    """Hadith records by integer doc id."""
+
+    def __init__(self, records: StringTable, hadith_ids: StringTable, lookup: MappedLookup):
+        """Initialize store.
+
+        Args:
+            records: JSON record per doc id.
+            hadith_ids: Hadith id per doc id.
+            lookup: Hadith id -> doc id.
+        """
+        self.records = records
+        self.hadith_ids = hadith_ids
+        self.lookup = lookup
+
+    @staticmethod
+    def write(hadiths: List[Dict[str, Any]], directory: Path) -> None:
+        """Write records, ids and the id lookup.
+
+        Args:
+            hadiths: Hadith records; doc ids follow their order.
+            directory: Existing, empty output directory.
+        """
+        records = [
+            json.dumps(
+                {k: v for k, v in h.items() if k not in DERIVED_FIELDS},
+                ensure_ascii=False,
+                separators=(",", ":")
+            )
+            for h in hadiths
+        ]
+        write_string_table(directory, "records", records)
+        write_string_table(directory, "hadith_ids", [h["id"] for h in hadiths])
+        write_lookup(directory, "hadith_lookup", {h["id"]: i for i, h in enumerate(hadiths)})
+        write_manifest(directory, {
+            "format": INDEX_FORMAT,
+            "version": INDEX_FORMAT_VERSION,
+            "num_docs": len(hadiths)
+        })
+
+    @classmethod
+    def load(cls, directory: Path) -> "DocStore":
+        """Open a store written by ``write`` without reading it into memory.
+
+        Args:
+            directory: Store directory.
+
+        Returns:
+            DocStore backed by read-only memory maps.
+        """
+        read_manifest(directory, INDEX_FORMAT, INDEX_FORMAT_VERSION)
+        return cls(
+            StringTable(directory, "records"),
+            StringTable(directory, "hadith_ids"),
+            MappedLookup(directory, "hadith_lookup")
+        )
+
+    def __len__(self) -> int:
+        return len(self.hadith_ids)
+
+    def doc_id(self, hadith_id: str) -> Optional[int]:
+        """Doc id of a hadith id, or None if unknown."""
+        return self.lookup.get(hadith_id)
+
+    def get(self, doc: int) -> Dict[str, Any]:
+        """Full hadith record of a doc id."""
+        record = json.loads(self.records[doc])
+        record["full_text"] = f"{record.get('narrator', '')} {record.get('text', '')}".strip()
+        return record
+
+    def passage(self, doc: int) -> str:
+        """Text used for reranking: narrator line and full hadith text."""
+        return passage_text(json.loads(self.records[doc]))
+
+
+# Lazy-loaded global
+_doc_store: Optional[DocStore] = None
+
+
+def get_doc_store() -> DocStore:
+    """Get or open the document store (lazy loading).
+
+    Returns:
+        DocStore over the memory-mapped records.
+    """
+    global _doc_store
+    if _doc_store is None:
+        _doc_store = DocStore.load(DOC_STORE)
+    return _doc_store
+
+
+def get_hadith(hadith_id: str) -> Optional[Dict[str, Any]]:
+    """Get a single hadith record by ID.
+
+    Args:
+        hadith_id: Unique hadith identifier.
+
+    Returns:
+        Hadith record, or None if not found.
+    """
+    store = get_doc_store()
+    doc = store.doc_id(hadith_id)
+    if doc is None:
+        return None
+    return store.get(doc)
+
+
+def hydrate(scored: List[Tuple[int, float]]) -> List[Dict[str, Any]]:
+    """Turn (doc id, score) pairs into search results.
+
+    Args:
+        scored: Ranked (doc id, score) pairs.
+
+    Returns:
+        List of search results with scores and hadith metadata, in order.
+    """
+    store = get_doc_store()
+
+    search_results = []
+    for doc, score in scored:
+        hadith = store.get(doc)
+        search_results.append({
+            "id": hadith["id"],
+            "score": float(score),
+            "book": hadith.get("book", ""),
+            "volume": hadith.get("volume", 0),
+            "chapter": hadith.get("chapter", ""),
+            "hadith_number": hadith.get("hadith_number", 0),
+            "narrator": hadith.get("narrator", ""),
+            "text": hadith.get("text", ""),
+            "arabic": hadith.get("arabic", "")
+        })
+
+    return search_results
@@ -0,0 +1,287 @@
+"""Near-duplicate narrations grouped with MinHash LSH.
+
+At ingest, every hadith's ``full_text`` is split into word shingles and
+summarized by a MinHash signature (the minimum of ``num_perm`` universal
+hashes over its shingles); two signatures agree in a position with
+probability equal to the Jaccard similarity of the shingle sets. The
+signature is cut into bands and hadiths whose band values collide are
+candidate pairs, so clustering is linear in the number of hadiths instead
+of comparing all pairs. Candidates are accepted when their estimated
+similarity reaches the threshold with every member of both clusters
+(complete linkage), and accepted pairs are merged into clusters identified
+by their smallest doc id.
+"""
+
+import re
+import zlib
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from src.config import (
+    DUPLICATE_INDEX,
+    MINHASH_SHINGLE_SIZE,
+    MINHASH_PERMUTATIONS,
+    LSH_BANDS,
+    DUPLICATE_THRESHOLD
+)
+from src.search.doc_store import get_doc_store, hydrate
+from src.search.storage import save_array, load_array, write_manifest, read_manifest
+
+# On-disk format written by DuplicateIndex.save
+INDEX_FORMAT = "near-duplicates"
+INDEX_FORMAT_VERSION = 2
+
+WORD_PATTERN = re.compile(r"\w+")
+
+# Universal hashing (a * x + b) mod p, with p the Mersenne prime 2^61 - 1
+_PRIME = np.uint64((1 << 61) - 1)
+
+
+def shingle_hashes(text: str, size: int = MINHASH_SHINGLE_SIZE) -> np.ndarray:
+    """crc32 hashes of the distinct word shingles of a text.
+
+    Args:
+        text: Text to shingle (lowercased, punctuation ignored).
+        size: Words per shingle; shorter texts are one shingle.
+
+    Returns:
+        uint64 array of shingle hashes (empty for a text without words).
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    hashes = {
+        zlib.crc32(" ".join(words[i:i + size]).encode("utf-8"))
+        for i in range(max(1, len(words) - size + 1))
+    } if words else set()
+    return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+
+def minhash_signatures(
+    texts: List[str],
+    num_perm: int = MINHASH_PERMUTATIONS,
+    shingle_size: int = MINHASH_SHINGLE_SIZE,
+    seed: int = 0
+) -> np.ndarray:
+    """MinHash signature of every text.
+
+    Args:
+        texts: Texts to sign.
+        num_perm: Hash functions (signature length).
+        shingle_size: Words per shingle.
+        seed: Seed of the hash function parameters.
+
+    Returns:
+        uint32 array of shape (len(texts), num_perm). Texts without words
+        get all-max signatures and are never grouped.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 2**31 - 1, size=num_perm, dtype=np.uint64)[:, None]
+    b = rng.integers(0, 2**31 - 1, size=num_perm, dtype=np.uint64)[:, None]
+
+    signatures = np.full((len(texts), num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+    for doc, text in enumerate(texts):
+        hashes = shingle_hashes(text, shingle_size)
+        if len(hashes):
+            # a < 2^31 and hashes < 2^32, so a * x + b fits in 64 bits
+            permuted = (a * hashes + b) % _PRIME
+            signatures[doc] = (permuted & np.uint64(0xFFFFFFFF)).min(axis=1)
+    return signatures
+
+
+def lsh_clusters(signatures: np.ndarray, bands: int, threshold: float) -> np.ndarray:
+    """Group documents with similar signatures.
+
+    Documents sharing all values of a band land in one bucket. Each bucket
+    member's cluster is merged with the cluster of the bucket's first
+    document when every pair of documents across the two clusters agrees in
+    at least ``threshold`` of the signature positions (complete linkage), so
+    chains of slightly different texts never merge into one large cluster.
+
+    Args:
+        signatures: MinHash signatures, one row per doc id.
+        bands: Bands the signature is cut into (must divide its length).
+        threshold: Minimum estimated Jaccard similarity.
+
+    Returns:
+        int32 cluster id per doc id: the smallest doc id of its cluster.
+    """
+    num_docs, num_perm = signatures.shape
+    rows = num_perm // bands
+    parent = list(range(num_docs))
+    # Members of each cluster, by root
+    members: Dict[int, List[int]] = {}
+
+    def find(doc: int) -> int:
+        while parent[doc] != doc:
+            parent[doc] = parent[parent[doc]]
+            doc = parent[doc]
+        return doc
+
+    def linked(x: int, y: int) -> bool:
+        # Lowest agreement over all pairs across the two clusters
+        left = signatures[members.get(x, [x])]
+        right = signatures[members.get(y, [y])]
+        return float(np.mean(left[:, None] == right[None], axis=2).min()) >= threshold
+
+    empty = np.all(signatures == np.iinfo(np.uint32).max, axis=1)
+    for band in range(bands):
+        keys = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        buckets: Dict[bytes, List[int]] = {}
+        for doc in np.flatnonzero(~empty).tolist():
+            buckets.setdefault(keys[doc].tobytes(), []).append(doc)
+
+        for docs in buckets.values():
+            first = docs[0]
+            for doc in docs[1:]:
+                x, y = find(first), find(doc)
+                if x == y:
+                    continue
+                if linked(x, y):
+                    root, other = min(x, y), max(x, y)
+                    parent[other] = root
+                    members[root] = members.pop(root, [root]) + members.pop(other, [other])
+
+    return np.array([find(doc) for doc in range(num_docs)], dtype=np.int32)
+
+
+class DuplicateIndex:
+    """Cluster id per doc id, with the members of each cluster."""
+
+    def __init__(self, cluster_ids: np.ndarray, signatures: np.ndarray):
+        """Initialize index from prebuilt arrays.
+
+        Args:
+            cluster_ids: Cluster id (smallest member doc id) per doc id.
+            signatures: MinHash signatures, used to score parallels.
+        """
+        self.cluster_ids = cluster_ids
+        self.signatures = signatures
+        # Doc ids grouped by cluster (ascending within a cluster)
+        self.members = np.argsort(cluster_ids, kind="stable").astype(np.int32)
+        self.member_clusters = cluster_ids[self.members]
+
+    @classmethod
+    def build(
+        cls,
+        hadiths: List[Dict[str, Any]],
+        num_perm: int = MINHASH_PERMUTATIONS,
+        bands: int = LSH_BANDS,
+        threshold: float = DUPLICATE_THRESHOLD
+    ) -> "DuplicateIndex":
+        """Sign and cluster hadith records.
+
+        Args:
+            hadiths: Hadith records in doc id order.
+            num_perm: MinHash signature length.
+            bands: LSH bands.
+            threshold: Minimum estimated Jaccard similarity of duplicates.
+
+        Returns:
+            Built DuplicateIndex.
+        """
+        signatures = minhash_signatures([h.get("full_text", "") for h in hadiths], num_perm)
+        return cls(lsh_clusters(signatures, bands, threshold), signatures)
+
+    def save(self, directory: Path) -> None:
+        """Write the cluster column, signatures and a manifest.
+
+        Args:
+            directory: Existing, empty output directory.
+        """
+        save_array(directory, "cluster_ids", self.cluster_ids)
+        save_array(directory, "signatures", self.signatures)
+        sizes = np.bincount(self.cluster_ids)
+        write_manifest(directory, {
+            "format": INDEX_FORMAT,
+            "version": INDEX_FORMAT_VERSION,
+            "num_docs": int(len(self.cluster_ids)),
+            "num_clusters": int(np.count_nonzero(sizes)),
+            "duplicated_docs": int(sizes[sizes > 1].sum())
+        })
+
+    @classmethod
+    def load(cls, directory: Path) -> "DuplicateIndex":
+        """Open an index written by ``save``.
+
+        Args:
+            directory: Index directory.
+
+        Returns:
+            DuplicateIndex backed by read-only memory maps.
+        """
+        read_manifest(directory, INDEX_FORMAT, INDEX_FORMAT_VERSION)
+        return cls(load_array(directory, "cluster_ids"), load_array(directory, "signatures"))
+
+    def cluster(self, doc: int) -> np.ndarray:
+        """Doc ids in the same cluster as a document (including it)."""
+        cluster_id = self.cluster_ids[doc]
+        lo = np.searchsorted(self.member_clusters, cluster_id, side="left")
+        hi = np.searchsorted(self.member_clusters, cluster_id, side="right")
+        return self.members[lo:hi]
+
+    def parallels(self, doc: int) -> List[Tuple[int, float]]:
+        """Other documents of a document's cluster.
+
+        Args:
+            doc: Doc id.
+
+        Returns:
+            List of (doc id, estimated Jaccard similarity), most similar first.
+        """
+        others = self.cluster(doc)
+        others = others[others != doc]
+        similarity = np.mean(self.signatures[others] == self.signatures[doc], axis=1)
+        order = np.lexsort((others, -similarity))
+        return list(zip(others[order].tolist(), similarity[order].astype(float).tolist()))
+
+    def collapse(self, scored: List[Tuple[int, float]]) -> List[Tuple[int, float]]:
+        """Keep only the best-ranked document of each cluster.
+
+        Args:
+            scored: Ranked (doc id, score) pairs.
+
+        Returns:
+            The pairs whose cluster was not seen earlier, in input order.
+        """
+        seen = set()
+        collapsed = []
+        for doc, score in scored:
+            cluster_id = int(self.cluster_ids[doc])
+            if cluster_id not in seen:
+                seen.add(cluster_id)
+                collapsed.append((doc, score))
+        return collapsed
+
+
+# Lazy-loaded global
+_duplicate_index: Optional[DuplicateIndex] = None
+
+
+def get_duplicate_index() -> DuplicateIndex:
+    """Get or open the near-duplicate clusters (lazy loading).
+
+    Returns:
+        DuplicateIndex over the memory-mapped cluster column.
+    """
+    global _duplicate_index
+    if _duplicate_index is None:
+        _duplicate_index = DuplicateIndex.load(DUPLICATE_INDEX)
+    return _duplicate_index
+
+
+def parallel_hadiths(hadith_id: str) -> Optional[List[Dict[str, Any]]]:
+    """Near-duplicate narrations of a hadith.
+
+    Args:
+        hadith_id: Unique hadith identifier.
+
+    Returns:
+        Search results (score is the estimated Jaccard similarity of their
+        word shingles), most similar first, or None if the hadith is
+        unknown.
+    """
+    doc = get_doc_store().doc_id(hadith_id)
+    if doc is None:
+        return None
+    return hydrate(get_duplicate_index().parallels(doc))
@@ -0,0 +1,221 @@
+"""Metadata filters (book, volume, chapter, narrator) as precomputed id sets.
+
+At ingest, the sorted doc ids of every field value are stored back to back
+(CSR layout: a sorted value table plus offsets into one doc id array). A
+filter is turned into a boolean document mask with set operations: values
+of one field are OR-ed, fields are AND-ed. Retrievers apply the mask while
+selecting their top k, so a filtered query still returns a full ``top_k``.
+"""
+
+import bisect
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from src.config import FILTER_INDEX
+from src.search.analyzer import get_analyzer
+from src.search.storage import (
+    save_array,
+    load_array,
+    write_manifest,
+    read_manifest,
+    write_string_table,
+    StringTable
+)
+from src.search.suggest import narrator_name
+
+# On-disk format written by FilterIndex.save
+INDEX_FORMAT = "metadata-filters"
+INDEX_FORMAT_VERSION = 1
+
+# Filterable fields
+FIELDS = ("book", "volume", "chapter", "narrator")
+
+
+def filter_key(value: Any) -> str:
+    """Normalize a field value for matching (case, diacritics, spacing).
+
+    Args:
+        value: Field value as stored or as given in a filter.
+
+    Returns:
+        Normalized key.
+    """
+    return " ".join(get_analyzer().normalize(str(value)).split())
+
+
+def field_value(hadith: Dict[str, Any], field: str) -> Optional[str]:
+    """Filter value of one hadith for a field.
+
+    Args:
+        hadith: Hadith record.
+        field: One of ``FIELDS``.
+
+    Returns:
+        Raw value, or None if the hadith has none (e.g. an unparsed
+        narrator line).
+    """
+    if field == "narrator":
+        return narrator_name(hadith.get("narrator", ""))
+    value = hadith.get(field)
+    return None if value in (None, "") else str(value)
+
+
+class FilterIndex:
+    """Sorted doc id arrays per field value."""
+
+    def __init__(
+        self,
+        num_docs: int,
+        values: Dict[str, Sequence[str]],
+        offsets: Dict[str, np.ndarray],
+        docs: Dict[str, np.ndarray]
+    ):
+        """Initialize index from prebuilt arrays.
+
+        Args:
+            num_docs: Number of documents (mask length).
+            values: Sorted value keys per field.
+            offsets: Start of each value's doc ids per field (plus end).
+            docs: Concatenated ascending doc ids per field.
+        """
+        self.num_docs = num_docs
+        self.values = values
+        self.offsets = offsets
+        self.docs = docs
+
+    @classmethod
+    def build(cls, hadiths: List[Dict[str, Any]]) -> "FilterIndex":
+        """Build the id arrays from hadith records.
+
+        Args:
+            hadiths: Hadith records in doc id order.
+
+        Returns:
+            Built FilterIndex.
+        """
+        values, offsets, docs = {}, {}, {}
+        for field in FIELDS:
+            postings: Dict[str, List[int]] = {}
+            for doc, hadith in enumerate(hadiths):
+                value = field_value(hadith, field)
+                if value is not None:
+                    postings.setdefault(filter_key(value), []).append(doc)
+
+            keys = sorted(postings)
+            values[field] = keys
+            offsets[field] = np.zeros(len(keys) + 1, dtype=np.int64)
+            np.cumsum([len(postings[k]) for k in keys], out=offsets[field][1:])
+            docs[field] = np.array(
+                [doc for k in keys for doc in postings[k]], dtype=np.int32
+            )
+        return cls(len(hadiths), values, offsets, docs)
+
+    def save(self, directory: Path) -> None:
+        """Write the index as string tables, ``.npy`` arrays and a manifest.
+
+        Args:
+            directory: Existing, empty output directory.
+        """
+        for field in FIELDS:
+            write_string_table(directory, f"{field}_values", list(self.values[field]))
+            save_array(directory, f"{field}_doc_offsets", self.offsets[field])
+            save_array(directory, f"{field}_docs", self.docs[field])
+        write_manifest(directory, {
+            "format": INDEX_FORMAT,
+            "version": INDEX_FORMAT_VERSION,
+            "num_docs": self.num_docs,
+            "num_values": {field: len(self.values[field]) for field in FIELDS}
+        })
+
+    @classmethod
+    def load(cls, directory: Path) -> "FilterIndex":
+        """Open an index written by ``save`` without reading it into memory.
+
+        Args:
+            directory: Index directory.
+
+        Returns:
+            FilterIndex backed by read-only memory maps.
+        """
+        manifest = read_manifest(directory, INDEX_FORMAT, INDEX_FORMAT_VERSION)
+        return cls(
+            manifest["num_docs"],
+            {field: StringTable(directory, f"{field}_values") for field in FIELDS},
+            {field: load_array(directory, f"{field}_doc_offsets") for field in FIELDS},
+            {field: load_array(directory, f"{field}_docs") for field in FIELDS}
+        )
+
+    def doc_ids(self, field: str, value: Any) -> np.ndarray:
+        """Ascending doc ids having a field value.
+
+        Args:
+            field: One of ``FIELDS``.
+            value: Value to match (normalized with ``filter_key``).
+
+        Returns:
+            Doc ids (empty if the value does not occur).
+        """
+        keys = self.values[field]
+        key = filter_key(value)
+        lo = bisect.bisect_left(keys, key)
+        if lo == len(keys) or keys[lo] != key:
+            return np.zeros(0, dtype=np.int32)
+        return self.docs[field][self.offsets[field][lo]:self.offsets[field][lo + 1]]
+
+    def mask(self, filters: Optional[Dict[str, List[Any]]]) -> Optional[np.ndarray]:
+        """Combine filters into a document mask.
+
+        Args:
+            filters: Field -> accepted values. Values of a field are OR-ed,
+                fields are AND-ed; empty lists are ignored.
+
+        Returns:
+            Bool array over doc ids, or None if nothing is filtered.
+
+        Raises:
+            ValueError: If a field is not filterable.
+        """
+        mask = None
+        for field, values in (filters or {}).items():
+            if not values:
+                continue
+            if field not in FIELDS:
+                raise ValueError(f"Unknown filter field: {field}")
+
+            field_mask = np.zeros(self.num_docs, dtype=bool)
+            for value in values:
+                field_mask[self.doc_ids(field, value)] = True
+            mask = field_mask if mask is None else mask & field_mask
+        return mask
+
+
+# Lazy-loaded global
+_filter_index: Optional[FilterIndex] = None
+
+
+def get_filter_index() -> FilterIndex:
+    """Get or open the filter index (lazy loading).
+
+    Returns:
+        FilterIndex over the memory-mapped id arrays.
+    """
+    global _filter_index
+    if _filter_index is None:
+        _filter_index = FilterIndex.load(FILTER_INDEX)
+    return _filter_index
+
+
+def filter_mask(filters: Optional[Dict[str, List[Any]]]) -> Optional[np.ndarray]:
+    """Document mask for search filters.
+
+    Args:
+        filters: Field -> accepted values, or None.
+
+    Returns:
+        Bool array over doc ids, or None if nothing is filtered.
+    """
+    if not filters or not any(filters.values()):
+        return None
+    return get_filter_index().mask(filters)
@@ -1,114 +1,330 @@
 """Hybrid search combining vector and BM25 with RRF fusion."""
 
 import time
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 
-from src.config import VECTOR_TOP_K, BM25_TOP_K, RERANK_TOP_K, FINAL_TOP_K, RRF_K
+import numpy as np
+
+from src.config import (
+    HYBRID_RETRIEVERS,
+    RERANK_TOP_K,
+    FINAL_TOP_K,
+    RRF_K,
+    COLLAPSE_DUPLICATES,
+    SPELLING_CORRECTION
+)
 from src.search.query_expansion import expand_query
-from src.search.vector_search import vector_search
-from src.search.bm25_search import bm25_search
-from src.search.reranker import rerank_results
+from src.search.retrievers import run_retrievers, run_retrievers_batch
+from src.search.arabic_analyzer import is_arabic
+from src.search.arabic_search import arabic_search
+from src.search.spelling import correct_query
+from src.search.rerank_policy import rerank_decision
+from src.search.reranker import rerank_results, rerank_results_batch
+from src.search.doc_store import hydrate
+from src.search.duplicates import get_duplicate_index
+from src.search.filters import filter_mask
 from src.search.cache import get_cache
 
 
 def reciprocal_rank_fusion(
-    vector_results: List[Dict[str, Any]],
-    bm25_results: List[Dict[str, Any]],
+    *result_lists: List[Tuple[int, float]],
     k: int = RRF_K
-) -> List[Dict[str, Any]]:
+) -> List[Tuple[int, float]]:
     """Combine results using Reciprocal Rank Fusion.
 
     RRF formula: score(doc) = Σ 1/(k + rank)
 
     Args:
-        vector_results: Results from vector search.
-        bm25_results: Results from BM25 search.
+        *result_lists: Ranked (doc id, score) lists, e.g. from vector and
+            BM25 search.
         k: RRF parameter (default 60).
 
     Returns:
-        Combined and scored results.
+        (doc id, RRF score) pairs, best first.
     """
     # Calculate RRF scores
-    rrf_scores: Dict[str, float] = {}
-    result_data: Dict[str, Dict[str, Any]] = {}
-
-    # Process vector results
-    for rank, result in enumerate(vector_results, start=1):
-        hadith_id = result["id"]
-        rrf_scores[hadith_id] = rrf_scores.get(hadith_id, 0) + 1 / (k + rank)
-        result_data[hadith_id] = result
-
-    # Process BM25 results
-    for rank, result in enumerate(bm25_results, start=1):
-        hadith_id = result["id"]
-        rrf_scores[hadith_id] = rrf_scores.get(hadith_id, 0) + 1 / (k + rank)
-        if hadith_id not in result_data:
-            result_data[hadith_id] = result
+    rrf_scores: Dict[int, float] = {}
+    for results in result_lists:
+        for rank, (doc, _) in enumerate(results, start=1):
+            rrf_scores[doc] = rrf_scores.get(doc, 0) + 1 / (k + rank)
 
     # Sort by RRF score
-    sorted_ids = sorted(rrf_scores.keys(), key=lambda x: rrf_scores[x], reverse=True)
+    return sorted(rrf_scores.items(), key=lambda item: item[1], reverse=True)
 
-    # Build result list
-    combined_results = []
-    for hadith_id in sorted_ids:
-        result = result_data[hadith_id].copy()
-        result["rrf_score"] = rrf_scores[hadith_id]
-        combined_results.append(result)
 
-    return combined_results
+def _arabic_results(query: str, top_k: int, mask: Optional[np.ndarray]) -> List[Dict[str, Any]]:
+    """Hydrated Arabic index results, scaled so the best match is 1.0."""
+    scored = arabic_search(query, top_k=top_k, mask=mask)
+    best = scored[0][1] if scored else 1.0
+    return hydrate([(doc, score / best) for doc, score in scored])
 
 
 def hybrid_search(
     query: str,
     top_k: int = FINAL_TOP_K,
-    use_cache: bool = True
+    use_cache: bool = True,
+    info: Optional[Dict[str, Any]] = None,
+    filters: Optional[Dict[str, List[Any]]] = None,
+    collapse_duplicates: Optional[bool] = None
 ) -> Tuple[List[Dict[str, Any]], str, bool, float]:
     """Perform hybrid search with query expansion, RRF fusion, and reranking.
 
+    Queries in Arabic script are routed to the Arabic full-text index
+    instead (the embedding and reranker models are English-only). Unknown
+    English words are spell-corrected before searching. Metadata filters
+    are applied inside every retriever's top-k selection.
+
     Args:
         query: User search query.
         top_k: Number of results to return.
         use_cache: Whether to use caching.
+        info: Optional dict filled with search details: "did_you_mean"
+            (corrected query) and "corrections" (word -> correction) when
+            the query was rewritten, and "rerank" (path taken, depth and
+            signals; see ``rerank_policy``) when results were reranked,
+            and "timings" (milliseconds per stage: each retriever,
+            "retrieval" for all of them, "rerank").
+        filters: Optional field -> accepted values ("book", "volume",
+            "chapter", "narrator"); values of a field are OR-ed, fields
+            are AND-ed.
+        collapse_duplicates: Keep only the best-ranked hadith of each
+            near-duplicate cluster before reranking (defaults to
+            ``COLLAPSE_DUPLICATES``). Results are only cached for the
+            default.
 
     Returns:
         Tuple of (results, expanded_query, cached, took_ms).
+
+    Raises:
+        ValueError: If a filter field is unknown.
+    """
+    for _, results, expanded_query, cached, took_ms in hybrid_search_stages(
+        query, top_k, use_cache, info, filters, collapse_duplicates, preview=False
+    ):
+        pass
+    return results, expanded_query, cached, took_ms
+
+
+def hybrid_search_stages(
+    query: str,
+    top_k: int = FINAL_TOP_K,
+    use_cache: bool = True,
+    info: Optional[Dict[str, Any]] = None,
+    filters: Optional[Dict[str, List[Any]]] = None,
+    collapse_duplicates: Optional[bool] = None,
+    preview: bool = True
+) -> Iterator[Tuple[str, List[Dict[str, Any]], str, bool, float]]:
+    """Run ``hybrid_search`` stage by stage, yielding results as they firm up.
+
+    With ``preview``, the fused (RRF) top k is yielded as soon as fusion is
+    done, before the cross-encoder runs. The last item is always the final
+    result, exactly what ``hybrid_search`` returns (which consumes this).
+
+    Args:
+        query: User search query.
+        top_k: Number of results to return.
+        use_cache: Whether to use caching.
+        info: Optional dict filled as by ``hybrid_search``.
+        filters: Optional field -> accepted values.
+        collapse_duplicates: See ``hybrid_search``.
+        preview: Yield the fused ranking before reranking (only when
+            reranking will change anything).
+
+    Yields:
+        Tuples of (stage, results, expanded_query, cached, took_ms): stage
+        "fused" (RRF scores) at most once, then "reranked" (final).
+
+    Raises:
+        ValueError: If a filter field is unknown.
     """
     start_time = time.time()
+    mask = filter_mask(filters)
+    if collapse_duplicates is None:
+        collapse_duplicates = COLLAPSE_DUPLICATES
+    use_cache = use_cache and collapse_duplicates == COLLAPSE_DUPLICATES
+
+    # Rewrite misspelled words (index lookups only, cheap enough to do before the cache)
+    original_query = query
+    if SPELLING_CORRECTION and not is_arabic(query):
+        query, corrections = correct_query(query)
+        if corrections and info is not None:
+            info["did_you_mean"] = query
+            info["corrections"] = corrections
 
     # Check cache first
     if use_cache:
         cache = get_cache()
-        cached_results = cache.get(query)
+        cached_results = cache.get(original_query, filters)
         if cached_results is not None:
             took_ms = (time.time() - start_time) * 1000
             # Get expanded query for display
-            expanded_query = expand_query(query)
-            return cached_results[:top_k], expanded_query, True, took_ms
+            expanded_query = query if is_arabic(query) else expand_query(query)
+            yield "reranked", cached_results[:top_k], expanded_query, True, took_ms
+            return
+
+    if is_arabic(query):
+        results = _arabic_results(query, top_k, mask)
+
+        if use_cache:
+            get_cache().set(query, results, filters)
+        took_ms = (time.time() - start_time) * 1000
+        yield "reranked", results, query, False, took_ms
+        return
 
     # Expand query with Islamic terminology
     expanded_query = expand_query(query)
 
-    # Run vector search
-    vector_results = vector_search(expanded_query, top_k=VECTOR_TOP_K)
-
-    # Run BM25 search
-    bm25_results = bm25_search(expanded_query, top_k=BM25_TOP_K)
+    # Run vector, BM25 (and any other configured) retrievers concurrently
+    stage_start = time.perf_counter()
+    retrieved, timings = run_retrievers(HYBRID_RETRIEVERS, query, expanded_query, mask)
+    timings["retrieval"] = (time.perf_counter() - stage_start) * 1000
+    vector_results = retrieved.get("vector", [])
+    bm25_results = retrieved.get("bm25", [])
 
     # Combine with RRF
-    combined_results = reciprocal_rank_fusion(vector_results, bm25_results)
+    combined_results = reciprocal_rank_fusion(*retrieved.values())
+
+    # Near-copies would otherwise take several reranker slots
+    if collapse_duplicates:
+        combined_results = get_duplicate_index().collapse(combined_results)
 
-    # Rerank top candidates
+    # Rerank top candidates (all, a prefix or none; see rerank_policy)
     candidates = combined_results[:RERANK_TOP_K]
-    reranked_results = rerank_results(query, candidates, top_k=top_k)
+    decision = rerank_decision(query, candidates, vector_results, bm25_results, top_k)
+    if info is not None:
+        info["rerank"] = decision
+        info["timings"] = timings
 
-    # Update scores to use rerank score as final
-    for result in reranked_results:
-        result["score"] = result.get("rerank_score", result.get("rrf_score", 0))
+    if decision["depth"] == 0:
+        reranked = candidates[:top_k]
+    else:
+        if preview:
+            took_ms = (time.time() - start_time) * 1000
+            yield "fused", hydrate(candidates[:top_k]), expanded_query, False, took_ms
+        stage_start = time.perf_counter()
+        reranked = rerank_results(query, candidates[:decision["depth"]], top_k=top_k)
+        timings["rerank"] = (time.perf_counter() - stage_start) * 1000
 
-    # Cache results
-    if use_cache:
+    # Hydrate only the final results; the rerank score is the final score
+    reranked_results = hydrate(reranked)
+
+    # Cache results (only cross-encoder scores; "none" keeps RRF scores)
+    if use_cache and decision["depth"] > 0:
         cache = get_cache()
-        cache.set(query, reranked_results)
+        cache.set(original_query, reranked_results, filters)
+
+    took_ms = (time.time() - start_time) * 1000
+    yield "reranked", reranked_results[:top_k], expanded_query, False, took_ms
+
+
+def hybrid_search_batch(
+    queries: List[str],
+    top_k: int = FINAL_TOP_K,
+    use_cache: bool = True,
+    infos: Optional[List[Dict[str, Any]]] = None,
+    filters: Optional[Dict[str, List[Any]]] = None,
+    collapse_duplicates: Optional[bool] = None
+) -> Tuple[List[Tuple[List[Dict[str, Any]], str, bool]], float]:
+    """Run many searches at once, each returning what ``hybrid_search`` would.
+
+    Cached queries are answered from the result cache. The others go
+    through the ``HYBRID_RETRIEVERS`` concurrently, each over the whole
+    batch where it has a batch variant (one embedding batch and matrix
+    product for vector search, one BM25 scoring pass), are fused per query,
+    and all their rerank pairs go through the cross-encoder together. Arabic
+    queries use the Arabic index one by one. Results are cached as by
+    ``hybrid_search``.
+
+    Args:
+        queries: User search queries.
+        top_k: Number of results per query.
+        use_cache: Whether to use caching.
+        infos: Optional dicts, one per query, filled as ``info`` is by
+            ``hybrid_search`` (timings are for the whole batch).
+        filters: Optional field -> accepted values, shared by all queries.
+        collapse_duplicates: See ``hybrid_search``.
+
+    Returns:
+        Tuple of (one (results, expanded_query, cached) per query, took_ms).
+
+    Raises:
+        ValueError: If a filter field is unknown.
+    """
+    start_time = time.time()
+    mask = filter_mask(filters)
+    if collapse_duplicates is None:
+        collapse_duplicates = COLLAPSE_DUPLICATES
+    use_cache = use_cache and collapse_duplicates == COLLAPSE_DUPLICATES
+    if infos is None:
+        infos = [{} for _ in queries]
+
+    outputs: List[Optional[Tuple[List[Dict[str, Any]], str, bool]]] = [None] * len(queries)
+    corrected = list(queries)
+    english: List[int] = []
+    for i, query in enumerate(queries):
+        if SPELLING_CORRECTION and not is_arabic(query):
+            corrected[i], corrections = correct_query(query)
+            if corrections:
+                infos[i]["did_you_mean"] = corrected[i]
+                infos[i]["corrections"] = corrections
+
+        if use_cache:
+            cached_results = get_cache().get(query, filters)
+            if cached_results is not None:
+                expanded_query = corrected[i] if is_arabic(corrected[i]) else expand_query(corrected[i])
+                outputs[i] = (cached_results[:top_k], expanded_query, True)
+                continue
+
+        if is_arabic(corrected[i]):
+            results = _arabic_results(corrected[i], top_k, mask)
+            if use_cache:
+                get_cache().set(query, results, filters)
+            outputs[i] = (results, corrected[i], False)
+        else:
+            english.append(i)
+
+    if english:
+        batch = [corrected[i] for i in english]
+        expanded = [expand_query(query) for query in batch]
+
+        # The configured retrievers, each over the whole batch, concurrently
+        stage_start = time.perf_counter()
+        retrieved, timings = run_retrievers_batch(HYBRID_RETRIEVERS, batch, expanded, mask)
+        timings["retrieval"] = (time.perf_counter() - stage_start) * 1000
+
+        candidate_lists, decisions = [], []
+        for j, query in enumerate(batch):
+            result_lists = [retrieved[name][j] for name in HYBRID_RETRIEVERS]
+            vector_results = retrieved["vector"][j] if "vector" in retrieved else []
+            bm25_results = retrieved["bm25"][j] if "bm25" in retrieved else []
+            combined_results = reciprocal_rank_fusion(*result_lists)
+            if collapse_duplicates:
+                combined_results = get_duplicate_index().collapse(combined_results)
+            candidates = combined_results[:RERANK_TOP_K]
+            decision = rerank_decision(query, candidates, vector_results, bm25_results, top_k)
+            candidate_lists.append(candidates)
+            decisions.append(decision)
+
+        # All rerank pairs of the batch together
+        stage_start = time.perf_counter()
+        reranked_lists = rerank_results_batch(
+            batch,
+            [candidates[:decision["depth"]] for candidates, decision in zip(candidate_lists, decisions)],
+            top_k=top_k
+        )
+        timings["rerank"] = (time.perf_counter() - stage_start) * 1000
+
+        for i, expanded_query, candidates, decision, reranked in zip(
+            english, expanded, candidate_lists, decisions, reranked_lists
+        ):
+            if decision["depth"] == 0:
+                reranked = candidates[:top_k]
+            results = hydrate(reranked)
+            if use_cache and decision["depth"] > 0:
+                get_cache().set(queries[i], results, filters)
+            infos[i]["rerank"] = decision
+            infos[i]["timings"] = timings
+            outputs[i] = (results, expanded_query, False)
 
     took_ms = (time.time() - start_time) * 1000
-    return reranked_results[:top_k], expanded_query, False, took_ms
+    return outputs, took_ms
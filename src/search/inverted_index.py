@@ -0,0 +1,603 @@
+"""Postings-list BM25 engine.
+
+Scores only the documents that contain at least one query term, instead of
+walking every document like ``rank_bm25.BM25Okapi.get_scores``. Scores are
+identical to ``BM25Okapi`` (same idf floor, same k1/b saturation).
+
+``top_k_pruned`` adds MaxScore dynamic pruning: once the current k-th best
+score exceeds what the remaining terms could contribute, those terms are
+only looked up for existing candidates instead of being scanned.
+
+Indices built with positions also store, per posting, the word positions of
+the term in the document (delta + varint encoded) for phrase matching and
+proximity scoring.
+"""
+
+import heapq
+import math
+from collections import Counter
+from operator import itemgetter
+from pathlib import Path
+from typing import List, Dict, Tuple, Mapping, Optional
+
+import numpy as np
+
+from src.config import BM25_K1, BM25_B, BM25_EPSILON
+from src.search.storage import (
+    save_array,
+    load_array,
+    write_manifest,
+    read_manifest,
+    write_lookup,
+    encode_varints,
+    decode_varints,
+    MappedLookup
+)
+
+# On-disk format written by InvertedIndex.save
+INDEX_FORMAT = "bm25-postings"
+INDEX_FORMAT_VERSION = 3
+
+
+class InvertedIndex:
+    """BM25 index stored as flat postings arrays.
+
+    The postings of term ``t`` are ``doc_ids[offsets[t]:offsets[t + 1]]``
+    (ascending) and ``impacts`` holds the precomputed BM25 weight of each
+    posting, so a query only gathers and sums slices of these arrays.
+
+    When built with positions, posting ``i`` has its positions encoded in
+    ``positions[position_offsets[i]:position_offsets[i + 1]]``.
+    """
+
+    def __init__(
+        self,
+        vocab: Mapping[str, int],
+        offsets: np.ndarray,
+        doc_ids: np.ndarray,
+        impacts: np.ndarray,
+        max_impacts: np.ndarray,
+        doc_lens: np.ndarray,
+        analyzer: str = "",
+        positions: Optional[np.ndarray] = None,
+        position_offsets: Optional[np.ndarray] = None
+    ):
+        """Initialize index from prebuilt arrays.
+
+        Args:
+            vocab: Mapping of term to term id.
+            offsets: Postings start offset per term id (length n_terms + 1).
+            doc_ids: Document indices of all postings, grouped by term.
+            impacts: BM25 weight of each posting.
+            max_impacts: Largest impact per term (MaxScore upper bound).
+            doc_lens: Token count per document.
+            analyzer: Version of the analyzer that produced the terms.
+            positions: Varint-encoded position deltas of all postings.
+            position_offsets: Byte offset per posting into ``positions``.
+        """
+        self.vocab = vocab
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.impacts = impacts
+        self.max_impacts = max_impacts
+        self.doc_lens = doc_lens
+        self.analyzer = analyzer
+        self.positions = positions
+        self.position_offsets = position_offsets
+
+    @property
+    def num_docs(self) -> int:
+        """Number of indexed documents."""
+        return len(self.doc_lens)
+
+    @property
+    def has_positions(self) -> bool:
+        """Whether positional postings were stored."""
+        return self.positions is not None
+
+    @classmethod
+    def build(
+        cls,
+        corpus: List[List[str]],
+        k1: float = BM25_K1,
+        b: float = BM25_B,
+        epsilon: float = BM25_EPSILON,
+        analyzer: str = ""
+    ) -> "InvertedIndex":
+        """Build index from a tokenized corpus.
+
+        Args:
+            corpus: List of tokenized documents.
+            k1: BM25 term frequency saturation.
+            b: BM25 length normalization.
+            epsilon: Idf floor factor for very common terms.
+            analyzer: Version of the analyzer that produced the tokens.
+
+        Returns:
+            Built InvertedIndex.
+        """
+        vocab: Dict[str, int] = {}
+        doc_terms = [
+            np.array([vocab.setdefault(t, len(vocab)) for t in tokens], dtype=np.int32)
+            for tokens in corpus
+        ]
+        return cls.build_from_ids(doc_terms, vocab, k1=k1, b=b, epsilon=epsilon, analyzer=analyzer)
+
+    @classmethod
+    def build_from_ids(
+        cls,
+        doc_terms: List[np.ndarray],
+        vocab: Dict[str, int],
+        k1: float = BM25_K1,
+        b: float = BM25_B,
+        epsilon: float = BM25_EPSILON,
+        analyzer: str = "",
+        doc_positions: Optional[List[np.ndarray]] = None
+    ) -> "InvertedIndex":
+        """Build index from documents already interned to term ids.
+
+        Term ids must be assigned in first-seen order (as
+        ``Analyzer.term_ids`` does); idf is then computed exactly like
+        ``BM25Okapi`` (negative idf floored to epsilon * average idf).
+
+        Args:
+            doc_terms: int array of term ids per document.
+            vocab: Mapping of term to term id.
+            k1: BM25 term frequency saturation.
+            b: BM25 length normalization.
+            epsilon: Idf floor factor for very common terms.
+            analyzer: Version of the analyzer that produced the terms.
+            doc_positions: Optional word position of each term per document;
+                when given, positional postings are stored.
+
+        Returns:
+            Built InvertedIndex.
+        """
+        num_docs = len(doc_terms)
+        doc_lens = np.array([len(d) for d in doc_terms], dtype=np.int32)
+        all_terms = (
+            np.concatenate(doc_terms).astype(np.int64)
+            if num_docs else np.zeros(0, dtype=np.int64)
+        )
+        all_docs = np.repeat(np.arange(num_docs, dtype=np.int64), doc_lens)
+
+        # One (term, doc) key per posting; sorted by term, then doc
+        all_keys = all_terms * num_docs + all_docs
+        positions = position_offsets = None
+        if doc_positions is None:
+            keys, tfs = np.unique(all_keys, return_counts=True)
+        else:
+            all_positions = (
+                np.concatenate(doc_positions).astype(np.int64)
+                if num_docs else np.zeros(0, dtype=np.int64)
+            )
+            order = np.lexsort((all_positions, all_keys))
+            keys, starts, tfs = np.unique(all_keys[order], return_index=True, return_counts=True)
+            # Positions ascending within each posting, stored as deltas
+            sorted_positions = all_positions[order]
+            deltas = np.diff(sorted_positions, prepend=0)
+            deltas[starts] = sorted_positions[starts]
+            positions, value_offsets = encode_varints(deltas)
+            position_offsets = np.append(value_offsets[starts], value_offsets[-1])
+        terms = keys // max(num_docs, 1)
+        doc_ids = (keys - terms * num_docs).astype(np.int32)
+
+        doc_freqs = np.bincount(terms, minlength=len(vocab))
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(doc_freqs, out=offsets[1:])
+
+        # Idf summed in term-id order to match BM25Okapi's average exactly
+        idf = np.zeros(len(vocab), dtype=np.float64)
+        idf_sum = 0
+        negative = []
+        for term_id, df in enumerate(doc_freqs.tolist()):
+            value = math.log(num_docs - df + 0.5) - math.log(df + 0.5)
+            idf[term_id] = value
+            idf_sum += value
+            if value < 0:
+                negative.append(term_id)
+        if vocab:
+            idf[negative] = epsilon * (idf_sum / len(vocab))
+
+        avgdl = int(doc_lens.sum()) / num_docs if num_docs else 0.0
+        dl = doc_lens[doc_ids].astype(np.int64)
+        impacts = idf[terms] * (tfs * (k1 + 1) / (tfs + k1 * (1 - b + b * dl / avgdl)))
+        max_impacts = (
+            np.maximum.reduceat(impacts, offsets[:-1])
+            if len(impacts) else np.zeros(0, dtype=np.float64)
+        )
+
+        return cls(
+            vocab, offsets, doc_ids, impacts, max_impacts, doc_lens, analyzer,
+            positions, position_offsets
+        )
+
+    def save(self, directory: Path) -> None:
+        """Write the index as flat arrays in a versioned directory.
+
+        Args:
+            directory: Existing output directory.
+        """
+        write_lookup(directory, "vocab", dict(self.vocab))
+        save_array(directory, "offsets", self.offsets)
+        save_array(directory, "doc_ids", self.doc_ids)
+        save_array(directory, "impacts", self.impacts)
+        save_array(directory, "max_impacts", self.max_impacts)
+        save_array(directory, "doc_lens", self.doc_lens)
+        if self.has_positions:
+            save_array(directory, "positions", self.positions)
+            save_array(directory, "position_offsets", self.position_offsets)
+        write_manifest(directory, {
+            "format": INDEX_FORMAT,
+            "version": INDEX_FORMAT_VERSION,
+            "analyzer": self.analyzer,
+            "positions": self.has_positions,
+            "num_docs": self.num_docs,
+            "num_terms": len(self.vocab),
+            "num_postings": len(self.doc_ids)
+        })
+
+    @classmethod
+    def load(cls, directory: Path, analyzer: Optional[str] = None) -> "InvertedIndex":
+        """Open an index written by ``save`` without reading it into memory.
+
+        Args:
+            directory: Index directory.
+            analyzer: Expected analyzer version; checked when given.
+
+        Returns:
+            InvertedIndex backed by read-only memory maps.
+
+        Raises:
+            ValueError: If the directory holds a different format version or
+                was built with a different analyzer.
+        """
+        manifest = read_manifest(directory, INDEX_FORMAT, INDEX_FORMAT_VERSION)
+        if analyzer is not None and manifest.get("analyzer") != analyzer:
+            raise ValueError(
+                f"Index at {directory} was built with analyzer "
+                f"{manifest.get('analyzer')!r} but the current analyzer is "
+                f"{analyzer!r}. Rebuild it with scripts/ingest.py"
+            )
+        positional = manifest.get("positions", False)
+        return cls(
+            MappedLookup(directory, "vocab"),
+            load_array(directory, "offsets"),
+            load_array(directory, "doc_ids"),
+            load_array(directory, "impacts"),
+            load_array(directory, "max_impacts"),
+            load_array(directory, "doc_lens"),
+            manifest.get("analyzer", ""),
+            load_array(directory, "positions") if positional else None,
+            load_array(directory, "position_offsets") if positional else None
+        )
+
+    def term_ids(self, tokens: List[str]) -> List[int]:
+        """Map query tokens to term ids, dropping unknown terms.
+
+        Args:
+            tokens: Query tokens.
+
+        Returns:
+            Term ids in query order (duplicates kept).
+        """
+        ids = (self.vocab.get(t) for t in tokens)
+        return [i for i in ids if i is not None]
+
+    def score(self, tokens: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """Score every document containing at least one query token.
+
+        Args:
+            tokens: Query tokens.
+
+        Returns:
+            Tuple of (ascending doc indices, BM25 scores).
+        """
+        term_ids = self.term_ids(tokens)
+        if not term_ids:
+            return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.float64)
+
+        offsets = self.offsets
+        spans = [(offsets[t], offsets[t + 1]) for t in term_ids]
+        docs = np.concatenate([self.doc_ids[s:e] for s, e in spans])
+        weights = np.concatenate([self.impacts[s:e] for s, e in spans])
+
+        # Sum per document in query-term order (same order as BM25Okapi)
+        candidates, inverse = np.unique(docs, return_inverse=True)
+        scores = np.bincount(inverse, weights=weights)
+        return candidates, scores
+
+    def top_k(
+        self,
+        tokens: List[str],
+        k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> List[Tuple[int, float]]:
+        """Return the k best documents for a query.
+
+        Args:
+            tokens: Query tokens.
+            k: Number of results.
+            mask: Optional bool array over documents; only True documents
+                are selected.
+
+        Returns:
+            List of (doc index, score), best first. Ties keep index order.
+        """
+        candidates, scores = self.score(tokens)
+        if mask is not None:
+            keep = mask[candidates]
+            candidates, scores = candidates[keep], scores[keep]
+        return select_top_k(candidates, scores, k)
+
+    def top_k_pruned(
+        self,
+        tokens: List[str],
+        k: int
+    ) -> Tuple[List[Tuple[int, float]], Dict[str, int]]:
+        """Return the k best documents using MaxScore pruning.
+
+        Terms are processed in decreasing order of their upper bound
+        (max impact x query count). While documents outside the accumulator
+        could still reach the top k, a term's whole postings list is added.
+        Once the sum of the remaining upper bounds falls below the current
+        k-th score, no new document can enter the top k: candidates that
+        cannot reach the threshold are dropped and the remaining terms are
+        only binary-searched for the survivors. Results are exact.
+
+        Args:
+            tokens: Query tokens.
+            k: Number of results.
+
+        Returns:
+            Tuple of (list of (doc index, score) best first, stats dict with
+            postings_total, postings_evaluated, postings_skipped, terms and
+            terms_pruned).
+        """
+        counts = Counter(self.term_ids(tokens))
+        terms = sorted(counts, key=lambda t: self.max_impacts[t] * counts[t], reverse=True)
+        bounds = [float(self.max_impacts[t]) * counts[t] for t in terms]
+        # remaining[i] = best possible score from terms[i:]
+        remaining = [0.0] * (len(terms) + 1)
+        for i in range(len(terms) - 1, -1, -1):
+            remaining[i] = remaining[i + 1] + bounds[i]
+
+        offsets = self.offsets
+        total = sum(int(offsets[t + 1] - offsets[t]) for t in terms)
+        evaluated = 0
+        accumulator = np.zeros(self.num_docs, dtype=np.float64)
+        # Documents with a score so far, in first-seen order; thresholds are
+        # taken over these only, never over the whole corpus
+        touched: List[np.ndarray] = []
+
+        # Phase 1: full postings while unseen documents can still make the top k
+        position = len(terms)
+        for i, term in enumerate(terms):
+            # The k-th score is at most the bound of the terms added so far
+            added = remaining[0] - remaining[i]
+            if remaining[i] < added:
+                seen = np.concatenate(touched)
+                if remaining[i] < _kth_score(accumulator[seen], k):
+                    position = i
+                    break
+            start, end = offsets[term], offsets[term + 1]
+            docs = self.doc_ids[start:end]
+            # Impacts are positive, so a zero accumulator means unseen
+            touched.append(docs[accumulator[docs] == 0])
+            accumulator[docs] += self.impacts[start:end] * counts[term]
+            evaluated += int(end - start)
+
+        candidates = np.concatenate(touched) if touched else np.zeros(0, dtype=np.int64)
+        scores = accumulator[candidates]
+
+        # Phase 2: only existing candidates can still reach the top k
+        for i in range(position, len(terms)):
+            threshold = _kth_score(scores, k)
+            keep = scores + remaining[i] >= threshold
+            candidates, scores = candidates[keep], scores[keep]
+
+            term = terms[i]
+            start, end = offsets[term], offsets[term + 1]
+            postings = self.doc_ids[start:end]
+            found = np.searchsorted(postings, candidates)
+            found[found == len(postings)] = 0
+            hit = postings[found] == candidates
+            scores[hit] += self.impacts[start:end][found[hit]] * counts[term]
+            evaluated += int(hit.sum())
+
+        # Only scores reaching the k-th go to the heap; ascending doc ids so
+        # ties keep index order
+        keep = scores >= _kth_score(scores, k)
+        candidates, scores = candidates[keep], scores[keep]
+        order = np.argsort(candidates, kind="stable")
+        candidates, scores = candidates[order], scores[order]
+
+        stats = {
+            "terms": len(terms),
+            "terms_pruned": len(terms) - position,
+            "postings_total": total,
+            "postings_evaluated": evaluated,
+            "postings_skipped": total - evaluated,
+        }
+        return select_top_k(candidates, scores, k), stats
+
+    def postings(self, term_id: int) -> np.ndarray:
+        """Return the ascending doc indices containing a term.
+
+        Args:
+            term_id: Term id.
+
+        Returns:
+            Doc indices (a view into the postings array).
+        """
+        return self.doc_ids[self.offsets[term_id]:self.offsets[term_id + 1]]
+
+    def positions_of(self, term_id: int, docs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Decode a term's positions in several documents at once.
+
+        Args:
+            term_id: Term id.
+            docs: Ascending doc indices, all containing the term.
+
+        Returns:
+            Tuple of (doc index per position, ascending positions per doc).
+        """
+        start = self.offsets[term_id]
+        postings = start + np.searchsorted(self.postings(term_id), docs)
+        lo = self.position_offsets[postings]
+        lengths = self.position_offsets[postings + 1] - lo
+
+        # Gather the byte range of every posting into one buffer
+        range_starts = np.zeros(len(docs), dtype=np.int64)
+        np.cumsum(lengths[:-1], out=range_starts[1:])
+        gather = np.arange(int(lengths.sum())) + np.repeat(lo - range_starts, lengths)
+        deltas, ends = decode_varints(self.positions[gather])
+
+        # Undo the delta coding within each posting
+        counts = np.add.reduceat(ends, range_starts) if len(docs) else np.zeros(0, dtype=np.int64)
+        totals = np.cumsum(deltas)
+        before = np.repeat(totals[np.cumsum(counts) - counts] - deltas[np.cumsum(counts) - counts], counts)
+        return np.repeat(docs, counts), totals - before
+
+    def term_positions(self, term_id: int, doc: int) -> List[int]:
+        """Decode the positions of a term in one document.
+
+        Args:
+            term_id: Term id.
+            doc: Doc index.
+
+        Returns:
+            Ascending word positions (empty if the term is absent).
+        """
+        postings = self.postings(term_id)
+        i = int(np.searchsorted(postings, doc))
+        if i == len(postings) or postings[i] != doc:
+            return []
+        return self.positions_of(term_id, np.array([doc]))[1].tolist()
+
+    def phrase_docs(self, phrase: List[Tuple[str, int]]) -> np.ndarray:
+        """Find documents containing an exact phrase.
+
+        Candidates are first narrowed to documents containing every phrase
+        term (postings intersection, shortest list first); positions are
+        only decoded for those candidates.
+
+        Args:
+            phrase: (term, relative position) pairs from
+                ``Analyzer.tokenize_with_positions``.
+
+        Returns:
+            Ascending doc indices that contain the phrase.
+        """
+        terms = [(self.vocab.get(t), p) for t, p in phrase]
+        if not terms or any(t is None for t, _ in terms):
+            return np.zeros(0, dtype=np.int32)
+
+        distinct = sorted({t for t, _ in terms}, key=lambda t: self.offsets[t + 1] - self.offsets[t])
+        candidates = self.postings(distinct[0])
+        for term_id in distinct[1:]:
+            candidates = np.intersect1d(candidates, self.postings(term_id), assume_unique=True)
+
+        # (doc, phrase start) keys implied by each term; a match needs all
+        starts = None
+        for term_id, rel in terms:
+            docs, positions = self.positions_of(term_id, candidates)
+            keys = (docs.astype(np.int64) << 32) + (positions - rel + (1 << 31))
+            starts = keys if starts is None else np.intersect1d(starts, keys, assume_unique=True)
+            candidates = np.unique(starts >> 32).astype(np.int32)
+        return candidates
+
+    def min_spans(self, docs: np.ndarray, term_ids: List[int]) -> np.ndarray:
+        """Length of the shortest window containing every term, per document.
+
+        Args:
+            docs: Doc indices.
+            term_ids: Distinct term ids.
+
+        Returns:
+            Window length in words per doc (0 where a term is missing).
+        """
+        docs = np.asarray(docs, dtype=np.int32)
+        spans = np.zeros(len(docs), dtype=np.int64)
+        present = np.ones(len(docs), dtype=bool)
+        for term_id in term_ids:
+            present &= np.isin(docs, self.postings(term_id))
+        matched = np.unique(docs[present])
+        if not len(matched) or not term_ids:
+            return spans
+
+        # All (doc, position, term) events, ordered by doc then position
+        event_docs, event_positions, event_terms = [], [], []
+        for n, term_id in enumerate(term_ids):
+            term_docs, positions = self.positions_of(term_id, matched)
+            event_docs.append(term_docs)
+            event_positions.append(positions)
+            event_terms.append(np.full(len(positions), n))
+        event_docs = np.concatenate(event_docs)
+        event_positions = np.concatenate(event_positions)
+        event_terms = np.concatenate(event_terms)
+        order = np.lexsort((event_positions, event_docs))
+
+        best: Dict[int, int] = {}
+        window: List[Tuple[int, int]] = []
+        counts = [0] * len(term_ids)
+        covered = 0
+        current = None
+        for doc, position, n in zip(
+            event_docs[order].tolist(), event_positions[order].tolist(), event_terms[order].tolist()
+        ):
+            if doc != current:
+                current, window, covered = doc, [], 0
+                counts = [0] * len(term_ids)
+                left = 0
+            window.append((position, n))
+            counts[n] += 1
+            if counts[n] == 1:
+                covered += 1
+            # Shrink from the left while the window still covers every term
+            while covered == len(term_ids):
+                span = position - window[left][0] + 1
+                if span < best.get(doc, span + 1):
+                    best[doc] = span
+                counts[window[left][1]] -= 1
+                if counts[window[left][1]] == 0:
+                    covered -= 1
+                left += 1
+
+        for i, doc in enumerate(docs.tolist()):
+            spans[i] = best.get(doc, 0)
+        return spans
+
+
+def _kth_score(scores: np.ndarray, k: int) -> float:
+    """Return the k-th largest score (0 if fewer than k are positive).
+
+    Args:
+        scores: Score array.
+        k: Rank of the threshold score.
+
+    Returns:
+        Current top-k entry threshold.
+    """
+    if len(scores) < k:
+        return 0.0
+    return float(np.partition(scores, len(scores) - k)[len(scores) - k])
+
+
+def select_top_k(
+    candidates: np.ndarray,
+    scores: np.ndarray,
+    k: int
+) -> List[Tuple[int, float]]:
+    """Heap-select the k highest scores.
+
+    Args:
+        candidates: Ascending doc indices.
+        scores: Score per candidate.
+        k: Number of results.
+
+    Returns:
+        List of (doc index, score), best first. Ties keep index order.
+    """
+    pairs = zip(candidates.tolist(), scores.tolist())
+    return heapq.nlargest(k, pairs, key=itemgetter(1))
@@ -0,0 +1,167 @@
+"""Precomputed nearest neighbours of every hadith ("more like this").
+
+At ingest, the normalized embedding matrix is multiplied with itself one
+block of rows at a time and the best ``k`` other hadiths of each row are
+kept. The result is an (n, k) int32 doc id table and an (n, k) float16
+cosine table, so looking up the neighbours of a hadith is a row slice: no
+model, vector search or scan at request time.
+"""
+
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from src.config import NEIGHBOR_INDEX
+from src.search.doc_store import get_doc_store, hydrate
+from src.search.storage import save_array, load_array, write_manifest, read_manifest
+
+# On-disk format written by NeighborIndex.save
+INDEX_FORMAT = "knn-neighbors"
+INDEX_FORMAT_VERSION = 1
+
+# Rows per block of the all-pairs product (a 512 x 15k float32 block is ~30MB)
+BLOCK_ROWS = 512
+
+
+class NeighborIndex:
+    """Top-k neighbour table over doc ids."""
+
+    def __init__(self, neighbors: np.ndarray, scores: np.ndarray, model: str = ""):
+        """Initialize index from prebuilt arrays.
+
+        Args:
+            neighbors: int32 doc ids of shape (n, k), best first per row.
+            scores: float16 cosine similarities matching ``neighbors``.
+            model: Embedding model the neighbours were computed with.
+        """
+        self.neighbors = neighbors
+        self.scores = scores
+        self.model = model
+
+    @classmethod
+    def build(
+        cls,
+        embeddings: np.ndarray,
+        k: int,
+        model: str = "",
+        block_rows: int = BLOCK_ROWS
+    ) -> "NeighborIndex":
+        """Compute the k nearest other documents of every document.
+
+        Args:
+            embeddings: L2-normalized float32 embeddings, one row per doc id.
+            k: Neighbours kept per document.
+            model: Embedding model name, recorded in the manifest.
+            block_rows: Rows per matrix multiply block.
+
+        Returns:
+            Built NeighborIndex.
+        """
+        num_docs = embeddings.shape[0]
+        k = min(k, num_docs - 1)
+        neighbors = np.zeros((num_docs, k), dtype=np.int32)
+        scores = np.zeros((num_docs, k), dtype=np.float16)
+        if k <= 0:
+            return cls(neighbors, scores, model)
+
+        for start in range(0, num_docs, block_rows):
+            block = embeddings[start:start + block_rows] @ embeddings.T
+            rows = np.arange(len(block))
+            # A document is not its own neighbour
+            block[rows, start + rows] = -np.inf
+
+            top = np.argpartition(-block, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(block, top, axis=1)
+            # Best first, ties by doc id
+            order = np.lexsort((top, -top_scores))
+            neighbors[start:start + len(block)] = np.take_along_axis(top, order, axis=1)
+            scores[start:start + len(block)] = np.take_along_axis(top_scores, order, axis=1)
+
+        return cls(neighbors, scores, model)
+
+    def save(self, directory: Path) -> None:
+        """Write the tables as ``.npy`` arrays and a manifest.
+
+        Args:
+            directory: Existing, empty output directory.
+        """
+        save_array(directory, "neighbors", self.neighbors)
+        save_array(directory, "scores", self.scores)
+        write_manifest(directory, {
+            "format": INDEX_FORMAT,
+            "version": INDEX_FORMAT_VERSION,
+            "model": self.model,
+            "num_docs": int(self.neighbors.shape[0]),
+            "k": int(self.neighbors.shape[1])
+        })
+
+    @classmethod
+    def load(cls, directory: Path) -> "NeighborIndex":
+        """Open an index written by ``save`` without reading it into memory.
+
+        Args:
+            directory: Index directory.
+
+        Returns:
+            NeighborIndex backed by read-only memory maps.
+        """
+        manifest = read_manifest(directory, INDEX_FORMAT, INDEX_FORMAT_VERSION)
+        return cls(
+            load_array(directory, "neighbors"),
+            load_array(directory, "scores"),
+            manifest.get("model", "")
+        )
+
+    @property
+    def k(self) -> int:
+        """Neighbours stored per document."""
+        return self.neighbors.shape[1]
+
+    def similar(self, doc: int, k: int) -> List[Tuple[int, float]]:
+        """Nearest neighbours of a document.
+
+        Args:
+            doc: Doc id.
+            k: Number of neighbours (at most ``self.k``).
+
+        Returns:
+            List of (doc id, cosine similarity), best first.
+        """
+        return list(zip(
+            self.neighbors[doc, :k].tolist(),
+            self.scores[doc, :k].astype(float).tolist()
+        ))
+
+
+# Lazy-loaded global
+_neighbor_index: Optional[NeighborIndex] = None
+
+
+def get_neighbor_index() -> NeighborIndex:
+    """Get or open the neighbour table (lazy loading).
+
+    Returns:
+        NeighborIndex over the memory-mapped tables.
+    """
+    global _neighbor_index
+    if _neighbor_index is None:
+        _neighbor_index = NeighborIndex.load(NEIGHBOR_INDEX)
+    return _neighbor_index
+
+
+def similar_hadiths(hadith_id: str, top_k: int) -> Optional[List[Dict[str, Any]]]:
+    """Hadiths most similar in meaning to a hadith.
+
+    Args:
+        hadith_id: Unique hadith identifier.
+        top_k: Number of results.
+
+    Returns:
+        Search results (score is the cosine similarity), best first, or
+        None if the hadith is unknown.
+    """
+    doc = get_doc_store().doc_id(hadith_id)
+    if doc is None:
+        return None
+    return hydrate(get_neighbor_index().similar(doc, top_k))
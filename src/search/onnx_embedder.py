@@ -0,0 +1,110 @@
+"""Query embedding with ONNX Runtime, without importing torch.
+
+scripts/export_onnx.py exports the SentenceTransformer (transformer,
+pooling and normalization) to ONNX, applies dynamic int8 quantization to
+the weights and saves the fast tokenizer next to it. This module only
+needs ``onnxruntime`` and ``tokenizers`` and exposes the same ``encode``
+call as SentenceTransformer, so vector search can use either.
+"""
+
+from pathlib import Path
+from typing import List, Optional, Union
+
+import numpy as np
+import onnxruntime as ort
+from tokenizers import Tokenizer
+
+from src.search.storage import read_manifest
+
+# On-disk format written by scripts/export_onnx.py
+INDEX_FORMAT = "onnx-embedding"
+INDEX_FORMAT_VERSION = 1
+
+MODEL_FILE = "model.int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+
+
+class OnnxEmbedder:
+    """Sentence embedding model running on ONNX Runtime (CPU)."""
+
+    def __init__(self, directory: Path, max_seq_length: int, pad_token: str):
+        """Initialize model from an export directory.
+
+        Args:
+            directory: Directory containing ``MODEL_FILE`` and ``TOKENIZER_FILE``.
+            max_seq_length: Truncation length used by the original model.
+            pad_token: Padding token of the tokenizer.
+        """
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(directory / MODEL_FILE),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+        self.tokenizer = Tokenizer.from_file(str(directory / TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding(
+            pad_id=self.tokenizer.token_to_id(pad_token),
+            pad_token=pad_token
+        )
+
+    @classmethod
+    def load(cls, directory: Path, model: Optional[str] = None) -> "OnnxEmbedder":
+        """Open an export written by scripts/export_onnx.py.
+
+        Args:
+            directory: Export directory.
+            model: Expected embedding model; checked when given.
+
+        Returns:
+            Loaded OnnxEmbedder.
+
+        Raises:
+            ValueError: If the export has a different format version or was
+                made from a different model.
+        """
+        manifest = read_manifest(directory, INDEX_FORMAT, INDEX_FORMAT_VERSION)
+        if model is not None and manifest.get("model") != model:
+            raise ValueError(
+                f"ONNX export at {directory} was made from {manifest.get('model')!r} "
+                f"but the configured model is {model!r}. Re-run scripts/export_onnx.py"
+            )
+        return cls(directory, manifest["max_seq_length"], manifest["pad_token"])
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        show_progress_bar: bool = False
+    ) -> np.ndarray:
+        """Embed one sentence or a list of sentences.
+
+        Args:
+            sentences: Text or list of texts.
+            batch_size: Texts per inference call.
+            show_progress_bar: Accepted for SentenceTransformer
+                compatibility; ignored.
+
+        Returns:
+            float32 embedding of shape (dim,) for a single text, otherwise
+            (n, dim).
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            features = {
+                "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+                "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+            }
+            inputs = {name: features[name] for name in self.input_names}
+            batches.append(self.session.run(None, inputs)[0].astype(np.float32))
+
+        embeddings = np.concatenate(batches) if batches else np.zeros((0, 0), dtype=np.float32)
+        return embeddings[0] if single else embeddings
@@ -1,5 +1,7 @@
 """Query expansion with Islamic terminology mappings."""
 
+from src.search.analyzer import TRANSLITERATION_FOLDS
+
 # Islamic terminology synonym mappings
 TERM_MAPPINGS = {
     # Prayer
@@ -185,17 +187,26 @@ def expand_query(query: str) -> str:
     Returns:
         Expanded query with added synonyms.
     """
-    words = query.lower().split()
-    expanded_terms = set(words)
+    # Phrase quotes only matter to BM25, which reads them from the original query
+    words = query.lower().replace('"', ' ').split()
+    # Ordered set: the expanded text keys the persistent embedding cache, so it
+    # must not depend on per-process string hashing
+    expanded_terms = dict.fromkeys(words)
 
     for word in words:
         # Check if word is in mappings
         if word in TERM_MAPPINGS:
-            expanded_terms.update(TERM_MAPPINGS[word])
+            expanded_terms.update(dict.fromkeys(TERM_MAPPINGS[word]))
+
+        # Transliteration variants (wudhu, jumma) map like their canonical form
+        folded = TRANSLITERATION_FOLDS.get(word)
+        if folded in TERM_MAPPINGS:
+            expanded_terms[folded] = None
+            expanded_terms.update(dict.fromkeys(TERM_MAPPINGS[folded]))
 
         # Also check without trailing 's' for plurals
         singular = word.rstrip('s')
         if singular in TERM_MAPPINGS:
-            expanded_terms.update(TERM_MAPPINGS[singular])
+            expanded_terms.update(dict.fromkeys(TERM_MAPPINGS[singular]))
 
     return " ".join(expanded_terms)
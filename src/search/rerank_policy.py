@@ -0,0 +1,166 @@
+"""Adaptive reranking: decide how many fused candidates the cross-encoder scores.
+
+The cross-encoder is the most expensive stage of a search. When the fused
+ranking is already decisive it adds little, so a policy looks at cheap
+signals of the first-stage results and picks one of three paths:
+
+- "none": keep the fused (RRF) order
+- "prefix": rerank only the first ``prefix_depth`` candidates
+- "full": rerank all ``RERANK_TOP_K`` candidates
+
+Signals:
+
+- agreement: overlap of the vector and BM25 top ``agreement_depth`` results
+- margin: how far the best fused score is above the first candidate that
+  would not make the page, relative to the best score
+- tokens: analyzed query terms (long natural-language queries gain most
+  from reranking)
+
+scripts/tune_rerank.py replays queries against full reranking to choose
+the thresholds.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+
+from src.config import (
+    ADAPTIVE_RERANK,
+    RERANK_AGREEMENT_DEPTH,
+    RERANK_SKIP_AGREEMENT,
+    RERANK_SKIP_MARGIN,
+    RERANK_SKIP_MAX_TOKENS,
+    RERANK_PREFIX_AGREEMENT,
+    RERANK_PREFIX_MARGIN,
+    RERANK_PREFIX_MAX_TOKENS,
+    RERANK_PREFIX_DEPTH
+)
+from src.search.analyzer import get_analyzer
+
+
+class RerankPolicy:
+    """Thresholds mapping first-stage signals to a reranking path."""
+
+    def __init__(
+        self,
+        skip_agreement: float = RERANK_SKIP_AGREEMENT,
+        skip_margin: float = RERANK_SKIP_MARGIN,
+        skip_max_tokens: int = RERANK_SKIP_MAX_TOKENS,
+        prefix_agreement: float = RERANK_PREFIX_AGREEMENT,
+        prefix_margin: float = RERANK_PREFIX_MARGIN,
+        prefix_max_tokens: int = RERANK_PREFIX_MAX_TOKENS,
+        prefix_depth: int = RERANK_PREFIX_DEPTH,
+        agreement_depth: int = RERANK_AGREEMENT_DEPTH
+    ):
+        """Initialize policy.
+
+        Args:
+            skip_agreement: Minimum agreement to skip reranking.
+            skip_margin: Minimum margin to skip reranking.
+            skip_max_tokens: Longest query (in terms) that may skip it.
+            prefix_agreement: Agreement that allows prefix reranking.
+            prefix_margin: Margin that allows prefix reranking.
+            prefix_max_tokens: Longest query that may use a prefix.
+            prefix_depth: Candidates reranked on the prefix path (at least
+                the requested ``top_k``).
+            agreement_depth: Retriever results compared for agreement.
+        """
+        self.skip_agreement = skip_agreement
+        self.skip_margin = skip_margin
+        self.skip_max_tokens = skip_max_tokens
+        self.prefix_agreement = prefix_agreement
+        self.prefix_margin = prefix_margin
+        self.prefix_max_tokens = prefix_max_tokens
+        self.prefix_depth = prefix_depth
+        self.agreement_depth = agreement_depth
+
+    def signals(
+        self,
+        query: str,
+        vector_results: List[Tuple[int, float]],
+        bm25_results: List[Tuple[int, float]],
+        fused: List[Tuple[int, float]],
+        top_k: int
+    ) -> Dict[str, float]:
+        """Compute the decision signals of one query.
+
+        Args:
+            query: Query given to the reranker.
+            vector_results: (doc id, score) from vector search.
+            bm25_results: (doc id, score) from BM25 search.
+            fused: Fused (doc id, RRF score) candidates, best first.
+            top_k: Number of results requested.
+
+        Returns:
+            Dict with "agreement" (0-1), "margin" (0-1) and "tokens".
+        """
+        depth = self.agreement_depth
+        vector_top = {doc for doc, _ in vector_results[:depth]}
+        bm25_top = {doc for doc, _ in bm25_results[:depth]}
+        agreement = len(vector_top & bm25_top) / depth if vector_top and bm25_top else 0.0
+
+        margin = 0.0
+        if fused:
+            boundary = fused[top_k][1] if len(fused) > top_k else 0.0
+            margin = (fused[0][1] - boundary) / fused[0][1] if fused[0][1] > 0 else 0.0
+
+        return {
+            "agreement": agreement,
+            "margin": margin,
+            "tokens": len(get_analyzer().tokenize(query))
+        }
+
+    def decide(self, signals: Dict[str, float], num_candidates: int, top_k: int) -> Tuple[str, int]:
+        """Pick the reranking path.
+
+        Args:
+            signals: Output of ``signals``.
+            num_candidates: Fused candidates available for reranking.
+            top_k: Number of results requested.
+
+        Returns:
+            Tuple of (path, candidates to rerank): ("none", 0),
+            ("prefix", depth) or ("full", num_candidates).
+        """
+        agreement, margin, tokens = signals["agreement"], signals["margin"], signals["tokens"]
+        if (tokens <= self.skip_max_tokens and agreement >= self.skip_agreement
+                and margin >= self.skip_margin):
+            return "none", 0
+
+        depth = max(top_k, self.prefix_depth)
+        if (depth < num_candidates and tokens <= self.prefix_max_tokens
+                and (agreement >= self.prefix_agreement or margin >= self.prefix_margin)):
+            return "prefix", depth
+        return "full", num_candidates
+
+
+def rerank_decision(
+    query: str,
+    candidates: List[Tuple[int, float]],
+    vector_results: List[Tuple[int, float]],
+    bm25_results: List[Tuple[int, float]],
+    top_k: int,
+    policy: Optional[RerankPolicy] = None
+) -> Dict[str, Any]:
+    """Decide how many fused candidates to rerank.
+
+    With ``ADAPTIVE_RERANK`` off (and no explicit policy), every candidate
+    is reranked.
+
+    Args:
+        query: Query given to the reranker.
+        candidates: Fused (doc id, RRF score) candidates, best first.
+        vector_results: (doc id, score) from vector search.
+        bm25_results: (doc id, score) from BM25 search.
+        top_k: Number of results to return.
+        policy: Policy to apply; the configured one if None.
+
+    Returns:
+        Decision with "path", "depth" (candidates to rerank) and, when
+        adaptive, the "signals".
+    """
+    if policy is None and ADAPTIVE_RERANK:
+        policy = RerankPolicy()
+    if policy is None:
+        return {"path": "full", "depth": len(candidates)}
+    signals = policy.signals(query, vector_results, bm25_results, candidates, top_k)
+    path, depth = policy.decide(signals, len(candidates), top_k)
+    return {"path": path, "depth": depth, "signals": signals}
@@ -0,0 +1,160 @@
+"""Reranker token ids of every hadith passage, tokenized once at ingest.
+
+The cross-encoder reads "[CLS] query [SEP] passage [SEP]", and the passage
+(narrator line and text) is by far the longer part. Instead of tokenizing
+it again for every (query, candidate) pair, ingest tokenizes each passage
+with the reranker's tokenizer, without special tokens and truncated to the
+longest passage a one-token query leaves room for, and stores the ids back
+to back (offsets + one id array, uint16 when the vocabulary fits). At
+request time only the query is tokenized; the passage ids are cut to what
+that query leaves of ``RERANK_MAX_LENGTH``, which is the truncation the
+tokenizer would apply to the pair ("longest_first" with a short query).
+"""
+
+from pathlib import Path
+from typing import List, Any, Optional
+
+import numpy as np
+
+from src.config import RERANK_TOKENS_INDEX, RERANKER_MODEL, RERANK_MAX_LENGTH
+from src.search.storage import save_array, load_array, write_manifest, read_manifest
+
+# On-disk format written by RerankTokenStore.save
+INDEX_FORMAT = "rerank-tokens"
+INDEX_FORMAT_VERSION = 1
+
+# Passages tokenized per tokenizer call at ingest
+TOKENIZE_BATCH = 1000
+
+
+class RerankTokenStore:
+    """Token ids of each doc id's passage (ragged, offsets + ids)."""
+
+    def __init__(
+        self,
+        offsets: np.ndarray,
+        token_ids: np.ndarray,
+        model: str = "",
+        max_length: int = RERANK_MAX_LENGTH
+    ):
+        """Initialize store from prebuilt arrays.
+
+        Args:
+            offsets: Start of each doc id's tokens in ``token_ids`` (plus end).
+            token_ids: Concatenated passage token ids.
+            model: Reranker model whose tokenizer produced the ids.
+            max_length: Pair length the passages were truncated for.
+        """
+        self.offsets = offsets
+        self.token_ids = token_ids
+        self.model = model
+        self.max_length = max_length
+
+    @classmethod
+    def build(
+        cls,
+        passages: List[str],
+        tokenizer: Any,
+        model: str = "",
+        max_length: int = RERANK_MAX_LENGTH
+    ) -> "RerankTokenStore":
+        """Tokenize passages with the reranker's tokenizer.
+
+        Args:
+            passages: Passage texts in doc id order.
+            tokenizer: Hugging Face tokenizer of the reranker.
+            model: Reranker model name, recorded in the manifest.
+            max_length: Cross-encoder input length.
+
+        Returns:
+            Built RerankTokenStore.
+        """
+        # Room left by the special tokens and the shortest possible query
+        budget = max_length - tokenizer.num_special_tokens_to_add(pair=True) - 1
+        lengths = np.zeros(len(passages), dtype=np.int64)
+        chunks = []
+        for start in range(0, len(passages), TOKENIZE_BATCH):
+            encoded = tokenizer(
+                passages[start:start + TOKENIZE_BATCH],
+                add_special_tokens=False,
+                truncation=True,
+                max_length=budget
+            )["input_ids"]
+            for i, ids in enumerate(encoded):
+                lengths[start + i] = len(ids)
+                chunks.append(ids)
+
+        offsets = np.zeros(len(passages) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        dtype = np.uint16 if len(tokenizer) <= np.iinfo(np.uint16).max + 1 else np.int32
+        token_ids = np.fromiter(
+            (token for ids in chunks for token in ids), dtype=dtype, count=int(offsets[-1])
+        )
+        return cls(offsets, token_ids, model, max_length)
+
+    def save(self, directory: Path) -> None:
+        """Write the offsets and ids as ``.npy`` arrays and a manifest.
+
+        Args:
+            directory: Existing, empty output directory.
+        """
+        save_array(directory, "offsets", self.offsets)
+        save_array(directory, "token_ids", self.token_ids)
+        write_manifest(directory, {
+            "format": INDEX_FORMAT,
+            "version": INDEX_FORMAT_VERSION,
+            "model": self.model,
+            "max_length": self.max_length,
+            "num_docs": int(len(self.offsets) - 1),
+            "num_tokens": int(self.offsets[-1])
+        })
+
+    @classmethod
+    def load(cls, directory: Path, model: Optional[str] = None) -> "RerankTokenStore":
+        """Open a store written by ``save`` without reading it into memory.
+
+        Args:
+            directory: Store directory.
+            model: Expected reranker model; checked when given.
+
+        Returns:
+            RerankTokenStore backed by read-only memory maps.
+
+        Raises:
+            ValueError: If the ids were made with a different model's tokenizer.
+        """
+        manifest = read_manifest(directory, INDEX_FORMAT, INDEX_FORMAT_VERSION)
+        if model is not None and manifest.get("model") != model:
+            raise ValueError(
+                f"Reranker tokens at {directory} were made for {manifest.get('model')!r} "
+                f"but the configured reranker is {model!r}. Re-run scripts/ingest.py"
+            )
+        return cls(
+            load_array(directory, "offsets"),
+            load_array(directory, "token_ids"),
+            manifest.get("model", ""),
+            manifest["max_length"]
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def doc(self, doc: int) -> np.ndarray:
+        """Passage token ids of a doc id (no special tokens)."""
+        return self.token_ids[self.offsets[doc]:self.offsets[doc + 1]]
+
+
+# Lazy-loaded global
+_rerank_token_store: Optional[RerankTokenStore] = None
+
+
+def get_rerank_token_store() -> RerankTokenStore:
+    """Get or open the passage token store (lazy loading).
+
+    Returns:
+        RerankTokenStore over the memory-mapped ids.
+    """
+    global _rerank_token_store
+    if _rerank_token_store is None:
+        _rerank_token_store = RerankTokenStore.load(RERANK_TOKENS_INDEX, RERANKER_MODEL)
+    return _rerank_token_store
@@ -1,10 +1,24 @@
 """Cross-encoder reranking for search results."""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Optional, Sequence, Tuple
 
+import numpy as np
+import torch
 from sentence_transformers import CrossEncoder
 
-from src.config import RERANKER_MODEL
+from src.config import (
+    RERANKER_MODEL,
+    RERANK_MAX_LENGTH,
+    RERANK_QUERY_MAX_TOKENS,
+    BATCH_SEARCH_RERANK_SIZE
+)
+from src.search.batching import score_pairs
+from src.search.doc_store import get_doc_store
+from src.search.cache import get_rerank_cache
+from src.search.rerank_tokens import get_rerank_token_store
+
+# Pairs per forward pass (CrossEncoder.predict's default batch size)
+PREDICT_BATCH_SIZE = 32
 
 # Lazy-loaded global
 _reranker: Optional[CrossEncoder] = None
@@ -18,44 +32,188 @@ def get_reranker() -> CrossEncoder:
     """
     global _reranker
     if _reranker is None:
-        _reranker = CrossEncoder(RERANKER_MODEL)
+        _reranker = CrossEncoder(RERANKER_MODEL, max_length=RERANK_MAX_LENGTH)
     return _reranker
 
 
+def predict_token_pairs(
+    pairs: Sequence[Tuple[List[int], np.ndarray]],
+    batch_size: int = PREDICT_BATCH_SIZE
+) -> List[float]:
+    """Cross-encoder scores of pre-tokenized (query, passage) pairs.
+
+    Each pair is assembled with the tokenizer's special tokens, the passage
+    cut to what the query leaves of the input length. Scores match
+    ``CrossEncoder.predict`` on the text pairs.
+
+    Args:
+        pairs: (query token ids, passage token ids) without special tokens.
+        batch_size: Pairs per forward pass.
+
+    Returns:
+        One score per pair.
+    """
+    model = get_reranker()
+    tokenizer = model.tokenizer
+    special = tokenizer.num_special_tokens_to_add(pair=True)
+    with_types = "token_type_ids" in tokenizer.model_input_names
+
+    model.model.eval()
+    scores: List[float] = []
+    for start in range(0, len(pairs), batch_size):
+        encoded = {"input_ids": []}
+        if with_types:
+            encoded["token_type_ids"] = []
+        for query_ids, doc_ids in pairs[start:start + batch_size]:
+            doc_ids = doc_ids[:max(0, RERANK_MAX_LENGTH - special - len(query_ids))].tolist()
+            encoded["input_ids"].append(tokenizer.build_inputs_with_special_tokens(query_ids, doc_ids))
+            if with_types:
+                encoded["token_type_ids"].append(
+                    tokenizer.create_token_type_ids_from_sequences(query_ids, doc_ids)
+                )
+
+        features = tokenizer.pad(encoded, padding=True, return_tensors="pt")
+        features = {name: tensor.to(model._target_device) for name, tensor in features.items()}
+        with torch.no_grad():
+            logits = model.default_activation_function(model.model(**features, return_dict=True).logits)
+        scores.extend(logits[:, 0].cpu().tolist())
+    return scores
+
+
+def query_token_ids(queries: List[str]) -> List[List[int]]:
+    """Reranker token ids of queries (no special tokens, truncated).
+
+    Args:
+        queries: Search queries.
+
+    Returns:
+        Token ids per query.
+    """
+    return get_reranker().tokenizer(
+        queries, add_special_tokens=False, truncation=True, max_length=RERANK_QUERY_MAX_TOKENS
+    )["input_ids"]
+
+
+def score_docs(query: str, docs: List[int]) -> List[float]:
+    """Cross-encoder scores of a query against documents.
+
+    Only the query is tokenized; passage ids come from the token store.
+
+    Args:
+        query: Search query.
+        docs: Doc ids to score.
+
+    Returns:
+        One score per doc id.
+    """
+    if not docs:
+        return []
+    query_ids = query_token_ids([query])[0]
+    tokens = get_rerank_token_store()
+    return score_pairs([(query_ids, tokens.doc(doc)) for doc in docs])
+
+
 def rerank_results(
     query: str,
-    results: List[Dict[str, Any]],
+    candidates: List[Tuple[int, float]],
     top_k: int = 10
-) -> List[Dict[str, Any]]:
+) -> List[Tuple[int, float]]:
     """Rerank search results using cross-encoder.
 
+    Passages (narrator and full text) come pre-tokenized from the rerank
+    token store. Scores of (query, hadith) pairs seen before come from the
+    rerank score cache; only the other pairs are run through the
+    cross-encoder, batched with the pairs of concurrent requests.
+
     Args:
         query: Original search query.
-        results: List of search results to rerank.
+        candidates: (doc id, score) pairs to rerank.
         top_k: Number of results to return after reranking.
 
     Returns:
-        Reranked results sorted by score.
+        (doc id, rerank score) pairs sorted by score.
     """
-    if not results:
+    if not candidates:
         return []
 
-    reranker = get_reranker()
+    store = get_doc_store()
+    cache = get_rerank_cache()
+
+    hadith_ids = [store.hadith_ids[doc] for doc, _ in candidates]
+    scores = cache.get_many(query, hadith_ids)
 
-    # Create query-document pairs
-    pairs = [
-        [query, f"{r.get('narrator', '')} {r.get('text', '')}"]
-        for r in results
+    # Create query-document pairs for uncached candidates only
+    missing = [
+        (doc, hadith_id) for (doc, _), hadith_id in zip(candidates, hadith_ids)
+        if hadith_id not in scores
     ]
+    if missing:
+        predicted = {
+            hadith_id: score
+            for (_, hadith_id), score in zip(missing, score_docs(query, [doc for doc, _ in missing]))
+        }
+        cache.set_many(query, predicted)
+        scores.update(predicted)
 
-    # Score pairs
-    scores = reranker.predict(pairs)
+    # Sort by rerank score (descending) and return top k
+    reranked = sorted(
+        ((doc, scores[hadith_id]) for (doc, _), hadith_id in zip(candidates, hadith_ids)),
+        key=lambda x: x[1],
+        reverse=True
+    )
+    return reranked[:top_k]
 
-    # Add rerank scores to results
-    for i, result in enumerate(results):
-        result["rerank_score"] = float(scores[i])
 
-    # Sort by rerank score (descending) and return top k
-    reranked = sorted(results, key=lambda x: x["rerank_score"], reverse=True)
+def rerank_results_batch(
+    queries: List[str],
+    candidate_lists: List[List[Tuple[int, float]]],
+    top_k: int = 10
+) -> List[List[Tuple[int, float]]]:
+    """Rerank the candidates of many queries together.
 
-    return reranked[:top_k]
+    Like ``rerank_results``, but the uncached pairs of every query are
+    scored in one pass, ``BATCH_SEARCH_RERANK_SIZE`` pairs per forward
+    pass, without going through the micro-batcher (a bulk request would
+    otherwise hold up interactive searches).
+
+    Args:
+        queries: Original search queries.
+        candidate_lists: (doc id, score) pairs to rerank, per query.
+        top_k: Number of results per query after reranking.
+
+    Returns:
+        One list of (doc id, rerank score) pairs per query, sorted by score.
+    """
+    store = get_doc_store()
+    cache = get_rerank_cache()
+    tokens = get_rerank_token_store()
+
+    hadith_id_lists = [[store.hadith_ids[doc] for doc, _ in candidates] for candidates in candidate_lists]
+    score_maps = [
+        cache.get_many(query, hadith_ids) if hadith_ids else {}
+        for query, hadith_ids in zip(queries, hadith_id_lists)
+    ]
+
+    # Uncached pairs of all queries, with the query each belongs to
+    missing = [
+        [(doc, hadith_id) for (doc, _), hadith_id in zip(candidates, hadith_ids) if hadith_id not in scores]
+        for candidates, hadith_ids, scores in zip(candidate_lists, hadith_id_lists, score_maps)
+    ]
+    needs = [i for i, pairs in enumerate(missing) if pairs]
+    if needs:
+        query_ids = dict(zip(needs, query_token_ids([queries[i] for i in needs])))
+        pairs = [(query_ids[i], tokens.doc(doc)) for i in needs for doc, _ in missing[i]]
+        predicted = iter(predict_token_pairs(pairs, batch_size=BATCH_SEARCH_RERANK_SIZE))
+        for i in needs:
+            new_scores = {hadith_id: next(predicted) for _, hadith_id in missing[i]}
+            cache.set_many(queries[i], new_scores)
+            score_maps[i].update(new_scores)
+
+    return [
+        sorted(
+            ((doc, scores[hadith_id]) for (doc, _), hadith_id in zip(candidates, hadith_ids)),
+            key=lambda x: x[1],
+            reverse=True
+        )[:top_k]
+        for candidates, hadith_ids, scores in zip(candidate_lists, hadith_id_lists, score_maps)
+    ]
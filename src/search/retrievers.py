@@ -0,0 +1,207 @@
+"""First-stage retrievers, run concurrently on a shared thread pool.
+
+Every retriever takes the (spell-corrected) query, its expansion and the
+filter mask, and returns ranked (doc id, score) pairs. They are registered
+by name; ``HYBRID_RETRIEVERS`` lists the ones whose results are fused for
+English queries. ``run_retrievers`` fans them out on one bounded,
+process-wide ``ThreadPoolExecutor`` (the calling thread runs the last one
+itself), so a search takes about as long as its slowest retriever rather
+than the sum: the query embedding, the vector top-k and the BM25 scoring
+spend most of their time in torch and numpy with the GIL released.
+
+A retriever may also register a batch variant taking lists of queries;
+``run_retrievers_batch`` uses it for batch search (and calls the single
+retriever per query otherwise), so a batch fuses the same retrievers as
+single searches.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config import (
+    VECTOR_TOP_K,
+    BM25_TOP_K,
+    CONCURRENT_RETRIEVAL,
+    RETRIEVAL_WORKERS
+)
+from src.search.vector_search import vector_search, vector_search_batch
+from src.search.bm25_search import bm25_search, bm25_search_batch, filter_phrase_matches
+
+# (query, expanded query, filter mask) -> ranked (doc id, score) pairs
+Retriever = Callable[[str, str, Optional[np.ndarray]], List[Tuple[int, float]]]
+
+# (queries, expanded queries, filter mask) -> ranked pairs per query
+BatchRetriever = Callable[
+    [List[str], List[str], Optional[np.ndarray]], List[List[Tuple[int, float]]]
+]
+
+# Registered retrievers by name
+RETRIEVERS: Dict[str, Retriever] = {}
+BATCH_RETRIEVERS: Dict[str, BatchRetriever] = {}
+
+
+def register_retriever(
+    name: str,
+    retriever: Retriever,
+    batch: Optional[BatchRetriever] = None
+) -> None:
+    """Make a retriever available to ``run_retrievers``.
+
+    Args:
+        name: Retriever name (also its timing key).
+        retriever: Function of (query, expanded_query, mask).
+        batch: Optional equivalent of ``retriever`` over lists of queries,
+            used by ``run_retrievers_batch``.
+    """
+    RETRIEVERS[name] = retriever
+    if batch is not None:
+        BATCH_RETRIEVERS[name] = batch
+    else:
+        BATCH_RETRIEVERS.pop(name, None)
+
+
+def _vector(query: str, expanded_query: str, mask: Optional[np.ndarray]) -> List[Tuple[int, float]]:
+    # Quoted phrases are enforced on vector hits too
+    results = vector_search(expanded_query, top_k=VECTOR_TOP_K, mask=mask)
+    return filter_phrase_matches(results, query)
+
+
+def _bm25(query: str, expanded_query: str, mask: Optional[np.ndarray]) -> List[Tuple[int, float]]:
+    # Phrases and proximity come from the original query
+    return bm25_search(expanded_query, top_k=BM25_TOP_K, original_query=query, mask=mask)
+
+
+def _vector_batch(
+    queries: List[str],
+    expanded_queries: List[str],
+    mask: Optional[np.ndarray]
+) -> List[List[Tuple[int, float]]]:
+    results = vector_search_batch(expanded_queries, VECTOR_TOP_K, mask)
+    return [filter_phrase_matches(hits, query) for hits, query in zip(results, queries)]
+
+
+def _bm25_batch(
+    queries: List[str],
+    expanded_queries: List[str],
+    mask: Optional[np.ndarray]
+) -> List[List[Tuple[int, float]]]:
+    return bm25_search_batch(expanded_queries, top_k=BM25_TOP_K, original_queries=queries, mask=mask)
+
+
+register_retriever("vector", _vector, _vector_batch)
+register_retriever("bm25", _bm25, _bm25_batch)
+
+
+# Lazy-created global
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_retrieval_executor() -> ThreadPoolExecutor:
+    """Get or create the thread pool shared by all searches."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=RETRIEVAL_WORKERS, thread_name_prefix="retrieval"
+                )
+    return _executor
+
+
+def _timed(fn: Callable[..., Any], *args: Any) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    results = fn(*args)
+    return results, (time.perf_counter() - start) * 1000
+
+
+def _fan_out(
+    calls: List[Tuple[str, Callable[..., Any]]],
+    *args: Any
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Call each function with the same arguments, concurrently when enabled."""
+    timed: Dict[str, Tuple[Any, float]] = {}
+    if not CONCURRENT_RETRIEVAL or len(calls) < 2:
+        for name, fn in calls:
+            timed[name] = _timed(fn, *args)
+    else:
+        executor = get_retrieval_executor()
+        futures: Dict[str, Future] = {
+            name: executor.submit(_timed, fn, *args) for name, fn in calls[:-1]
+        }
+        last, fn = calls[-1]
+        timed[last] = _timed(fn, *args)
+        for name, future in futures.items():
+            timed[name] = future.result()
+    results = {name: timed[name][0] for name, _ in calls}
+    timings = {name: timed[name][1] for name, _ in calls}
+    return results, timings
+
+
+def run_retrievers(
+    names: Sequence[str],
+    query: str,
+    expanded_query: str,
+    mask: Optional[np.ndarray] = None
+) -> Tuple[Dict[str, List[Tuple[int, float]]], Dict[str, float]]:
+    """Run retrievers, concurrently when enabled.
+
+    Args:
+        names: Registered retriever names.
+        query: Search query (phrases and proximity are read from it).
+        expanded_query: Query with expansion terms.
+        mask: Optional bool mask over doc ids.
+
+    Returns:
+        Tuple of (results by name, milliseconds each retriever ran).
+
+    Raises:
+        KeyError: If a name is not registered.
+        Exception: The first exception raised by a retriever.
+    """
+    return _fan_out([(name, RETRIEVERS[name]) for name in names], query, expanded_query, mask)
+
+
+def _one_by_one(retriever: Retriever) -> BatchRetriever:
+    def batch(
+        queries: List[str],
+        expanded_queries: List[str],
+        mask: Optional[np.ndarray]
+    ) -> List[List[Tuple[int, float]]]:
+        return [retriever(q, e, mask) for q, e in zip(queries, expanded_queries)]
+    return batch
+
+
+def run_retrievers_batch(
+    names: Sequence[str],
+    queries: List[str],
+    expanded_queries: List[str],
+    mask: Optional[np.ndarray] = None
+) -> Tuple[Dict[str, List[List[Tuple[int, float]]]], Dict[str, float]]:
+    """Run retrievers over many queries, concurrently when enabled.
+
+    Each retriever's batch variant is used when registered; otherwise it
+    is called once per query.
+
+    Args:
+        names: Registered retriever names.
+        queries: Search queries.
+        expanded_queries: Queries with expansion terms, in the same order.
+        mask: Optional bool mask over doc ids, shared by all queries.
+
+    Returns:
+        Tuple of (results per query by name, milliseconds each retriever
+        ran over the whole batch).
+
+    Raises:
+        KeyError: If a name is not registered.
+        Exception: The first exception raised by a retriever.
+    """
+    calls = [
+        (name, BATCH_RETRIEVERS.get(name) or _one_by_one(RETRIEVERS[name])) for name in names
+    ]
+    return _fan_out(calls, queries, expanded_queries, mask)
@@ -0,0 +1,136 @@
+"""Vectorized BM25 scoring over a sparse term-document weight matrix."""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from src.config import BM25_BATCH_SIZE
+from src.search.inverted_index import InvertedIndex
+
+
+class SparseBM25:
+    """BM25 backend that scores queries with sparse matrix products.
+
+    The corpus is a CSR matrix of shape (n_terms, n_docs) whose entries are
+    the precomputed BM25 weights (saturated tf x idf). A query is a sparse
+    row of term counts, so scoring is ``q @ W`` and a batch is ``Q @ W``.
+    """
+
+    def __init__(self, index: InvertedIndex):
+        """Wrap the postings of an inverted index as a CSR matrix.
+
+        The postings arrays already have CSR layout (term-major rows,
+        ascending doc ids), so nothing is re-sorted. The doc-id array is
+        shared with the index and the weights are the BM25 impacts computed
+        when the index was built; scipy copies only what it must convert
+        to its index dtype (the int64 offsets become an int32 ``indptr``).
+
+        Args:
+            index: Built inverted index.
+        """
+        self.index = index
+        self.num_docs = index.num_docs
+        self.matrix = csr_matrix(
+            (index.impacts, index.doc_ids, index.offsets),
+            shape=(len(index.vocab), index.num_docs)
+        )
+
+    def query_matrix(self, token_lists: List[List[str]]) -> csr_matrix:
+        """Build a sparse (n_queries, n_terms) matrix of query term counts.
+
+        Args:
+            token_lists: Tokenized queries.
+
+        Returns:
+            CSR matrix of term counts.
+        """
+        indptr = [0]
+        indices: List[int] = []
+        for tokens in token_lists:
+            indices.extend(self.index.term_ids(tokens))
+            indptr.append(len(indices))
+
+        data = np.ones(len(indices), dtype=np.float64)
+        queries = csr_matrix(
+            (data, np.array(indices, dtype=np.int64), np.array(indptr, dtype=np.int64)),
+            shape=(len(token_lists), len(self.index.vocab))
+        )
+        # Merge repeated terms into counts
+        queries.sum_duplicates()
+        return queries
+
+    def top_k(self, tokens: List[str], k: int) -> List[Tuple[int, float]]:
+        """Return the k best documents for a single query.
+
+        Args:
+            tokens: Query tokens.
+            k: Number of results.
+
+        Returns:
+            List of (doc index, score), best first.
+        """
+        return self.top_k_batch([tokens], k)[0]
+
+    def top_k_batch(
+        self,
+        token_lists: List[List[str]],
+        k: int,
+        mask: Optional[np.ndarray] = None
+    ) -> List[List[Tuple[int, float]]]:
+        """Return the k best documents for each query in a batch.
+
+        Queries are scored in chunks of ``BM25_BATCH_SIZE`` with one sparse
+        matmul per chunk, which bounds the size of the score matrix.
+
+        Args:
+            token_lists: Tokenized queries.
+            k: Number of results per query.
+            mask: Optional bool array over documents; only True documents
+                are selected.
+
+        Returns:
+            One list of (doc index, score) per query, best first.
+        """
+        results: List[List[Tuple[int, float]]] = []
+        for start in range(0, len(token_lists), BM25_BATCH_SIZE):
+            chunk = token_lists[start:start + BM25_BATCH_SIZE]
+            scores = self.query_matrix(chunk) @ self.matrix
+            scores.sort_indices()
+
+            for row in range(scores.shape[0]):
+                lo, hi = scores.indptr[row], scores.indptr[row + 1]
+                candidates, values = scores.indices[lo:hi], scores.data[lo:hi]
+                if mask is not None:
+                    keep = mask[candidates]
+                    candidates, values = candidates[keep], values[keep]
+                results.append(select_top_k_array(candidates, values, k))
+        return results
+
+
+def select_top_k_array(
+    candidates: np.ndarray,
+    scores: np.ndarray,
+    k: int
+) -> List[Tuple[int, float]]:
+    """Select the k highest scores with numpy partitioning.
+
+    Orders by score descending, then doc index ascending, which matches
+    the heap selection of the postings engine.
+
+    Args:
+        candidates: Doc indices.
+        scores: Score per candidate.
+        k: Number of results.
+
+    Returns:
+        List of (doc index, score), best first.
+    """
+    if len(scores) > k:
+        # Keep everything tied with the k-th score so ties resolve by index
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        keep = scores >= kth
+        candidates, scores = candidates[keep], scores[keep]
+
+    order = np.lexsort((candidates, -scores))[:k]
+    return list(zip(candidates[order].tolist(), scores[order].tolist()))
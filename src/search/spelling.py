@@ -0,0 +1,366 @@
+"""Spelling correction with a precomputed symmetric-delete dictionary.
+
+SymSpell-style: at ingest every dictionary word is expanded to all strings
+obtained by deleting up to ``SPELLING_MAX_EDIT_DISTANCE`` characters from
+its prefix, and the crc32 of each delete is stored in a sorted array
+alongside the word id. At query time the same deletes are generated for an
+unknown word and looked up with ``np.searchsorted``; only the handful of
+words sharing a delete are verified with an edit distance computation, so
+no query scans the vocabulary.
+
+The dictionary is the corpus surface vocabulary (words appearing in at
+least ``SPELLING_MIN_COUNT`` hadiths) plus the ``TERM_MAPPINGS`` keys of
+query expansion, stored as a memory-mapped index directory.
+"""
+
+import bisect
+import re
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from src.config import (
+    SPELLING_INDEX,
+    SPELLING_MAX_EDIT_DISTANCE,
+    SPELLING_PREFIX_LENGTH,
+    SPELLING_MIN_COUNT,
+    SPELLING_MIN_WORD_LENGTH,
+    SPELLING_MAPPING_COUNT
+)
+from src.search.analyzer import TOKEN_PATTERN, get_analyzer
+from src.search.bm25_search import get_bm25_data
+from src.search.query_expansion import TERM_MAPPINGS
+from src.search.storage import (
+    save_array,
+    load_array,
+    write_manifest,
+    read_manifest,
+    write_string_table,
+    StringTable
+)
+
+# On-disk format written by SpellingIndex.save
+INDEX_FORMAT = "spelling-deletes"
+INDEX_FORMAT_VERSION = 1
+
+# Words in a query, keeping their original case and surroundings
+QUERY_WORD = re.compile(r"[^\W\d_]+")
+
+
+def deletes(word: str, max_distance: int, prefix_length: int) -> Set[str]:
+    """All strings reachable by deleting up to ``max_distance`` characters.
+
+    Only the first ``prefix_length`` characters are used, which bounds the
+    number of deletes for long words.
+
+    Args:
+        word: Word to expand.
+        max_distance: Maximum number of deleted characters.
+        prefix_length: Prefix length to expand.
+
+    Returns:
+        Set of deletes, including the prefix itself.
+    """
+    frontier = {word[:prefix_length]}
+    result = set(frontier)
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))}
+        result |= frontier
+    return result
+
+
+def delete_hashes(words: Set[str]) -> np.ndarray:
+    """crc32 of each delete string.
+
+    Args:
+        words: Delete strings.
+
+    Returns:
+        uint32 hashes.
+    """
+    return np.array([zlib.crc32(w.encode("utf-8")) for w in words], dtype=np.uint32)
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Optimal string alignment distance (Levenshtein plus transpositions).
+
+    Args:
+        a: First string.
+        b: Second string.
+        max_distance: Distances above this are reported as ``max_distance + 1``.
+
+    Returns:
+        Edit distance, capped at ``max_distance + 1``.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    # Common affixes never change the distance; typos leave little else
+    start = 0
+    while start < min(len(a), len(b)) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < min(len(a), len(b)) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+    if not a or not b:
+        return min(max(len(a), len(b)), max_distance + 1)
+
+    # Only cells within max_distance of the diagonal can stay in bounds
+    too_far = max_distance + 1
+    previous2: List[int] = []
+    previous = [j if j <= max_distance else too_far for j in range(len(b) + 1)]
+    for i in range(1, len(a) + 1):
+        current = [too_far] * (len(b) + 1)
+        current[0] = row_min = min(i, too_far)
+        for j in range(max(1, i - max_distance), min(len(b), i + max_distance) + 1):
+            value = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (a[i - 1] != b[j - 1])
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return too_far
+        previous2, previous = previous, current
+    return min(previous[-1], too_far)
+
+
+class SpellingIndex:
+    """Symmetric-delete dictionary over known words."""
+
+    def __init__(
+        self,
+        words: Sequence[str],
+        counts: np.ndarray,
+        hashes: np.ndarray,
+        word_ids: np.ndarray,
+        max_distance: int = SPELLING_MAX_EDIT_DISTANCE,
+        prefix_length: int = SPELLING_PREFIX_LENGTH
+    ):
+        """Initialize index from prebuilt arrays.
+
+        Args:
+            words: Sorted dictionary words; a word's id is its position.
+            counts: Frequency per word id.
+            hashes: Sorted crc32 of every delete.
+            word_ids: Word id per entry of ``hashes``.
+            max_distance: Maximum edit distance of corrections.
+            prefix_length: Prefix length the deletes were generated from.
+        """
+        self.words = words
+        self.counts = counts
+        self.hashes = hashes
+        self.word_ids = word_ids
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+
+    @classmethod
+    def build(
+        cls,
+        counts: Dict[str, int],
+        max_distance: int = SPELLING_MAX_EDIT_DISTANCE,
+        prefix_length: int = SPELLING_PREFIX_LENGTH
+    ) -> "SpellingIndex":
+        """Build the delete table for a dictionary.
+
+        Args:
+            counts: Word -> frequency.
+            max_distance: Maximum edit distance of corrections.
+            prefix_length: Prefix length to expand.
+
+        Returns:
+            Built SpellingIndex.
+        """
+        words = sorted(counts)
+        hashes = [np.zeros(0, dtype=np.uint32)]
+        word_ids = [np.zeros(0, dtype=np.int32)]
+        for word_id, word in enumerate(words):
+            word_hashes = delete_hashes(deletes(word, max_distance, prefix_length))
+            hashes.append(word_hashes)
+            word_ids.append(np.full(len(word_hashes), word_id, dtype=np.int32))
+
+        hashes = np.concatenate(hashes)
+        order = np.argsort(hashes, kind="stable")
+        return cls(
+            words,
+            np.array([counts[w] for w in words], dtype=np.int64),
+            hashes[order],
+            np.concatenate(word_ids)[order],
+            max_distance,
+            prefix_length
+        )
+
+    def save(self, directory: Path) -> None:
+        """Write the index as ``.npy`` arrays, a word table and a manifest.
+
+        Args:
+            directory: Existing, empty output directory.
+        """
+        write_string_table(directory, "words", list(self.words))
+        save_array(directory, "counts", self.counts)
+        save_array(directory, "hashes", self.hashes)
+        save_array(directory, "word_ids", self.word_ids)
+        write_manifest(directory, {
+            "format": INDEX_FORMAT,
+            "version": INDEX_FORMAT_VERSION,
+            "max_distance": self.max_distance,
+            "prefix_length": self.prefix_length,
+            "num_words": len(self.words),
+            "num_deletes": len(self.hashes)
+        })
+
+    @classmethod
+    def load(cls, directory: Path) -> "SpellingIndex":
+        """Open an index written by ``save`` without reading it into memory.
+
+        Args:
+            directory: Index directory.
+
+        Returns:
+            SpellingIndex backed by read-only memory maps.
+        """
+        manifest = read_manifest(directory, INDEX_FORMAT, INDEX_FORMAT_VERSION)
+        return cls(
+            StringTable(directory, "words"),
+            load_array(directory, "counts"),
+            load_array(directory, "hashes"),
+            load_array(directory, "word_ids"),
+            manifest["max_distance"],
+            manifest["prefix_length"]
+        )
+
+    def __contains__(self, word: str) -> bool:
+        i = bisect.bisect_left(self.words, word)
+        return i < len(self.words) and self.words[i] == word
+
+    def lookup(self, word: str) -> Optional[Tuple[str, int]]:
+        """Find the closest dictionary word.
+
+        Candidates sharing a delete with ``word`` are ranked by edit
+        distance, then by frequency.
+
+        Args:
+            word: Lowercase word.
+
+        Returns:
+            Tuple of (suggestion, distance), or None if nothing is within
+            ``max_distance``.
+        """
+        query_hashes = delete_hashes(deletes(word, self.max_distance, self.prefix_length))
+        lo = np.searchsorted(self.hashes, query_hashes, side="left")
+        hi = np.searchsorted(self.hashes, query_hashes, side="right")
+        candidates = np.unique(np.concatenate(
+            [self.word_ids[a:b] for a, b in zip(lo.tolist(), hi.tolist()) if b > a] or
+            [np.zeros(0, dtype=np.int32)]
+        ))
+
+        strings = [(self.words[i], int(self.counts[i])) for i in candidates.tolist()]
+
+        # Verify with increasing bounds: a close match is usually found
+        # first, and the early exit then rejects far candidates in a row
+        best = None
+        for bound in range(1, self.max_distance + 1):
+            for candidate, count in strings:
+                distance = edit_distance(word, candidate, bound)
+                key = (distance, -count, candidate)
+                if distance <= bound and (best is None or key < best):
+                    best = key
+            if best is not None:
+                break
+        return (best[2], best[0]) if best is not None else None
+
+
+def dictionary_counts(hadiths: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Count corpus words (by number of hadiths) and add expansion keys.
+
+    Args:
+        hadiths: List of hadith records.
+
+    Returns:
+        Word -> document frequency for words in at least
+        ``SPELLING_MIN_COUNT`` hadiths, plus every ``TERM_MAPPINGS`` key.
+    """
+    analyzer = get_analyzer()
+    df: Counter = Counter()
+    for h in hadiths:
+        df.update(set(QUERY_WORD.findall(analyzer.normalize(h["full_text"]))))
+
+    counts = {
+        word: count for word, count in df.items()
+        if count >= SPELLING_MIN_COUNT and len(word) >= SPELLING_MIN_WORD_LENGTH
+    }
+    for key in TERM_MAPPINGS:
+        counts[key] = max(counts.get(key, 0), SPELLING_MAPPING_COUNT)
+    return counts
+
+
+# Lazy-loaded global
+_spelling_index: Optional[SpellingIndex] = None
+
+
+def get_spelling_index() -> SpellingIndex:
+    """Get or open the spelling index (lazy loading).
+
+    Returns:
+        SpellingIndex over the memory-mapped delete table.
+    """
+    global _spelling_index
+    if _spelling_index is None:
+        _spelling_index = SpellingIndex.load(SPELLING_INDEX)
+    return _spelling_index
+
+
+def is_known(word: str) -> bool:
+    """Check whether a query word needs no correction.
+
+    A word is known if it is an expansion key, a stopword, or analyzes to a
+    term in the BM25 vocabulary.
+
+    Args:
+        word: Lowercase word.
+
+    Returns:
+        True if the word is searchable as typed.
+    """
+    if word in TERM_MAPPINGS:
+        return True
+    terms = get_analyzer().tokenize(word)
+    return all(t in get_bm25_data()["index"].vocab for t in terms)
+
+
+def correct_query(query: str) -> Tuple[str, Dict[str, str]]:
+    """Rewrite unknown query words to their closest dictionary words.
+
+    Args:
+        query: Search query.
+
+    Returns:
+        Tuple of (corrected query, {original word: correction}). The query
+        is returned unchanged if every word is known.
+    """
+    index = get_spelling_index()
+    analyzer = get_analyzer()
+    corrections: Dict[str, str] = {}
+
+    for word in set(QUERY_WORD.findall(query)):
+        normalized = analyzer.normalize(word)
+        if len(normalized) < SPELLING_MIN_WORD_LENGTH or not TOKEN_PATTERN.fullmatch(normalized):
+            continue
+        if normalized in index or is_known(normalized):
+            continue
+        suggestion = index.lookup(normalized)
+        if suggestion is not None and suggestion[0] != normalized:
+            corrections[word] = suggestion[0]
+
+    if not corrections:
+        return query, corrections
+    corrected = QUERY_WORD.sub(lambda m: corrections.get(m.group(), m.group()), query)
+    return corrected, corrections
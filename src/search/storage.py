@@ -0,0 +1,239 @@
+"""Flat on-disk array storage shared by the memory-mapped indices.
+
+Every index is a directory holding a ``manifest.json`` plus ``.npy`` arrays
+and string tables. Arrays are opened with ``np.load(mmap_mode="r")`` and
+string blobs with ``mmap``, so opening an index only maps files: nothing is
+deserialized and the pages are shared by every worker process through the
+OS page cache.
+"""
+
+import bisect
+import json
+import mmap
+import shutil
+from collections.abc import Mapping
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Tuple
+
+import numpy as np
+
+MANIFEST = "manifest.json"
+
+
+def save_array(directory: Path, name: str, array: np.ndarray) -> None:
+    """Write an array as ``<name>.npy``.
+
+    Args:
+        directory: Index directory.
+        name: Array name.
+        array: Array to save.
+    """
+    np.save(directory / f"{name}.npy", np.ascontiguousarray(array))
+
+
+def load_array(directory: Path, name: str) -> np.ndarray:
+    """Memory-map ``<name>.npy`` read-only.
+
+    Args:
+        directory: Index directory.
+        name: Array name.
+
+    Returns:
+        Read-only ndarray view of the memory map (plain ndarray slicing
+        avoids the per-slice overhead of ``np.memmap``).
+    """
+    return np.load(directory / f"{name}.npy", mmap_mode="r").view(np.ndarray)
+
+
+def write_manifest(directory: Path, manifest: Dict[str, Any]) -> None:
+    """Write the index manifest.
+
+    Args:
+        directory: Index directory.
+        manifest: JSON-serializable manifest (must include format and version).
+    """
+    with open(directory / MANIFEST, 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+
+def read_manifest(directory: Path, format_name: str, version: int) -> Dict[str, Any]:
+    """Read and validate an index manifest.
+
+    Args:
+        directory: Index directory.
+        format_name: Expected format name.
+        version: Expected format version.
+
+    Returns:
+        Manifest dict.
+
+    Raises:
+        ValueError: If the index has a different format or version.
+    """
+    with open(directory / MANIFEST) as f:
+        manifest = json.load(f)
+
+    found = (manifest.get("format"), manifest.get("version"))
+    if found != (format_name, version):
+        raise ValueError(
+            f"Index at {directory} is {found[0]} v{found[1]}, expected "
+            f"{format_name} v{version}. Rebuild it with scripts/ingest.py"
+        )
+    return manifest
+
+
+def replace_directory(built: Path, target: Path) -> None:
+    """Swap a freshly built index directory into place.
+
+    Files are never rewritten in place, so processes that still have the old
+    index mapped keep reading valid (unlinked) files.
+
+    Args:
+        built: Directory containing the new index.
+        target: Final index location.
+    """
+    old = target.with_name(target.name + ".old")
+    if old.exists():
+        shutil.rmtree(old)
+    if target.exists():
+        target.rename(old)
+    built.rename(target)
+    if old.exists():
+        shutil.rmtree(old)
+
+
+def encode_varints(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Varint-encode non-negative integers (7 bits per byte, LEB128).
+
+    Args:
+        values: Non-negative integers.
+
+    Returns:
+        Tuple of (uint8 encoded bytes, int64 byte offset of each value with
+        the total length appended).
+    """
+    values = np.asarray(values, dtype=np.uint64)
+    sizes = np.ones(len(values), dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        sizes += rest > 0
+        rest >>= np.uint64(7)
+
+    starts = np.zeros(len(values) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=starts[1:])
+    encoded = np.zeros(starts[-1], dtype=np.uint8)
+    for j in range(int(sizes.max()) if len(values) else 0):
+        has = sizes > j
+        chunk = (values[has] >> np.uint64(7 * j)) & np.uint64(0x7F)
+        more = (sizes[has] > j + 1).astype(np.uint64) << np.uint64(7)
+        encoded[starts[:-1][has] + j] = (chunk | more).astype(np.uint8)
+    return encoded, starts
+
+
+def decode_varints(data: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Decode varints written by ``encode_varints``, vectorized.
+
+    Args:
+        data: uint8 encoded bytes (a whole number of varints).
+
+    Returns:
+        Tuple of (int64 decoded values, bool mask of bytes ending a value).
+    """
+    data = np.asarray(data, dtype=np.uint8)
+    ends = (data & 0x80) == 0
+    if not len(data):
+        return np.zeros(0, dtype=np.int64), ends
+
+    starts = np.flatnonzero(np.concatenate(([True], ends[:-1])))
+    value_of_byte = np.cumsum(ends) - ends
+    shifts = 7 * (np.arange(len(data)) - starts[value_of_byte])
+    parts = (data & 0x7F).astype(np.int64) << shifts
+    return np.add.reduceat(parts, starts), ends
+
+
+def write_string_table(directory: Path, name: str, strings: List[str]) -> None:
+    """Write strings as one UTF-8 blob plus an offsets array.
+
+    Args:
+        directory: Index directory.
+        name: Table name.
+        strings: Strings to store, in order.
+    """
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+
+    with open(directory / f"{name}.bin", 'wb') as f:
+        f.write(b"".join(encoded))
+    save_array(directory, f"{name}_offsets", offsets)
+
+
+class StringTable:
+    """Read-only memory-mapped sequence of strings."""
+
+    def __init__(self, directory: Path, name: str):
+        """Map a string table written by ``write_string_table``.
+
+        Args:
+            directory: Index directory.
+            name: Table name.
+        """
+        self.offsets = load_array(directory, f"{name}_offsets")
+        with open(directory / f"{name}.bin", 'rb') as f:
+            size = f.seek(0, 2)
+            self._blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._blob[self.offsets[i]:self.offsets[i + 1]].decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+
+def write_lookup(directory: Path, name: str, mapping: Dict[str, int]) -> None:
+    """Write a string -> int mapping as a sorted string table plus values.
+
+    Args:
+        directory: Index directory.
+        name: Lookup name.
+        mapping: Mapping to store.
+    """
+    keys = sorted(mapping)
+    write_string_table(directory, name, keys)
+    save_array(directory, f"{name}_values", np.array([mapping[k] for k in keys], dtype=np.int64))
+
+
+class MappedLookup(Mapping):
+    """Read-only string -> int mapping resolved by binary search.
+
+    Behaves like the dict it was written from, but lookups bisect the
+    memory-mapped sorted keys instead of building a Python dict.
+    """
+
+    def __init__(self, directory: Path, name: str):
+        """Map a lookup written by ``write_lookup``.
+
+        Args:
+            directory: Index directory.
+            name: Lookup name.
+        """
+        self.keys_table = StringTable(directory, name)
+        self.values = load_array(directory, f"{name}_values")
+
+    def __getitem__(self, key: str) -> int:
+        i = bisect.bisect_left(self.keys_table, key)
+        if i < len(self.keys_table) and self.keys_table[i] == key:
+            return int(self.values[i])
+        raise KeyError(key)
+
+    def __len__(self) -> int:
+        return len(self.keys_table)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys_table)
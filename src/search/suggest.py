@@ -0,0 +1,269 @@
+"""Typeahead suggestions from a sorted, memory-mapped prefix table.
+
+Every suggestion (corpus word, narrator name, chapter title or query
+expansion term) is stored once with a weight (number of hadiths it occurs
+in). Its normalized form and the normalized suffix starting at each later
+word ("huraira" for "Abu Huraira") are keys in one sorted string table, so
+a prefix is answered by two binary searches plus a top-N selection over
+the matching range. No model, reranker or vector store is involved.
+"""
+
+import bisect
+import re
+from collections import Counter
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config import SUGGEST_INDEX, SUGGEST_LIMIT, SUGGEST_MIN_PREFIX, SUGGEST_TERM_WEIGHT
+from src.search.analyzer import STOPWORDS, get_analyzer
+from src.search.query_expansion import TERM_MAPPINGS
+from src.search.spelling import dictionary_counts
+from src.search.storage import (
+    save_array,
+    load_array,
+    write_manifest,
+    read_manifest,
+    write_string_table,
+    StringTable
+)
+
+# On-disk format written by SuggestIndex.save
+INDEX_FORMAT = "suggest-prefix"
+INDEX_FORMAT_VERSION = 1
+
+# Suggestion kinds, stored as uint8
+KINDS = ("term", "word", "narrator", "chapter")
+
+# Narrator lines: "Narrated Abu Huraira:" and "Abu Huraira reported:"
+NARRATED_BY = re.compile(r"^Narrated ([^:()]{2,60}):$")
+REPORTED_BY = re.compile(r"^([^:,()]{2,40}?) (?:reported|narrated)\b")
+MAX_NAME_WORDS = 5
+
+# Sorts after every character, closing a prefix range
+PREFIX_END = chr(0x10FFFF)
+
+
+def narrator_name(narrator: str) -> Optional[str]:
+    """Extract the narrator's name from a narrator line.
+
+    Args:
+        narrator: Narrator line, e.g. "Narrated `Aisha:".
+
+    Returns:
+        Name without backticks (e.g. "Aisha"), or None if the line does
+        not start with a short name.
+    """
+    match = NARRATED_BY.match(narrator) or REPORTED_BY.match(narrator)
+    if match is None:
+        return None
+    name = match.group(1).replace("`", "").strip()
+    if not name or len(name.split()) > MAX_NAME_WORDS:
+        return None
+    return name
+
+
+class SuggestIndex:
+    """Sorted prefix table of weighted suggestions."""
+
+    def __init__(
+        self,
+        keys: Sequence[str],
+        key_entries: np.ndarray,
+        entries: Sequence[str],
+        kinds: np.ndarray,
+        weights: np.ndarray
+    ):
+        """Initialize index from prebuilt arrays.
+
+        Args:
+            keys: Sorted normalized keys.
+            key_entries: Entry id per key.
+            entries: Display text per entry.
+            kinds: Index into ``KINDS`` per entry.
+            weights: Weight per entry.
+        """
+        self.keys = keys
+        self.key_entries = key_entries
+        self.entries = entries
+        self.kinds = kinds
+        self.weights = weights
+
+    @classmethod
+    def build(cls, suggestions: Dict[str, Tuple[str, int]]) -> "SuggestIndex":
+        """Build the prefix table.
+
+        Args:
+            suggestions: Display text -> (kind, weight).
+
+        Returns:
+            Built SuggestIndex.
+        """
+        analyzer = get_analyzer()
+        entries = sorted(suggestions)
+        pairs = set()
+        for entry_id, entry in enumerate(entries):
+            words = analyzer.normalize(entry).split()
+            for i in range(len(words)):
+                pairs.add((" ".join(words[i:]), entry_id))
+        pairs = sorted(pairs)
+
+        return cls(
+            [key for key, _ in pairs],
+            np.array([entry_id for _, entry_id in pairs], dtype=np.int32),
+            entries,
+            np.array([KINDS.index(suggestions[e][0]) for e in entries], dtype=np.uint8),
+            np.array([suggestions[e][1] for e in entries], dtype=np.int64)
+        )
+
+    def save(self, directory: Path) -> None:
+        """Write the index as string tables, ``.npy`` arrays and a manifest.
+
+        Args:
+            directory: Existing, empty output directory.
+        """
+        write_string_table(directory, "keys", list(self.keys))
+        save_array(directory, "key_entries", self.key_entries)
+        write_string_table(directory, "entries", list(self.entries))
+        save_array(directory, "kinds", self.kinds)
+        save_array(directory, "weights", self.weights)
+        write_manifest(directory, {
+            "format": INDEX_FORMAT,
+            "version": INDEX_FORMAT_VERSION,
+            "num_keys": len(self.keys),
+            "num_entries": len(self.entries)
+        })
+
+    @classmethod
+    def load(cls, directory: Path) -> "SuggestIndex":
+        """Open an index written by ``save`` without reading it into memory.
+
+        Args:
+            directory: Index directory.
+
+        Returns:
+            SuggestIndex backed by read-only memory maps.
+        """
+        read_manifest(directory, INDEX_FORMAT, INDEX_FORMAT_VERSION)
+        return cls(
+            StringTable(directory, "keys"),
+            load_array(directory, "key_entries"),
+            StringTable(directory, "entries"),
+            load_array(directory, "kinds"),
+            load_array(directory, "weights")
+        )
+
+    def suggest(self, prefix: str, limit: int = SUGGEST_LIMIT) -> List[Dict[str, Any]]:
+        """Return the highest weighted suggestions matching a prefix.
+
+        Args:
+            prefix: Typed text; matched against the start of any word of a
+                suggestion, ignoring case and diacritics.
+            limit: Maximum number of suggestions.
+
+        Returns:
+            List of {"text", "kind", "weight"}, highest weight first.
+        """
+        prefix = " ".join(get_analyzer().normalize(prefix).split())
+        if len(prefix) < SUGGEST_MIN_PREFIX:
+            return []
+
+        lo = bisect.bisect_left(self.keys, prefix)
+        hi = bisect.bisect_left(self.keys, prefix + PREFIX_END, lo)
+        entry_ids = np.unique(self.key_entries[lo:hi])
+        weights = self.weights[entry_ids]
+
+        if len(entry_ids) > limit:
+            top = np.argpartition(-weights, limit - 1)[:limit]
+            entry_ids, weights = entry_ids[top], weights[top]
+        order = np.lexsort((entry_ids, -weights))
+
+        return [
+            {
+                "text": self.entries[entry_id],
+                "kind": KINDS[self.kinds[entry_id]],
+                "weight": int(self.weights[entry_id])
+            }
+            for entry_id in entry_ids[order].tolist()
+        ]
+
+
+def collect_suggestions(hadiths: List[Dict[str, Any]]) -> Dict[str, Tuple[str, int]]:
+    """Gather suggestion candidates and their weights from the corpus.
+
+    Args:
+        hadiths: List of hadith records.
+
+    Returns:
+        Display text -> (kind, weight). Weights are numbers of hadiths;
+        expansion terms get at least ``SUGGEST_TERM_WEIGHT``.
+    """
+    analyzer = get_analyzer()
+
+    # Narrator spellings differing only in apostrophes/case are one name,
+    # shown in its most common spelling
+    narrator_counts: Counter = Counter()
+    spellings: Dict[str, Counter] = {}
+    for h in hadiths:
+        name = narrator_name(h.get("narrator", ""))
+        if name is not None:
+            key = analyzer.normalize(name)
+            narrator_counts[key] += 1
+            spellings.setdefault(key, Counter())[name] += 1
+
+    chapters = Counter(h.get("chapter", "") for h in hadiths)
+    chapters.pop("", None)
+    chapters.pop("Unknown", None)
+
+    counts = dictionary_counts(hadiths)
+    candidates = [
+        (term, "term", max(counts.get(term, 0), SUGGEST_TERM_WEIGHT)) for term in TERM_MAPPINGS
+    ]
+    candidates += [
+        (spellings[key].most_common(1)[0][0], "narrator", count)
+        for key, count in narrator_counts.items()
+    ]
+    candidates += [(chapter, "chapter", count) for chapter, count in chapters.items()]
+    candidates += [
+        (word, "word", count) for word, count in counts.items() if word not in STOPWORDS
+    ]
+
+    # Earlier sources win when the same text (ignoring case) appears twice
+    suggestions: Dict[str, Tuple[str, int]] = {}
+    seen = set()
+    for text, kind, weight in candidates:
+        normalized = analyzer.normalize(text)
+        if normalized.strip() and normalized not in seen:
+            seen.add(normalized)
+            suggestions[text] = (kind, weight)
+    return suggestions
+
+
+# Lazy-loaded global
+_suggest_index: Optional[SuggestIndex] = None
+
+
+def get_suggest_index() -> SuggestIndex:
+    """Get or open the suggestion index (lazy loading).
+
+    Returns:
+        SuggestIndex over the memory-mapped prefix table.
+    """
+    global _suggest_index
+    if _suggest_index is None:
+        _suggest_index = SuggestIndex.load(SUGGEST_INDEX)
+    return _suggest_index
+
+
+def suggest(prefix: str, limit: int = SUGGEST_LIMIT) -> List[Dict[str, Any]]:
+    """Suggest completions for a typed prefix.
+
+    Args:
+        prefix: Typed text.
+        limit: Maximum number of suggestions.
+
+    Returns:
+        List of {"text", "kind", "weight"}, highest weight first.
+    """
+    return get_suggest_index().suggest(prefix, limit)
@@ -1,26 +1,56 @@
-"""ChromaDB vector semantic search."""
+"""Vector semantic search (ChromaDB or exact memory-mapped backend)."""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Optional, Tuple
 
 import chromadb
-from sentence_transformers import SentenceTransformer
+import numpy as np
 
-from src.config import EMBEDDING_MODEL, CHROMA_DIR, CHROMA_COLLECTION, VECTOR_TOP_K
+from src.config import (
+    EMBEDDING_MODEL,
+    EMBEDDING_BACKEND,
+    ONNX_EMBEDDING_DIR,
+    CHROMA_DIR,
+    CHROMA_COLLECTION,
+    VECTOR_INDEX,
+    VECTOR_BACKEND,
+    VECTOR_QUANTIZATION,
+    VECTOR_RESCORE_CANDIDATES,
+    VECTOR_TOP_K,
+    BATCH_SEARCH_ENCODE_SIZE
+)
+from src.search.batching import embed_texts
+from src.search.doc_store import get_doc_store
+from src.search.cache import get_embedding_cache
+from src.search.dense_index import DenseIndex
 
 # Lazy-loaded globals
-_embedding_model: Optional[SentenceTransformer] = None
+_embedding_model = None
 _chroma_collection = None
+_dense_index: Optional[DenseIndex] = None
 
 
-def get_embedding_model() -> SentenceTransformer:
+def get_embedding_model():
     """Get or load embedding model (lazy loading).
 
+    ``EMBEDDING_BACKEND`` selects PyTorch (SentenceTransformer) or the int8
+    ONNX Runtime export; torch is only imported for the former.
+
     Returns:
-        Loaded SentenceTransformer model.
+        Loaded SentenceTransformer or OnnxEmbedder (same ``encode`` call).
+
+    Raises:
+        ValueError: If the configured backend is unknown.
     """
     global _embedding_model
     if _embedding_model is None:
-        _embedding_model = SentenceTransformer(EMBEDDING_MODEL)
+        if EMBEDDING_BACKEND == "onnx":
+            from src.search.onnx_embedder import OnnxEmbedder
+            _embedding_model = OnnxEmbedder.load(ONNX_EMBEDDING_DIR, model=EMBEDDING_MODEL)
+        elif EMBEDDING_BACKEND == "torch":
+            from sentence_transformers import SentenceTransformer
+            _embedding_model = SentenceTransformer(EMBEDDING_MODEL)
+        else:
+            raise ValueError(f"Unknown embedding backend: {EMBEDDING_BACKEND}")
     return _embedding_model
 
 
@@ -43,48 +73,197 @@ def get_chroma_collection():
     return _chroma_collection
 
 
-def vector_search(query: str, top_k: int = VECTOR_TOP_K) -> List[Dict[str, Any]]:
-    """Search hadiths by semantic similarity.
+def get_dense_index() -> DenseIndex:
+    """Get or open the memory-mapped embedding matrix (lazy loading).
+
+    Returns:
+        DenseIndex over the normalized document embeddings.
+    """
+    global _dense_index
+    if _dense_index is None:
+        _dense_index = DenseIndex.load(
+            VECTOR_INDEX,
+            model=EMBEDDING_MODEL,
+            quantization=VECTOR_QUANTIZATION,
+            rescore=VECTOR_RESCORE_CANDIDATES
+        )
+    return _dense_index
+
+
+def encode_query(query: str) -> np.ndarray:
+    """Embed a query, reusing cached embeddings of the same text.
+
+    Uncached queries are embedded through the micro-batcher, so queries of
+    concurrent requests share one forward pass.
 
     Args:
-        query: Search query.
+        query: Exact text to embed.
+
+    Returns:
+        Read-only float32 query embedding.
+    """
+    cache = get_embedding_cache()
+    embedding = cache.get(query)
+    if embedding is None:
+        embedding = cache.set(query, embed_texts([query])[0])
+    return embedding
+
+
+def encode_queries(queries: List[str]) -> List[np.ndarray]:
+    """Embed many queries, reusing cached embeddings.
+
+    All uncached queries go through one ``encode`` call (in batches of
+    ``BATCH_SEARCH_ENCODE_SIZE``), bypassing the micro-batcher so a bulk
+    request does not hold up interactive searches.
+
+    Args:
+        queries: Exact texts to embed.
+
+    Returns:
+        Read-only float32 embedding per query, in input order.
+    """
+    cache = get_embedding_cache()
+    embeddings: List[Optional[np.ndarray]] = [cache.get(query) for query in queries]
+    missing = sorted({query for query, embedding in zip(queries, embeddings) if embedding is None})
+    if missing:
+        encoded = get_embedding_model().encode(missing, batch_size=BATCH_SEARCH_ENCODE_SIZE)
+        stored = {query: cache.set(query, embedding) for query, embedding in zip(missing, encoded)}
+        embeddings = [stored[query] if embedding is None else embedding
+                      for query, embedding in zip(queries, embeddings)]
+    return embeddings
+
+
+def _dense_search(
+    query_embedding: np.ndarray,
+    top_k: int,
+    mask: Optional[np.ndarray]
+) -> List[Tuple[int, float]]:
+    """Cosine search over the memory-mapped embedding matrix.
+
+    Exact, or a quantized first pass with float rescoring when
+    ``VECTOR_QUANTIZATION`` is set. Matrix rows are doc store ids.
+
+    Args:
+        query_embedding: Query embedding.
         top_k: Number of results to return.
+        mask: Optional bool array over doc ids to restrict results.
 
     Returns:
-        List of search results with scores and metadata.
+        List of (doc id, cosine similarity), best first.
     """
-    model = get_embedding_model()
-    collection = get_chroma_collection()
+    return get_dense_index().top_k(query_embedding, top_k, mask)
+
+
+def _chroma_search(query_embedding: np.ndarray, top_k: int) -> List[Tuple[int, float]]:
+    """Approximate (HNSW) search through ChromaDB.
 
-    # Embed query
-    query_embedding = model.encode(query).tolist()
+    Args:
+        query_embedding: Query embedding.
+        top_k: Number of results to return.
+
+    Returns:
+        List of (doc id, cosine similarity), best first.
+    """
+    return _chroma_search_batch([query_embedding], top_k)[0]
+
+
+def _chroma_search_batch(
+    query_embeddings: List[np.ndarray],
+    top_k: int
+) -> List[List[Tuple[int, float]]]:
+    """Approximate (HNSW) search of many queries in one ChromaDB call.
+
+    Only ids and distances are requested; hadith ids are mapped to doc
+    store ids.
+
+    Args:
+        query_embeddings: Query embeddings.
+        top_k: Number of results per query.
+
+    Returns:
+        One list of (doc id, cosine similarity) per query, best first.
+    """
+    collection = get_chroma_collection()
+    store = get_doc_store()
 
     # Search
     results = collection.query(
-        query_embeddings=[query_embedding],
+        query_embeddings=[embedding.tolist() for embedding in query_embeddings],
         n_results=top_k,
-        include=["documents", "metadatas", "distances"]
+        include=["distances"]
     )
 
-    # Format results
-    search_results = []
-    if results["ids"] and results["ids"][0]:
-        for i, hadith_id in enumerate(results["ids"][0]):
-            # Convert distance to similarity score (cosine distance to similarity)
-            distance = results["distances"][0][i] if results["distances"] else 0
-            score = 1 - distance  # For cosine, similarity = 1 - distance
-
-            metadata = results["metadatas"][0][i] if results["metadatas"] else {}
-
-            search_results.append({
-                "id": hadith_id,
-                "score": score,
-                "book": metadata.get("book", ""),
-                "volume": metadata.get("volume", 0),
-                "chapter": metadata.get("chapter", ""),
-                "hadith_number": metadata.get("hadith_number", 0),
-                "narrator": metadata.get("narrator", ""),
-                "text": metadata.get("text", "")
-            })
-
-    return search_results
+    batch_results = []
+    for i in range(len(query_embeddings)):
+        search_results = []
+        if results["ids"] and results["ids"][i]:
+            for hadith_id, distance in zip(results["ids"][i], results["distances"][i]):
+                doc = store.doc_id(hadith_id)
+                if doc is None:
+                    continue
+                # For cosine, similarity = 1 - distance
+                search_results.append((doc, 1 - distance))
+        batch_results.append(search_results)
+
+    return batch_results
+
+
+def vector_search(
+    query: str,
+    top_k: int = VECTOR_TOP_K,
+    mask: Optional[np.ndarray] = None
+) -> List[Tuple[int, float]]:
+    """Search hadiths by semantic similarity.
+
+    Uses the backend selected by ``VECTOR_BACKEND``: "chroma" (HNSW) or
+    "numpy" (scan of the memory-mapped embedding matrix). Filtered
+    searches always scan the matrix with the mask applied, since the HNSW
+    graph cannot be restricted to a subset and post-filtering its hits
+    would return fewer than ``top_k``.
+
+    Args:
+        query: Search query.
+        top_k: Number of results to return.
+        mask: Optional bool array over doc ids (hadiths.json order);
+            only hadiths marked True are returned.
+
+    Returns:
+        List of (doc id, cosine similarity), best first.
+    """
+    query_embedding = encode_query(query)
+
+    if VECTOR_BACKEND == "numpy" or (VECTOR_BACKEND == "chroma" and mask is not None):
+        return _dense_search(query_embedding, top_k, mask)
+    if VECTOR_BACKEND == "chroma":
+        return _chroma_search(query_embedding, top_k)
+    raise ValueError(f"Unknown vector backend: {VECTOR_BACKEND}")
+
+
+def vector_search_batch(
+    queries: List[str],
+    top_k: int = VECTOR_TOP_K,
+    mask: Optional[np.ndarray] = None
+) -> List[List[Tuple[int, float]]]:
+    """Search hadiths by semantic similarity for many queries at once.
+
+    Queries are embedded together (``encode_queries``); the numpy backend
+    scores the whole batch with one matrix product and ChromaDB gets one
+    query call.
+
+    Args:
+        queries: Search queries.
+        top_k: Number of results per query.
+        mask: Optional bool array over doc ids, shared by all queries.
+
+    Returns:
+        One list of (doc id, cosine similarity) per query, best first.
+    """
+    if not queries:
+        return []
+    embeddings = encode_queries(queries)
+
+    if VECTOR_BACKEND == "numpy" or (VECTOR_BACKEND == "chroma" and mask is not None):
+        return get_dense_index().top_k_batch(np.stack(embeddings), top_k, mask)
+    if VECTOR_BACKEND == "chroma":
+        return _chroma_search_batch(embeddings, top_k)
+    raise ValueError(f"Unknown vector backend: {VECTOR_BACKEND}")
@@ -1,8 +1,11 @@
 """Gradio interface for hadith search with Islamic-themed professional UI."""
 
+from typing import Iterator
+
 import gradio as gr
 
-from src.search.hybrid_search import hybrid_search
+from src.search.hybrid_search import hybrid_search_stages
+from src.search.arabic_analyzer import is_arabic
 
 
 # Islamic-themed professional CSS - Light cream/beige background
@@ -173,8 +176,21 @@ button.secondary:hover {
 """
 
 
-def format_results(results: list, query: str, expanded_query: str, cached: bool, took_ms: float) -> str:
-    """Format search results with Islamic styling."""
+def format_results(
+    results: list,
+    query: str,
+    expanded_query: str,
+    cached: bool,
+    took_ms: float,
+    preliminary: bool = False,
+    relevance: bool = True
+) -> str:
+    """Format search results with Islamic styling.
+
+    ``preliminary`` marks the fused ranking shown while reranking runs.
+    Its RRF scores are not relevance percentages, so they are not shown,
+    nor are they when ``relevance`` is off (reranking was skipped).
+    """
     if not results:
         return """
 ## 🔍 No Results Found
@@ -201,6 +217,8 @@ def format_results(results: list, query: str, expanded_query: str, cached: bool,
         f"</div>",
         "",
     ]
+    if preliminary:
+        output.insert(3, "<span style='background: rgba(201, 162, 39, 0.15); border: 1px solid rgba(201, 162, 39, 0.4); padding: 6px 14px; border-radius: 20px; font-size: 13px; color: #8a6d1a;'>⏳ Refining ranking…</span>")
 
     for i, r in enumerate(results, 1):
         # Book styling with Islamic colors
@@ -240,26 +258,36 @@ def format_results(results: list, query: str, expanded_query: str, cached: bool,
         
         output.append("")
         
+        # Arabic text for Arabic queries, above the translation
+        if r.get('arabic') and is_arabic(query):
+            output.append(f"<div style='direction: rtl; font-size: 1.3em; font-family: \"Traditional Arabic\", \"Scheherazade\", serif;'>{r['arabic']}</div>")
+            output.append("")
+
         # Hadith text in blockquote - show full text
         output.append(f"> {r['text']}")
         
         output.append("")
-        output.append(f"<span style='color: {score_color}; font-size: 13px;'>📊 Relevance: **{score_pct:.1f}%**</span>")
-        output.append("")
+        if relevance and not preliminary:
+            output.append(f"<span style='color: {score_color}; font-size: 13px;'>📊 Relevance: **{score_pct:.1f}%**</span>")
+            output.append("")
         output.append("---")
         output.append("")
 
     return "\n".join(output)
 
 
-def search_fn(query: str) -> str:
-    """Search function for Gradio interface."""
+def search_fn(query: str) -> Iterator[str]:
+    """Search function for Gradio interface.
+
+    Yields the fused ranking as soon as it is ready, then the reranked
+    results (only the latter when reranking is skipped).
+    """
     # Check if indexing is in progress
     try:
         from startup import get_indexing_status
         status = get_indexing_status()
         if status["in_progress"]:
-            return """
+            yield """
 ## ⏳ Database Initialization in Progress
 
 <div style="background: rgba(201, 162, 39, 0.15); border: 1px solid rgba(201, 162, 39, 0.4); border-radius: 12px; padding: 24px; margin: 16px 0;">
@@ -272,8 +300,9 @@ Thank you for your patience!
 
 </div>
 """
+            return
         elif status["error"]:
-            return f"""
+            yield f"""
 ## ⚠️ Database Error
 
 <div style="background: rgba(239, 68, 68, 0.08); border: 1px solid rgba(239, 68, 68, 0.25); border-radius: 12px; padding: 20px;">
@@ -284,11 +313,12 @@ Please contact support or try again later.
 
 </div>
 """
+            return
     except ImportError:
         pass  # startup module not available (running standalone)
     
     if not query.strip():
-        return """
+        yield """
 <div style="text-align: center; padding: 40px 20px;">
 
 ### Welcome to the Hadith Search Engine
@@ -321,13 +351,22 @@ Enter a question or topic above to search authentic hadiths from **Sahih al-Bukh
 
 </div>
 """
+        return
 
     try:
-        results, expanded_query, cached, took_ms = hybrid_search(query, top_k=10)
-        return format_results(results, query, expanded_query, cached, took_ms)
+        info = {}
+        for stage, results, expanded_query, cached, took_ms in hybrid_search_stages(query, top_k=10, info=info):
+            output = format_results(
+                results, query, expanded_query, cached, took_ms,
+                preliminary=stage == "fused",
+                relevance=info.get("rerank", {}).get("path") != "none"
+            )
+            if info.get("did_you_mean"):
+                output = f"🔤 Showing results for **{info['did_you_mean']}**\n\n" + output
+            yield output
 
     except Exception as e:
-        return f"""
+        yield f"""
 ## ⚠️ Error Occurred
 
 <div style="background: rgba(239, 68, 68, 0.08); border: 1px solid rgba(239, 68, 68, 0.25); border-radius: 12px; padding: 20px;">
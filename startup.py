@@ -13,7 +13,11 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 def verify_indices():
     """Verify that pre-built indices exist."""
-    from src.config import CHROMA_DIR, BM25_INDEX, HADITHS_JSON
+    from src.config import (
+        CHROMA_DIR, VECTOR_INDEX, NEIGHBOR_INDEX, ONNX_EMBEDDING_DIR, EMBEDDING_BACKEND,
+        DOC_STORE, FILTER_INDEX, DUPLICATE_INDEX, RERANK_TOKENS_INDEX, BM25_INDEX, ARABIC_INDEX,
+        SPELLING_INDEX, SUGGEST_INDEX, HADITHS_JSON
+    )
     
     print("=" * 60)
     print("HADITH SEARCH - STARTUP")
@@ -21,10 +25,22 @@ def verify_indices():
     
     # Check required files
     checks = [
+        (DOC_STORE, "Document store"),
+        (FILTER_INDEX, "Metadata filter index"),
+        (DUPLICATE_INDEX, "Near-duplicate clusters"),
+        (RERANK_TOKENS_INDEX, "Reranker token store"),
         (CHROMA_DIR, "ChromaDB directory"),
+        # Also used by filtered searches with the chroma backend
+        (VECTOR_INDEX, "Dense vector index"),
+        (NEIGHBOR_INDEX, "Neighbour table"),
         (BM25_INDEX, "BM25 index"),
+        (ARABIC_INDEX, "Arabic index"),
+        (SPELLING_INDEX, "Spelling dictionary"),
+        (SUGGEST_INDEX, "Suggestion index"),
         (HADITHS_JSON, "Hadiths JSON"),
     ]
+    if EMBEDDING_BACKEND == "onnx":
+        checks.append((ONNX_EMBEDDING_DIR, "ONNX query encoder"))
     
     all_ok = True
     for path, name in checks: